@@ -0,0 +1,95 @@
+# bench/bench_decode_transfers.py
+# - 07 Transfer 디코딩: 기존 iterrows 루프 vs 컬럼 단위(evtdecode) 처리량 비교
+# - RPC 없이 out/token_meta.csv 캐시만 사용, 두 결과가 동일한지도 확인
+# 사용: python bench/bench_decode_transfers.py [--files N] [--concat]
+#   --concat: 청크들을 하나로 합쳐 측정(청크당 고정 오버헤드 제외, 큰 청크에서의 처리량)
+import os, sys, glob, json, time, argparse
+import pandas as pd
+from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "helpers"))
+os.environ.setdefault("AMOUNT_FORMAT", "float")   # 기존 루프와 같은 float amount_norm 으로 비교
+from evtdecode import decode_transfers
+
+TOPIC_TRANSFER = json.load(open("config/topics.json"))["erc20_transfer"]
+
+meta = {}
+if os.path.exists("out/token_meta.csv"):
+    for _, r in pd.read_csv("out/token_meta.csv").iterrows():
+        meta[str(r["address"]).lower()] = (r["symbol"], int(r["decimals"]))
+
+def meta_fn(addr_cs):
+    return meta.get(addr_cs.lower(), ("UNK", 18))
+
+def legacy_decode(logs):
+    """07의 기존 행 단위 루프(비교 기준). topics는 콤마 구분 문자열만 가정."""
+    rows = []
+    for _, r in logs.iterrows():
+        s = r["topics"]
+        topics = [p.strip() for p in str(s).split(",") if p.strip()] if isinstance(s, str) else []
+        if not topics or topics[0].lower() != TOPIC_TRANSFER.lower():
+            continue
+        try:
+            token_cs = Web3.to_checksum_address(str(r["address"]))
+        except Exception:
+            continue
+        def t2a(t):
+            return Web3.to_checksum_address("0x" + t[-40:]) if t.startswith("0x") and len(t) >= 42 else ""
+        from_addr = t2a(topics[1]) if len(topics) > 1 else ""
+        to_addr   = t2a(topics[2]) if len(topics) > 2 else ""
+        data_hex = str(r["data"]) if isinstance(r["data"], str) else "0x"
+        if not data_hex.startswith("0x"):
+            data_hex = "0x" + data_hex
+        try:
+            amount_raw = int(data_hex, 16)
+        except Exception:
+            amount_raw = 0
+        sym, dec = meta_fn(token_cs)
+        rows.append({
+            "tx_hash": str(r["transaction_hash"]),
+            "log_index": int(r["log_index"]) if pd.notna(r["log_index"]) else -1,
+            "token_address": token_cs, "symbol": sym, "decimals": dec,
+            "from": from_addr.lower(), "to": to_addr.lower(),
+            "amount_raw": amount_raw,
+            "amount_norm": float(amount_raw) / (10**dec),
+            "token_alias": f"{sym}.ETH",
+        })
+    return pd.DataFrame(rows)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=0, help="앞에서부터 N개 청크만(0=전체)")
+    ap.add_argument("--concat", action="store_true", help="청크를 하나의 DataFrame으로 합쳐 측정")
+    a = ap.parse_args()
+
+    files = sorted(glob.glob("out/chunks/logs_*.csv"))
+    if a.files:
+        files = files[:a.files]
+    if not files:
+        raise SystemExit("out/chunks/logs_*.csv 가 없습니다.")
+    chunks = [pd.read_csv(f, dtype={"topics":"string","data":"string","address":"string",
+                                    "transaction_hash":"string"}, low_memory=False) for f in files]
+    if a.concat:
+        chunks = [pd.concat(chunks, ignore_index=True)]
+    n_rows = sum(len(c) for c in chunks)
+
+    t0 = time.perf_counter()
+    old = pd.concat([legacy_decode(c) for c in chunks], ignore_index=True)
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new = pd.concat([decode_transfers(c, TOPIC_TRANSFER, meta_fn) for c in chunks], ignore_index=True)
+    t_new = time.perf_counter() - t0
+
+    key = ["tx_hash", "log_index"]
+    old = old.sort_values(key).reset_index(drop=True)
+    new = new.sort_values(key).reset_index(drop=True)
+    same = old.astype(str).equals(new[old.columns].astype(str))
+
+    print(f"files={len(files)} batches={len(chunks)} log_rows={n_rows} transfers={len(new)}")
+    print(f"iterrows   : {t_old:8.3f}s  {n_rows / t_old:12,.0f} rows/s")
+    print(f"vectorized : {t_new:8.3f}s  {n_rows / t_new:12,.0f} rows/s  (x{t_old / t_new:.1f})")
+    print("identical  :", same)
+
+if __name__ == "__main__":
+    main()
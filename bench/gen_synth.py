@@ -0,0 +1,195 @@
+# bench/gen_synth.py
+# - 벤치마크용 합성 체인 데이터 생성기(결정적: 같은 --seed 면 같은 바이트)
+# - ethereumetl 스키마 CSV: chain/blocks.csv, chain/transactions.csv, chain/receipts_NNNN.csv, chain/logs_NNNN.csv
+#   + tokens.json(symbol/decimals), pools.json(token0/token1), config/addresses.json(풀/브리지 주소), world.json(범위/head)
+# - 이벤트 구성(--mix, 이벤트 tx 비율 %):
+#   transfer: ERC20 Transfer 1~3개 / v2, v3: 입출 Transfer 2개 + Swap / wormhole: 브리지로 Transfer + LogMessagePublished
+#   이벤트 없는 단순 송금 tx(--plain-per-block)도 섞어 블록 모드(eth_getBlockReceipts) 판단이 실제처럼 갈리게 함
+# - mock_node.py 가 이 디렉터리를 읽어 JSON-RPC 로 제공, bin/ethereumetl 이 export_* 를 흉내 냄
+# 사용: python bench/gen_synth.py --out bench/_work/world [--blocks 200] [--txs-per-block 40] [--mix transfer=60,v2=20,v3=15,wormhole=5]
+import os, csv, json, random, argparse
+
+TOPICS = json.load(open(os.path.join(os.path.dirname(__file__), "..", "config", "topics.json")))
+
+BLOCK_COLS = ["number","hash","parent_hash","nonce","miner","difficulty","total_difficulty","size",
+              "gas_limit","gas_used","timestamp","transaction_count","base_fee_per_gas"]
+TX_COLS    = ["hash","nonce","block_hash","block_number","transaction_index","from_address","to_address",
+              "value","gas","gas_price","input","block_timestamp","max_fee_per_gas","max_priority_fee_per_gas","type"]
+RCPT_COLS  = ["transaction_hash","transaction_index","block_hash","block_number","cumulative_gas_used","gas_used",
+              "contract_address","root","status","effective_gas_price","l1_fee","l1_gas_used","l1_gas_price",
+              "l1_fee_scalar","blob_gas_price","blob_gas_used"]
+LOG_COLS   = ["log_index","transaction_hash","transaction_index","block_hash","block_number","address","data","topics"]
+
+DECIMALS = [18] * 6 + [6, 6, 8, 9, 0]
+SYMBOLS  = ["WETH", "USDC", "USDT", "DAI", "WBTC", "PEPE", "LINK", "UNI", "SHIB", "MKR"]
+
+def h32(rng):
+    return "0x" + "%064x" % rng.getrandbits(256)
+
+def addr(rng):
+    return "0x" + "%040x" % rng.getrandbits(160)
+
+def word(v):
+    """int → 32바이트 2의 보수 hex(0x 없음)."""
+    return "%064x" % (v % (1 << 256))
+
+def topic_addr(a):
+    return "0x" + "0" * 24 + a[2:]
+
+def amount(rng):
+    # 작은 값 ~ 2^53 초과 큰 값까지 고르게(정확한 decimal 스케일링 검증용)
+    return rng.randrange(1, 10 ** rng.choice([3, 6, 12, 18, 21, 24, 27]))
+
+def parse_mix(s):
+    mix = {k: float(v) for k, v in (p.split("=") for p in s.split(",") if p)}
+    bad = set(mix) - {"transfer", "v2", "v3", "wormhole"}
+    if bad:
+        raise SystemExit(f"unknown event kinds: {sorted(bad)}")
+    return mix
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="bench/_work/world")
+    ap.add_argument("--start-block", type=int, default=20500000)
+    ap.add_argument("--blocks", type=int, default=200)
+    ap.add_argument("--txs-per-block", type=int, default=40, help="이벤트가 있는 tx 수/블록")
+    ap.add_argument("--plain-per-block", type=int, default=20, help="이벤트 없는 tx 수/블록")
+    ap.add_argument("--mix", default="transfer=60,v2=20,v3=15,wormhole=5")
+    ap.add_argument("--tokens", type=int, default=300)
+    ap.add_argument("--pools", type=int, default=120)
+    ap.add_argument("--chunk-txs", type=int, default=1000, help="receipts_/logs_ 파일당 tx 수")
+    ap.add_argument("--head-lag", type=int, default=64, help="mock head = 마지막 블록 + head-lag")
+    ap.add_argument("--seed", type=int, default=1)
+    a = ap.parse_args()
+
+    rng = random.Random(a.seed)
+    mix = parse_mix(a.mix)
+    kinds, weights = list(mix), list(mix.values())
+    t_transfer, t_v2, t_v3, t_worm = (TOPICS[k].lower() for k in
+                                      ("erc20_transfer", "univ2_swap", "univ3_swap", "wormhole_log"))
+
+    tokens = {}
+    for i in range(a.tokens):
+        tokens[addr(rng)] = (f"{rng.choice(SYMBOLS)}{i}", rng.choice(DECIMALS))
+    tok_list = list(tokens)
+    pools = {}
+    for _ in range(a.pools):
+        t0, t1 = rng.sample(tok_list, 2)
+        pools[addr(rng)] = (t0, t1, rng.choice(["v2", "v3"]))
+    v2_pools = [p for p, v in pools.items() if v[2] == "v2"] or list(pools)
+    v3_pools = [p for p, v in pools.items() if v[2] == "v3"] or list(pools)
+    worm_core, worm_bridge = addr(rng), addr(rng)
+    users = [addr(rng) for _ in range(2000)]
+
+    os.makedirs(os.path.join(a.out, "chain"), exist_ok=True)
+    os.makedirs(os.path.join(a.out, "config"), exist_ok=True)
+    fb = open(os.path.join(a.out, "chain", "blocks.csv"), "w", newline="")
+    ft = open(os.path.join(a.out, "chain", "transactions.csv"), "w", newline="")
+    wb, wt = csv.DictWriter(fb, BLOCK_COLS), csv.DictWriter(ft, TX_COLS)
+    wb.writeheader(); wt.writeheader()
+    rc_rows, lg_rows, n_files = [], [], 0
+    counts = {k: 0 for k in kinds}
+    counts.update(txs=0, logs=0)
+
+    def flush(force=False):
+        nonlocal rc_rows, lg_rows, n_files
+        if not rc_rows or (len(rc_rows) < a.chunk_txs and not force):
+            return
+        n_files += 1
+        for name, cols, rows in (("receipts", RCPT_COLS, rc_rows), ("logs", LOG_COLS, lg_rows)):
+            with open(os.path.join(a.out, "chain", f"{name}_{n_files:04d}.csv"), "w", newline="") as f:
+                w = csv.DictWriter(f, cols)
+                w.writeheader()
+                w.writerows(rows)
+        rc_rows, lg_rows = [], []
+
+    parent = h32(rng)
+    ts0 = 1723000000
+    end = a.start_block + a.blocks - 1
+    for b in range(a.start_block, end + 1):
+        bh, ts = h32(rng), ts0 + 12 * (b - a.start_block)
+        n_ev, n_plain = a.txs_per_block, a.plain_per_block
+        order = ["ev"] * n_ev + ["plain"] * n_plain
+        rng.shuffle(order)
+        log_index, cum_gas = 0, 0
+        for ti, what in enumerate(order):
+            th, sender = h32(rng), rng.choice(users)
+            logs = []
+            if what == "ev":
+                kind = rng.choices(kinds, weights)[0]
+                counts[kind] += 1
+                if kind == "transfer":
+                    for _ in range(rng.randint(1, 3)):
+                        logs.append((rng.choice(tok_list), [t_transfer, topic_addr(rng.choice(users)),
+                                     topic_addr(rng.choice(users))], word(amount(rng))))
+                    to = logs[0][0]
+                elif kind in ("v2", "v3"):
+                    pool = rng.choice(v2_pools if kind == "v2" else v3_pools)
+                    t0, t1, _ = pools[pool]
+                    a_in, a_out = amount(rng), amount(rng)
+                    zero_in = rng.random() < 0.5
+                    tin, tout = (t0, t1) if zero_in else (t1, t0)
+                    logs.append((tin, [t_transfer, topic_addr(sender), topic_addr(pool)], word(a_in)))
+                    logs.append((tout, [t_transfer, topic_addr(pool), topic_addr(sender)], word(a_out)))
+                    if kind == "v2":
+                        w = [a_in, 0, 0, a_out] if zero_in else [0, a_in, a_out, 0]
+                        data = "".join(word(x) for x in w)
+                        logs.append((pool, [t_v2, topic_addr(sender), topic_addr(sender)], data))
+                    else:
+                        a0, a1 = (a_in, -a_out) if zero_in else (-a_out, a_in)
+                        data = (word(a0) + word(a1) + word(rng.getrandbits(160)) + word(rng.getrandbits(128))
+                                + word(rng.randrange(-887272, 887272)))
+                        logs.append((pool, [t_v3, topic_addr(sender), topic_addr(sender)], data))
+                    to = pool
+                else:   # wormhole: 브리지로 토큰 입금 + LogMessagePublished(sequence, nonce, payload, consistency)
+                    logs.append((rng.choice(tok_list), [t_transfer, topic_addr(sender), topic_addr(worm_bridge)],
+                                 word(amount(rng))))
+                    payload = "%064x" % rng.getrandbits(256)
+                    data = (word(rng.getrandbits(48)) + word(rng.getrandbits(32)) + word(0x80)
+                            + word(rng.choice([1, 15, 200])) + word(32) + payload)
+                    logs.append((worm_core, [t_worm, topic_addr(worm_bridge)], data))
+                    to = worm_bridge
+                inp = "0x" + "%08x" % rng.getrandbits(32) + "%064x" % rng.getrandbits(256)
+                value = 0
+            else:
+                to, inp, value = rng.choice(users), "0x", amount(rng)
+            gas_used = 21000 + 40000 * len(logs) + rng.randrange(0, 30000)
+            cum_gas += gas_used
+            gas_price = rng.randrange(5 * 10**9, 80 * 10**9)
+            wt.writerow({"hash": th, "nonce": rng.randrange(0, 5000), "block_hash": bh, "block_number": b,
+                         "transaction_index": ti, "from_address": sender, "to_address": to, "value": value,
+                         "gas": gas_used + 50000, "gas_price": gas_price, "input": inp, "block_timestamp": ts,
+                         "max_fee_per_gas": gas_price * 2, "max_priority_fee_per_gas": 10**9, "type": 2})
+            rc_rows.append({"transaction_hash": th, "transaction_index": ti, "block_hash": bh, "block_number": b,
+                            "cumulative_gas_used": cum_gas, "gas_used": gas_used, "contract_address": "",
+                            "root": "", "status": 0 if rng.random() < 0.02 else 1,
+                            "effective_gas_price": gas_price, "l1_fee": "", "l1_gas_used": "", "l1_gas_price": "",
+                            "l1_fee_scalar": "", "blob_gas_price": "", "blob_gas_used": ""})
+            for address, topics, data in logs:
+                lg_rows.append({"log_index": log_index, "transaction_hash": th, "transaction_index": ti,
+                                "block_hash": bh, "block_number": b, "address": address,
+                                "data": "0x" + data, "topics": ",".join(topics)})
+                log_index += 1
+            counts["txs"] += 1
+            counts["logs"] += len(logs)
+        wb.writerow({"number": b, "hash": bh, "parent_hash": parent, "nonce": "0x0000000000000000",
+                     "miner": addr(rng), "difficulty": 0, "total_difficulty": "", "size": 50000,
+                     "gas_limit": 30000000, "gas_used": cum_gas, "timestamp": ts,
+                     "transaction_count": len(order), "base_fee_per_gas": 5 * 10**9})
+        parent = bh
+        flush()
+    flush(force=True)
+    fb.close(); ft.close()
+
+    json.dump({t: list(v) for t, v in tokens.items()}, open(os.path.join(a.out, "tokens.json"), "w"))
+    json.dump({p: [v[0], v[1]] for p, v in pools.items()}, open(os.path.join(a.out, "pools.json"), "w"))
+    json.dump({"dex_pools_or_pairs": list(pools), "bridges": [worm_core, worm_bridge]},
+              open(os.path.join(a.out, "config", "addresses.json"), "w"), indent=2)
+    world = {"start_block": a.start_block, "end_block": end, "head": end + a.head_lag,
+             "seed": a.seed, "mix": mix, "counts": counts, "files": n_files}
+    json.dump(world, open(os.path.join(a.out, "world.json"), "w"), indent=2)
+    print(f"world {a.out}: blocks={a.blocks} txs={counts['txs']} logs={counts['logs']} "
+          f"files={n_files} mix={ {k: counts[k] for k in kinds} }")
+
+if __name__ == "__main__":
+    main()
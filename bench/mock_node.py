@@ -0,0 +1,243 @@
+# bench/mock_node.py
+# - gen_synth.py 가 만든 world 디렉터리를 읽어 JSON-RPC 로 제공하는 로컬 mock 노드(벤치/재현용)
+# - 지원: eth_chainId, eth_blockNumber, eth_getLogs(블록 범위 + topic0 OR + address), eth_getTransactionReceipt,
+#   eth_getBlockReceipts, eth_getBlockTransactionCountByNumber, eth_getBlockByNumber(헤더 + tx 해시),
+#   eth_getCode, eth_call(symbol/decimals/token0/token1)
+#   + mock_stats(메서드별 호출 수, 429 횟수) / mock_reset
+# - 재편성 재현(09 --follow 확인용): --head 로 시작 head 지정, mock_setHead [n] 으로 head 이동,
+#   mock_reorg [{"depth": d, "drop": true}] 로 head 쪽 d 블록 해시를 바꿈(drop 이면 그 블록 tx 도 빠짐)
+#   mock_overrides → {"hashes": {블록: 해시}, "dropped": [tx]} — bench/bin/ethereumetl 가 CSV 에 반영
+#   world 에 없는 블록(빈 블록)은 번호로 만든 합성 해시/시각
+# - 장애 재현: mock_fail [{"method": m, "count": n}] → 그 메서드의 다음 n 건은 JSON-RPC error
+# - 부하 조건: --latency-ms(HTTP 요청마다 지연), --rate(초당 허용 호출 수, 넘으면 429 + Retry-After),
+#   --p429(요청마다 확률적으로 429), --max-logs(getLogs 결과 상한 → "query returned more than" 오류)
+# 사용: python bench/mock_node.py --world bench/_work/world [--port 8545] [--latency-ms 20] [--rate 300] [--p429 0.01] [--head N]
+import os, csv, glob, json, time, random, hashlib, argparse, threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from eth_abi import encode
+
+SEL_SYMBOL, SEL_DECIMALS, SEL_TOKEN0, SEL_TOKEN1 = "0x95d89b41", "0x313ce567", "0x0dfe1681", "0xd21220a7"
+
+def hx(v):
+    return hex(int(v)) if v not in ("", None) else None
+
+class World:
+    def __init__(self, path):
+        meta = json.load(open(os.path.join(path, "world.json")))
+        self.head = meta["head"]
+        self.start_block = meta["start_block"]
+        self.tokens = {a.lower(): v for a, v in json.load(open(os.path.join(path, "tokens.json"))).items()}
+        self.pools = {a.lower(): v for a, v in json.load(open(os.path.join(path, "pools.json"))).items()}
+        addrs = json.load(open(os.path.join(path, "config", "addresses.json")))
+        self.contracts = set(self.tokens) | set(self.pools) | {a.lower() for a in addrs.get("bridges", [])}
+        self.logs_by_block, self.logs_by_tx = {}, {}
+        for f in sorted(glob.glob(os.path.join(path, "chain", "logs_*.csv"))):
+            for r in csv.DictReader(open(f, newline="")):
+                lg = {"address": r["address"], "topics": r["topics"].split(","), "data": r["data"],
+                      "blockNumber": hx(r["block_number"]), "blockHash": r["block_hash"],
+                      "transactionHash": r["transaction_hash"], "transactionIndex": hx(r["transaction_index"]),
+                      "logIndex": hx(r["log_index"]), "removed": False}
+                self.logs_by_block.setdefault(int(r["block_number"]), []).append(lg)
+                self.logs_by_tx.setdefault(r["transaction_hash"], []).append(lg)
+        self.rcpt_by_tx, self.rcpt_by_block = {}, {}
+        for f in sorted(glob.glob(os.path.join(path, "chain", "receipts_*.csv"))):
+            for r in csv.DictReader(open(f, newline="")):
+                d = {"transactionHash": r["transaction_hash"], "transactionIndex": hx(r["transaction_index"]),
+                     "blockHash": r["block_hash"], "blockNumber": hx(r["block_number"]),
+                     "cumulativeGasUsed": hx(r["cumulative_gas_used"]), "gasUsed": hx(r["gas_used"]),
+                     "contractAddress": r["contract_address"] or None, "status": hx(r["status"]),
+                     "effectiveGasPrice": hx(r["effective_gas_price"]),
+                     "logs": self.logs_by_tx.get(r["transaction_hash"], [])}
+                self.rcpt_by_tx[r["transaction_hash"]] = d
+                self.rcpt_by_block.setdefault(int(r["block_number"]), []).append(d)
+        self.blocks = {int(r["number"]): (r["hash"], int(r["timestamp"]))
+                       for r in csv.DictReader(open(os.path.join(path, "chain", "blocks.csv"), newline=""))}
+        self.txs_by_block = {}
+        for r in csv.DictReader(open(os.path.join(path, "chain", "transactions.csv"), newline="")):
+            self.txs_by_block.setdefault(int(r["block_number"]), []).append(r["hash"])
+        self.ts0 = self.blocks[min(self.blocks)][1] - 12 * min(self.blocks) if self.blocks else 0
+        self.hashes, self.dropped, self.reorgs = {}, set(), 0   # mock_reorg 로 바뀐 해시 / 빠진 tx
+
+    def block_hash(self, n):
+        if n in self.hashes:
+            return self.hashes[n]
+        if n in self.blocks:
+            return self.blocks[n][0]
+        return "0x" + hashlib.sha256(f"block:{n}".encode()).hexdigest()
+
+    def header(self, n):
+        if n < 0 or n > self.head:
+            return None
+        return {"number": hex(n), "hash": self.block_hash(n), "parentHash": self.block_hash(n - 1),
+                "timestamp": hex(self.blocks[n][1] if n in self.blocks else self.ts0 + 12 * n),
+                "transactions": list(self.txs_by_block.get(n, []))}
+
+    def reorg(self, depth, drop=False):
+        """head 쪽 depth 블록을 새 해시로(receipts/logs 의 blockHash 도). drop 이면 그 블록 tx 를 뺌."""
+        self.reorgs += 1
+        fork = self.head - depth + 1
+        for n in range(fork, self.head + 1):
+            h = "0x" + hashlib.sha256(f"reorg:{self.reorgs}:{n}".encode()).hexdigest()
+            self.hashes[n] = h
+            if drop:
+                for tx in self.txs_by_block.pop(n, []):
+                    self.dropped.add(tx)
+                    self.rcpt_by_tx.pop(tx, None)
+                    self.logs_by_tx.pop(tx, None)
+                self.rcpt_by_block.pop(n, None)
+                self.logs_by_block.pop(n, None)
+            for d in self.rcpt_by_block.get(n, []):
+                d["blockHash"] = h
+            for lg in self.logs_by_block.get(n, []):
+                lg["blockHash"] = h
+        return {"fork": fork, "head": self.head}
+
+class Node:
+    def __init__(self, world, latency_ms=0, rate=0, p429=0.0, retry_after=0.5, max_logs=10000, seed=0):
+        self.w = world
+        self.latency = latency_ms / 1000.0
+        self.rate, self.p429, self.retry_after, self.max_logs = rate, p429, retry_after, max_logs
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens, self.ts = max(rate, 1), time.monotonic()
+        self.calls, self.limited = Counter(), 0
+        self.fail = Counter()   # 메서드 → 남은 강제 실패 건수(mock_fail)
+
+    def allow(self, n):
+        with self.lock:
+            if self.p429 and self.rng.random() < self.p429:
+                self.limited += 1
+                return False
+            if self.rate <= 0:
+                return True
+            now = time.monotonic()
+            cap = max(self.rate, 100)
+            self.tokens = min(cap, self.tokens + (now - self.ts) * self.rate)
+            self.ts = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return True
+            self.limited += 1
+            return False
+
+    def get_logs(self, f):
+        lo, hi = int(f["fromBlock"], 16), int(f["toBlock"], 16)
+        tp = f.get("topics") or []
+        want = None
+        if tp and tp[0]:
+            want = {t.lower() for t in (tp[0] if isinstance(tp[0], list) else [tp[0]])}
+        addr = f.get("address")
+        if isinstance(addr, str):
+            addr = [addr]
+        addr = {a.lower() for a in addr} if addr else None
+        out = []
+        for b in range(lo, min(hi, self.w.head) + 1):
+            for lg in self.w.logs_by_block.get(b, ()):
+                if want is not None and lg["topics"][0] not in want:
+                    continue
+                if addr is not None and lg["address"].lower() not in addr:
+                    continue
+                out.append(lg)
+                if len(out) > self.max_logs:
+                    raise ValueError(f"query returned more than {self.max_logs} results")
+        return out
+
+    def answer(self, m, p):
+        w = self.w
+        if self.fail[m] > 0:
+            with self.lock:
+                self.fail[m] -= 1
+            raise ValueError(f"mock failure: {m}")
+        if m == "eth_chainId": return "0x1"
+        if m == "web3_clientVersion": return "bench-mock"
+        if m == "eth_blockNumber": return hex(w.head)
+        if m == "eth_getLogs": return self.get_logs(p[0])
+        if m == "eth_getTransactionReceipt": return w.rcpt_by_tx.get(p[0].lower())
+        if m == "eth_getBlockReceipts": return w.rcpt_by_block.get(int(p[0], 16), [])
+        if m == "eth_getBlockByNumber": return w.header(w.head if p[0] == "latest" else int(p[0], 16))
+        if m == "eth_getBlockTransactionCountByNumber": return hex(len(w.rcpt_by_block.get(int(p[0], 16), [])))
+        if m == "eth_getCode": return "0x6080604052" if p[0].lower() in w.contracts else "0x"
+        if m == "eth_call":
+            to, sel = p[0]["to"].lower(), p[0]["data"][:10]
+            if to in w.tokens and sel == SEL_SYMBOL: return "0x" + encode(["string"], [w.tokens[to][0]]).hex()
+            if to in w.tokens and sel == SEL_DECIMALS: return "0x" + encode(["uint8"], [w.tokens[to][1]]).hex()
+            if to in w.pools and sel == SEL_TOKEN0: return "0x" + encode(["address"], [w.pools[to][0]]).hex()
+            if to in w.pools and sel == SEL_TOKEN1: return "0x" + encode(["address"], [w.pools[to][1]]).hex()
+            raise ValueError("execution reverted")
+        if m == "mock_stats":
+            return {"calls": dict(self.calls), "total": sum(self.calls.values()), "limited": self.limited}
+        if m == "mock_setHead":
+            w.head = int(p[0])
+            return w.head
+        if m == "mock_reorg":
+            return w.reorg(int(p[0].get("depth", 1)), bool(p[0].get("drop", False)))
+        if m == "mock_overrides":
+            return {"hashes": {str(n): h for n, h in w.hashes.items()}, "dropped": sorted(w.dropped)}
+        if m == "mock_fail":
+            self.fail[p[0]["method"]] += int(p[0].get("count", 1))
+            return True
+        if m == "mock_reset":
+            self.calls.clear(); self.limited = 0
+            return True
+        raise ValueError(f"method not found: {m}")
+
+def make_handler(node):
+    class H(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def log_message(self, *a): pass
+        def reply(self, code, body, headers=()):
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in headers:
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            single = isinstance(req, dict)
+            reqs = [req] if single else req
+            internal = single and req.get("method", "").startswith("mock_")
+            if node.latency and not internal:
+                time.sleep(node.latency)
+            if not internal and not node.allow(len(reqs)):
+                body = b'{"jsonrpc":"2.0","id":null,"error":{"code":429,"message":"Too Many Requests"}}'
+                return self.reply(429, body, [("Retry-After", str(node.retry_after))])
+            out = []
+            for r in reqs:
+                if not internal:
+                    with node.lock:
+                        node.calls[r["method"]] += 1
+                try:
+                    out.append({"jsonrpc": "2.0", "id": r["id"], "result": node.answer(r["method"], r.get("params", []))})
+                except Exception as e:
+                    out.append({"jsonrpc": "2.0", "id": r["id"], "error": {"code": -32000, "message": str(e)}})
+            self.reply(200, json.dumps(out[0] if single else out).encode())
+    return H
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--world", default="bench/_work/world")
+    ap.add_argument("--port", type=int, default=8545)
+    ap.add_argument("--latency-ms", type=float, default=0)
+    ap.add_argument("--rate", type=float, default=0, help="초당 허용 호출 수(0=무제한)")
+    ap.add_argument("--p429", type=float, default=0.0, help="요청별 429 확률")
+    ap.add_argument("--retry-after", type=float, default=0.5)
+    ap.add_argument("--max-logs", type=int, default=10000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--head", type=int, default=None, help="시작 head(기본 world.json)")
+    a = ap.parse_args()
+    world = World(a.world)
+    if a.head is not None:
+        world.head = a.head
+    node = Node(world, a.latency_ms, a.rate, a.p429, a.retry_after, a.max_logs, a.seed)
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256   # 동시 접속이 몰려도 연결 거부가 나지 않도록
+    srv = Server(("127.0.0.1", a.port), make_handler(node))
+    print(f"mock node on http://127.0.0.1:{a.port} (head={node.w.head})", flush=True)
+    srv.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# bench/run_bench.py
+# - 01~09 전체 파이프라인을 합성 데이터(gen_synth.py) + mock 노드(mock_node.py) 위에서 재현 가능하게 측정
+# - 단계별: 소요 시간, 산출 행 수, rows/s, RPC 호출 수(mock_stats 차이), 429 횟수, 최대 RSS(os.wait4)
+# - 결과 표 출력 + results.json 저장, 산출물 지문(정렬한 행의 sha256)으로 골든 비교
+#   --save-golden g.json: 지문 저장 / --golden g.json: 지문 비교(다르면 종료 코드 1)
+# - ethereumetl 은 bench/bin/ethereumetl(합성 CSV 잘라 쓰는 대역)로 대체 → 04/09 의 ETL 시간은 실제와 다름
+# 사용: python bench/run_bench.py [--blocks 200] [--txs-per-block 40] [--rate 300] [--p429 0.01] [--latency-ms 5]
+#       [--stages 01,02,...,10] [--cache] [--golden bench/golden.json]
+# - 각 단계가 helpers/metrics.py 로 남긴 out/metrics.json(구간별 시간·메서드별 RPC 등)도 results.json 에 포함
+import os, sys, json, glob, time, shutil, socket, hashlib, argparse, subprocess, urllib.request
+import pyarrow.parquet as pq
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+REPO  = os.path.dirname(BENCH)
+
+# 단계 → (스크립트, 인자, 산출물 glob 목록)
+STAGES = {
+    "01": ("01_collect_txhashes.py",        ["{start}", "{end}"], ["out/tx_hashes.txt", "out/tx_blocks.csv"]),
+    "02": ("02_chunk_tx_hashes.py",         [], ["out/chunks/tx_hashes_*.txt"]),
+    "03": ("03_export_receipts_and_logs.py", [], ["out/raw/receipts/*/*.parquet", "out/raw/logs/*/*.parquet",
+                                                  "out/chunks/receipts_*.csv", "out/chunks/logs_*.csv"]),
+    "04": ("04_export_blocks_txs.py",       [], ["out/blocks_*.csv", "out/transactions_*.csv"]),
+    "05": ("05_annotate_contract_flag.py",  [], ["out/contract_flags.csv"]),
+    "06": ("06_build_normalized.py",        [], ["out/normalized/blocks=*.csv"]),
+    "07": ("07_decode_events_transfers.py", [], ["out/transfers.csv"]),
+    "08": ("08_decode_events_swaps.py",     [], ["out/dex_swaps.csv"]),
+    "09": ("09_decode_events_bridges.py",   ["--start", "{start}", "--end", "{end}"], ["out/e2e/*.csv", "out/e2e/normalized_09/blocks=*"]),
+    "10": ("10_decode_events_all.py",       [], ["out/transfers.csv", "out/dex_swaps.csv", "out/bridge_events.csv"]),
+}
+DEFAULT_STAGES = "01,02,03,04,05,06,07,08,09"
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def rpc(url, method, params=None):
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []}).encode()
+    req = urllib.request.Request(url, body, {"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=10) as r:
+        return json.loads(r.read())["result"]
+
+def start_node(a, world, log):
+    port = free_port()
+    cmd = [sys.executable, os.path.join(BENCH, "mock_node.py"), "--world", world, "--port", str(port),
+           "--latency-ms", str(a.latency_ms), "--rate", str(a.rate), "--p429", str(a.p429),
+           "--max-logs", str(a.max_logs), "--seed", str(a.seed)]
+    proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(600):                       # world 로딩이 끝날 때까지 대기
+        if proc.poll() is not None:
+            raise SystemExit(f"mock node exited ({proc.returncode})")
+        try:
+            rpc(url, "mock_stats")
+            return proc, url
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("mock node did not start")
+
+def prepare_workdir(work, world):
+    if os.path.exists(work):
+        shutil.rmtree(work)
+    os.makedirs(os.path.join(work, "config"))
+    os.makedirs(os.path.join(work, "out"))
+    os.symlink(os.path.join(REPO, "helpers"), os.path.join(work, "helpers"))
+    shutil.copy(os.path.join(REPO, "config", "topics.json"), os.path.join(work, "config"))
+    shutil.copy(os.path.join(world, "config", "addresses.json"), os.path.join(work, "config"))
+    open(os.path.join(work, ".env"), "w").close()   # 저장소 .env(실제 RPC·pipx ETL 설정)가 끼어들지 않도록
+
+def outputs(work, globs):
+    return sorted(f for g in globs for f in glob.glob(os.path.join(work, g)))
+
+def rows_of(path):
+    if path.endswith(".parquet"):
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        n = sum(1 for line in f if line.strip())
+    return n - 1 if path.endswith(".csv") and n else n
+
+def fingerprint(path):
+    """행 순서·줄바꿈(CRLF)과 무관한 내용 지문: 정렬한 행의 sha256."""
+    if path.endswith(".parquet"):
+        t = pq.read_table(path)
+        lines = sorted(repr(tuple(r.values())) for r in t.to_pylist())
+        head = ",".join(t.column_names)
+    else:
+        with open(path, newline="") as f:
+            lines = [line.rstrip("\r\n") for line in f if line.strip()]
+        head = lines.pop(0) if path.endswith(".csv") and lines else ""
+        lines.sort()
+    h = hashlib.sha256(head.encode())
+    for line in lines:
+        h.update(b"\n" + line.encode())
+    return h.hexdigest()
+
+def run_stage(sid, work, env, url, span, log):
+    script, args, globs = STAGES[sid]
+    args = [x.format(**span) for x in args]
+    before = rpc(url, "mock_stats")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join("helpers", script), *args],
+                            cwd=work, env=env, stdout=log, stderr=subprocess.STDOUT)
+    _, status, ru = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - t0
+    after = rpc(url, "mock_stats")
+    files = outputs(work, globs)
+    rows = sum(rows_of(f) for f in files)
+    calls = {m: n - before["calls"].get(m, 0) for m, n in after["calls"].items() if n - before["calls"].get(m, 0)}
+    return {"stage": sid, "script": script, "rc": proc.returncode, "wall_s": round(wall, 3),
+            "rows": rows, "rows_per_s": round(rows / wall, 1) if wall > 0 else 0.0,
+            "rpc_calls": after["total"] - before["total"], "rpc_by_method": calls,
+            "rpc_429": after["limited"] - before["limited"],
+            "peak_rss_mb": round(ru.ru_maxrss / 1024, 1),      # Linux: KiB
+            "outputs": {os.path.relpath(f, work): fingerprint(f) for f in files}}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--work", default=os.path.join(BENCH, "_work"))
+    ap.add_argument("--regen", action="store_true", help="합성 데이터 다시 생성")
+    ap.add_argument("--blocks", type=int, default=200)
+    ap.add_argument("--txs-per-block", type=int, default=40)
+    ap.add_argument("--plain-per-block", type=int, default=20)
+    ap.add_argument("--mix", default="transfer=60,v2=20,v3=15,wormhole=5")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--latency-ms", type=float, default=0)
+    ap.add_argument("--rate", type=float, default=0, help="mock 초당 허용 호출 수(0=무제한)")
+    ap.add_argument("--p429", type=float, default=0.0, help="mock 요청별 429 확률")
+    ap.add_argument("--max-logs", type=int, default=10000)
+    ap.add_argument("--stages", default=DEFAULT_STAGES)
+    ap.add_argument("--cache", action="store_true", help="RPC 응답 캐시 사용(기본 끔: 매 실행 같은 RPC 부하)")
+    ap.add_argument("--amount-format", default="exact")
+    ap.add_argument("--workers", type=int, default=1, help="07/08/10 디코딩 프로세스 수(DECODE_WORKERS)")
+    ap.add_argument("--results", default=None, help="결과 JSON 경로(기본 <work>/results.json)")
+    ap.add_argument("--save-golden", default=None)
+    ap.add_argument("--golden", default=None)
+    a = ap.parse_args()
+
+    work = os.path.abspath(a.work)
+    world, run = os.path.join(work, "world"), os.path.join(work, "run")
+    gen = [sys.executable, os.path.join(BENCH, "gen_synth.py"), "--out", world, "--blocks", str(a.blocks),
+           "--txs-per-block", str(a.txs_per_block), "--plain-per-block", str(a.plain_per_block),
+           "--mix", a.mix, "--seed", str(a.seed)]
+    # 생성 인자가 바뀌면 다시 생성
+    stamp = os.path.join(work, "world.args")
+    if a.regen or not os.path.exists(stamp) or open(stamp).read() != " ".join(gen[3:]):
+        shutil.rmtree(world, ignore_errors=True)
+        subprocess.run(gen, check=True)
+        open(stamp, "w").write(" ".join(gen[3:]))
+    meta = json.load(open(os.path.join(world, "world.json")))
+    span = {"start": meta["start_block"], "end": meta["end_block"]}
+
+    prepare_workdir(run, world)
+    log = open(os.path.join(work, "bench.log"), "w")
+    node, url = start_node(a, world, log)
+    shim = os.path.join(BENCH, "bin", "ethereumetl")
+    env = dict(os.environ, RPC_URL=url, BENCH_WORLD=world, SLEEP_MS="0",
+               PATH=os.path.join(BENCH, "bin") + os.pathsep + os.environ.get("PATH", ""),
+               ETL_BIN=f"{sys.executable} {shim}", OUT_DIR="out/e2e", OUTPUT_FORMAT="csv",
+               RPC_CACHE="1" if a.cache else "0", AMOUNT_FORMAT=a.amount_format, PYTHONUNBUFFERED="1",
+               DECODE_WORKERS=str(a.workers))
+    results = []
+    try:
+        for sid in a.stages.split(","):
+            print(f"[bench] stage {sid} ...", flush=True)
+            log.write(f"\n===== stage {sid} =====\n"); log.flush()
+            r = run_stage(sid, run, env, url, span, log)
+            results.append(r)
+            if r["rc"] != 0:
+                print(f"[bench] stage {sid} failed (rc={r['rc']}), see {log.name}")
+                break
+    finally:
+        node.terminate()
+        node.wait()
+        log.close()
+
+    print(f"\nworld: blocks={meta['end_block'] - meta['start_block'] + 1} txs={meta['counts']['txs']} "
+          f"logs={meta['counts']['logs']}  mock: rate={a.rate} p429={a.p429} latency={a.latency_ms}ms")
+    print(f"{'stage':<6}{'wall_s':>9}{'rows':>10}{'rows/s':>12}{'rpc':>9}{'429':>7}{'rss_mb':>9}")
+    for r in results:
+        print(f"{r['stage']:<6}{r['wall_s']:>9.2f}{r['rows']:>10}{r['rows_per_s']:>12.0f}"
+              f"{r['rpc_calls']:>9}{r['rpc_429']:>7}{r['peak_rss_mb']:>9.0f}")
+    total = sum(r["wall_s"] for r in results)
+    print(f"{'total':<6}{total:>9.2f}")
+
+    report = {"args": vars(a), "world": meta, "stages": results, "total_wall_s": round(total, 3)}
+    # 단계가 스스로 남긴 계측(helpers/metrics.py: CPU 시간, 구간별 시간, 메서드별 RPC, 캐시 적중 등)
+    mpath = os.path.join(run, "out", "metrics.json")
+    if os.path.exists(mpath):
+        report["stage_metrics"] = json.load(open(mpath)).get("stages", {})
+    path = a.results or os.path.join(work, "results.json")
+    json.dump(report, open(path, "w"), indent=2)
+    print("results:", path)
+
+    failed = any(r["rc"] != 0 for r in results)
+    prints = {f: h for r in results for f, h in r["outputs"].items()}
+    if a.save_golden:
+        json.dump(prints, open(a.save_golden, "w"), indent=2, sort_keys=True)
+        print("golden saved:", a.save_golden)
+    if a.golden:
+        want = json.load(open(a.golden))
+        bad = sorted(f for f in set(want) | set(prints) if want.get(f) != prints.get(f))
+        for f in bad:
+            print(f"[golden] MISMATCH {f}: want={want.get(f, '-')[:12]} got={prints.get(f, '-')[:12]}")
+        print("[golden]", "OK" if not bad else f"{len(bad)} file(s) differ")
+        failed = failed or bool(bad)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
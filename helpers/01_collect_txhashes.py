@@ -1,86 +1,131 @@
-import os, sys, json, time
-from dotenv import load_dotenv
-from web3 import Web3
-
-load_dotenv()
-RPC = os.getenv("RPC_URL")
-SAFE_LAG = int(os.getenv("SAFE_LAG", "12"))
-SLEEP_MS = int(os.getenv("SLEEP_MS", "350"))
-
-w3 = Web3(Web3.HTTPProvider(RPC, request_kwargs={"timeout": 60}))
-assert w3.is_connected(), "RPC 연결 실패"
-
-def safe_end(end):
-    latest = w3.eth.block_number
-    return min(end, max(0, latest - SAFE_LAG))
-
-def get_logs(params, max_retry=5):
-    for i in range(max_retry):
-        try:
-            return w3.eth.get_logs(params)
-        except Exception as e:
-            msg = str(e).lower()
-            # 과다응답/제한 → step 줄여 재시도하도록 상위 루프에서 처리
-            if "too many results" in msg or "query returned more than" in msg:
-                raise
-            time.sleep((i+1) * 0.8)
-    raise
-
-def scan_range(start, end, topics, addresses=None, step=800):
-    """ 작은 step으로 순차 스캔; 과다응답이면 step 반으로 """
-    txs = set()
-    cur = start
-    end = safe_end(end)
-    while cur <= end:
-        to_ = min(cur + step - 1, end)
-        params = {"fromBlock": cur, "toBlock": to_}
-        if addresses: params["address"] = addresses
-        if topics:    params["topics"]  = [topics] if len(topics)==1 else [topics]
-
-        try:
-            logs = get_logs(params)
-            for lg in logs:
-                txs.add(lg["transactionHash"].hex())
-            print(f"[ok] {cur}-{to_} logs={len(logs)} acc_tx={len(txs)}")
-            cur = to_ + 1
-            time.sleep(SLEEP_MS/1000)
-        except Exception as e:
-            if step <= 20:
-                print(f"[skip] step={step} at {cur}-{to_} err={e}")
-                cur = to_ + 1
-            else:
-                step //= 2
-                print(f"[split] reduce step to {step} due to: {e}")
-    return sorted(txs)
-
-def main():
-    if len(sys.argv) < 3:
-        print("Usage: python 01_collect_txhashes.py <start_block> <end_block> [--safe]")
-        return
-    start, end = int(sys.argv[1]), int(sys.argv[2])
-    if "--safe" in sys.argv: end = safe_end(end)
-
-    topics = json.load(open("config/topics.json"))
-    addrs  = json.load(open("config/addresses.json"))
-
-    os.makedirs("out", exist_ok=True)
-    tx_all = []
-
-    # A) ERC20 Transfer (작은 step)
-    tx_all += scan_range(start, end, [topics["erc20_transfer"]], step=800)
-
-    # B) DEX/브리지 주소+토픽 (주소가 있으면 정확도↑)
-    for key, tkey in [("dex_pools_or_pairs","univ2_swap"),
-                      ("dex_pools_or_pairs","univ3_swap"),
-                      ("bridges","wormhole_log")]:
-        add_list = addrs.get(key, [])
-        if not add_list: continue
-        tx_all += scan_range(start, end, [topics[tkey]], addresses=add_list, step=1000)
-
-    txs = sorted(set(tx_all))
-    open("out/tx_hashes.txt", "w").write("\n".join(txs))
-    open("out/blocks_range.txt","w").write(f"{start},{end}\n")
-    print("saved tx_hashes:", len(txs))
-
-if __name__ == "__main__":
-    main()
+import os, sys, json, time, threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+import jsonrpc
+import metrics
+
+load_dotenv()
+SAFE_LAG = int(os.getenv("SAFE_LAG", "12"))
+# 요청 속도는 jsonrpc 공용 토큰 버킷(RPC_RATE, 429/Retry-After 시 감속)이 조절
+# 병렬 윈도 스캔: 범위를 WINDOW 블록 단위로 나눠 LOGS_WORKERS 개씩 동시에
+LOGS_WORKERS = int(os.getenv("LOGS_WORKERS", "4"))
+WINDOW       = int(os.getenv("LOGS_WINDOW", "20000"))
+STEP_INIT    = int(os.getenv("LOGS_STEP", "800"))
+STEP_MIN     = int(os.getenv("LOGS_STEP_MIN", "1"))
+STEP_MAX     = int(os.getenv("LOGS_STEP_MAX", "10000"))
+# 주소 필터 1개에 넣는 주소 수 상한(노드마다 address 배열 길이 제한이 있음) → 넘으면 필터를 나눔
+ADDR_CHUNK   = max(1, int(os.getenv("LOGS_ADDR_CHUNK", "500")))
+
+metrics.start("01_txhashes")
+assert jsonrpc.is_connected(), "RPC 연결 실패"
+_print_lock = threading.Lock()
+
+def log(msg):
+    with _print_lock:
+        print(msg, flush=True)
+
+def safe_end(end):
+    latest = int(jsonrpc.call("eth_blockNumber"), 16)
+    return min(end, max(0, latest - SAFE_LAG))
+
+def is_too_many(e):
+    msg = str(e).lower()
+    return ("too many results" in msg or "query returned more than" in msg
+            or "response size exceeded" in msg or "limit exceeded" in msg)
+
+def get_logs(params, max_retry=5):
+    for i in range(max_retry):
+        try:
+            return jsonrpc.call("eth_getLogs", [params], timeout=60)
+        except Exception as e:
+            # 과다응답/제한 → step 줄여 재시도하도록 상위 루프에서 처리
+            if is_too_many(e):
+                raise
+            time.sleep((i+1) * 0.8)
+    raise RuntimeError(f"get_logs failed after {max_retry} retries: {params['fromBlock']}-{params['toBlock']}")
+
+def scan_window(start, end, flt, step=STEP_INIT):
+    """
+    한 윈도 [start, end] 를 필터 flt({"topics": [...], "address": [...]?}) 로 적응형 step 스캔.
+    성공하면 step 2배(최대 STEP_MAX), 과다응답/실패면 반으로(최소 STEP_MIN, 그래도 안 되면 skip).
+    노드가 토픽/주소로 걸러 주므로 받은 로그의 tx 해시 → 블록 번호를 그대로 모은다.
+    """
+    txs = {}
+    cur = start
+    while cur <= end:
+        to_ = min(cur + step - 1, end)
+        params = {"fromBlock": hex(cur), "toBlock": hex(to_), **flt}
+        try:
+            with metrics.timer("get_logs"):
+                logs = get_logs(params)
+            metrics.add("rows_in", len(logs))
+            for lg in logs:
+                txs[lg["transactionHash"]] = int(lg["blockNumber"], 16)
+            cur = to_ + 1
+            step = min(step * 2, STEP_MAX)
+        except Exception as e:
+            if step <= STEP_MIN:
+                log(f"[skip] step={step} at {cur}-{to_} err={e}")
+                cur = to_ + 1
+            else:
+                step = max(STEP_MIN, step // 2)
+                log(f"[split] {cur}-{to_} reduce step to {step} due to: {e}")
+    log(f"[ok] window {start}-{end} acc_tx={len(txs)}")
+    return txs
+
+def scan_range(start, end, filters):
+    """범위를 WINDOW 단위 윈도로 나누고 (윈도 × 필터) 작업을 LOGS_WORKERS 개 스레드로 동시 스캔."""
+    windows = [(s, min(s + WINDOW - 1, end)) for s in range(start, end + 1, WINDOW)]
+    jobs = [(w, f) for w in windows for f in filters]
+    txs = {}
+    with ThreadPoolExecutor(max_workers=LOGS_WORKERS) as ex:
+        for part in ex.map(lambda j: scan_window(j[0][0], j[0][1], j[1]), jobs):
+            txs.update(part)
+    return txs
+
+def build_filters(topics, addrs):
+    """
+    eth_getLogs 필터 목록(주소 그룹마다 하나):
+     - ERC20 Transfer: 모든 주소(address 없음)
+     - DEX Swap(V2/V3): dex_pools_or_pairs 주소만, Wormhole: bridges 주소만 (목록이 비면 제외)
+    주소 목록을 노드에 넘겨 필요한 로그만 받음. 목록이 ADDR_CHUNK 보다 길면 여러 필터로 나눔.
+    """
+    filters = [{"topics": [[topics["erc20_transfer"].lower()]]}]
+    for key, tkeys in [("dex_pools_or_pairs", ["univ2_swap", "univ3_swap"]),
+                       ("bridges", ["wormhole_log"])]:
+        add_list = sorted({a.lower() for a in addrs.get(key, [])})
+        for i in range(0, len(add_list), ADDR_CHUNK):
+            filters.append({"topics": [[topics[t].lower() for t in tkeys]],
+                            "address": add_list[i:i+ADDR_CHUNK]})
+    return filters
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python 01_collect_txhashes.py <start_block> <end_block> [--safe]")
+        return
+    start, end = int(sys.argv[1]), int(sys.argv[2])
+    if "--safe" in sys.argv: end = safe_end(end)
+
+    topics = json.load(open("config/topics.json"))
+    addrs  = json.load(open("config/addresses.json"))
+
+    os.makedirs("out", exist_ok=True)
+
+    filters = build_filters(topics, addrs)
+
+    t0 = time.perf_counter()
+    tx_blocks = scan_range(start, safe_end(end), filters)
+    txs = sorted(tx_blocks)
+    open("out/tx_hashes.txt", "w").write("\n".join(txs))
+    # 3단계 블록 모드(eth_getBlockReceipts) 판단용 tx → 블록 번호
+    with open("out/tx_blocks.csv", "w") as f:
+        f.write("tx_hash,block_number\n")
+        f.writelines(f"{h},{tx_blocks[h]}\n" for h in txs)
+    open("out/blocks_range.txt","w").write(f"{start},{end}\n")
+    metrics.add("rows_out", len(txs))
+    for p in ["out/tx_hashes.txt", "out/tx_blocks.csv"]:
+        metrics.wrote(p)
+    print(f"saved tx_hashes: {len(txs)} ({time.perf_counter() - t0:.1f}s)")
+
+if __name__ == "__main__":
+    main()
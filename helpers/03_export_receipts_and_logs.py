@@ -1,22 +1,94 @@
-import os, subprocess, time, glob
-from dotenv import load_dotenv
-
-load_dotenv()
-RPC_URL   = os.getenv("RPC_URL")
-SLEEP_MS  = int(os.getenv("SLEEP_MS","350"))
-
-chunk_files = sorted(glob.glob("out/chunks/tx_hashes_*.txt"))
-for path in chunk_files:
-    r_out = f"{path.replace('tx_hashes_','receipts_').replace('.txt','.csv')}"
-    l_out = f"{path.replace('tx_hashes_','logs_').replace('.txt','.csv')}"
-    cmd = [
-      "ethereumetl","export_receipts_and_logs",
-      "--transaction-hashes", path,
-      "--provider-uri", RPC_URL,
-      "--receipts-output", r_out,
-      "--logs-output", l_out
-    ]
-    print(">>", " ".join(cmd))
-    subprocess.run(cmd, check=True)
-    time.sleep(SLEEP_MS/1000)
-print("done receipts/logs")
+import os, sys, glob, re, time, hashlib
+from dotenv import load_dotenv
+import receipts
+import manifest
+import rawstore
+import chunkindex
+import metrics
+
+load_dotenv()
+# out/tx_hashes.txt 를 직접 읽어 RECEIPTS_CHUNK 개씩 배치 RPC로 받아 청크 파일로 저장
+# (02 의 tx_hashes_*.txt 분할과 청크마다 ethereumetl 프로세스 띄우던 것 대체)
+# 저장 형식 RAW_FORMAT=parquet(기본): rawstore 블록 구간 파티션 / csv: out/chunks/{receipts,logs}_NNNN.csv
+RECEIPTS_CHUNK = int(os.getenv("RECEIPTS_CHUNK", "1000"))
+STAGE  = "03_receipts"
+RESUME = "--resume" in sys.argv   # 완료 기록(manifest)이 있고 파일이 그대로인 청크는 건너뜀
+metrics.start(STAGE)
+
+txs = [x.strip() for x in open("out/tx_hashes.txt").read().splitlines() if x.strip()]
+# 1단계가 남긴 tx → 블록 번호가 있으면 블록 모드(eth_getBlockReceipts) 후보로 사용
+tx_blocks = {}
+if os.path.exists("out/tx_blocks.csv"):
+    with open("out/tx_blocks.csv") as f:
+        next(f, None)
+        tx_blocks = dict(line.strip().split(",") for line in f if line.strip())
+    # 같은 블록의 tx 가 여러 청크로 흩어지지 않도록 블록 순으로 청크 분할
+    txs.sort(key=lambda h: (int(tx_blocks.get(h, 0)), h))
+os.makedirs("out/chunks", exist_ok=True)
+
+done = manifest.load(STAGE) if RESUME else {}
+if not RESUME:
+    manifest.reset(STAGE)
+
+t0 = time.perf_counter()
+n_chunks = (len(txs) + RECEIPTS_CHUNK - 1) // RECEIPTS_CHUNK
+n_rcpt = n_logs = n_skip = 0
+failed = []
+for i in range(n_chunks):
+    part = txs[i*RECEIPTS_CHUNK:(i+1)*RECEIPTS_CHUNK]
+    idx = i + 1
+    unit = f"{idx:04d}"
+    key = hashlib.sha1("\n".join(part).encode()).hexdigest()   # 청크 구성이 바뀌면 다시 받음
+    if manifest.is_done(done.get(unit), key):
+        n_rcpt += done[unit].get("receipts", 0); n_logs += done[unit].get("logs", 0); n_skip += 1
+        continue
+    with metrics.timer("fetch"):
+        rcpts, logs, miss = receipts.fetch(part, tx_blocks)
+    metrics.add("rows_in", len(part))
+    # 임시 파일 → rename 으로 교체(중간에 죽어도 반쯤 쓴 청크가 남지 않음)
+    if rawstore.RAW_FORMAT == "parquet":
+        outs = rawstore.write_unit("receipts", unit, rcpts)
+        log_outs = rawstore.write_unit("logs", unit, logs)
+        outs += log_outs
+    else:
+        outs = [f"out/chunks/receipts_{idx:04d}.csv", f"out/chunks/logs_{idx:04d}.csv"]
+        log_outs = outs[1:]
+        for out, cols, rows in zip(outs, [receipts.RECEIPT_COLS, receipts.LOG_COLS], [rcpts, logs]):
+            receipts.write_csv(manifest.tmp_path(out), cols, rows)
+            manifest.commit(manifest.tmp_path(out), out)
+    # 로그 청크마다 topic0/address 사이드카 인덱스(디코더가 필요 없는 청크를 건너뜀)
+    for p in log_outs:
+        chunkindex.build(p)
+    # 실패 해시가 있으면 failed 로 기록 → --resume 에서 이 청크만 다시
+    manifest.record(STAGE, unit, outs, status="failed" if miss else "done", key=key,
+                    receipts=len(rcpts), logs=len(logs), failed=len(miss))
+    n_rcpt += len(rcpts); n_logs += len(logs); failed += miss
+    metrics.add("rows_out", len(rcpts) + len(logs))
+    metrics.add("failed", len(miss))
+    for p in outs:
+        metrics.wrote(p)
+    print(f">> chunk {idx}/{n_chunks}: receipts={len(rcpts)} logs={len(logs)} failed={len(miss)}")
+if n_skip:
+    print(f"[resume] skipped {n_skip} completed chunks")
+
+# 이전 실행(더 잘게 나눴던 청크, --import-csv 로 가져온 것)의 남은 파일은 하위 단계에서 중복 집계되므로 제거
+# (csv 로 쓸 때는 리더가 우선 읽는 parquet 저장소도 전부 제거)
+def is_current(f):
+    m = re.search(r"[_-](\d+)\.(csv|parquet)$", f)
+    return m is not None and int(m.group(1)) <= n_chunks
+stale = rawstore.parts("receipts") + rawstore.parts("logs")
+if rawstore.RAW_FORMAT == "parquet":
+    stale = [f for f in stale if not is_current(f)]
+else:
+    stale += [f for f in glob.glob("out/chunks/receipts_*.csv") + glob.glob("out/chunks/logs_*.csv")
+              if not is_current(f)]
+for f in stale:
+    os.remove(f)
+    chunkindex.remove(f)
+
+if failed:
+    open("out/receipts_failed.txt", "w").write("\n".join(failed))
+    print(f"[warn] receipts 실패 {len(failed)}건 → out/receipts_failed.txt")
+elif os.path.exists("out/receipts_failed.txt"):
+    os.remove("out/receipts_failed.txt")
+print(f"done receipts/logs: receipts={n_rcpt} logs={n_logs} ({time.perf_counter() - t0:.1f}s)")
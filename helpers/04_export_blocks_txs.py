@@ -1,56 +1,103 @@
-import os, time, subprocess
-from dotenv import load_dotenv
-
-load_dotenv()
-RPC = os.getenv("RPC_URL")
-SLEEP_MS = int(os.getenv("SLEEP_MS","350"))
-
-start, end = map(int, open("out/blocks_range.txt").read().split(","))
-STEP = 1000        # 더 작게
-MAX_RETRY = 4      # 청크별 재시도 횟수
-
-def run_chunk(s, e):
-    blk_out = f"out/blocks_{s}_{e}.csv"
-    tx_out  = f"out/transactions_{s}_{e}.csv"
-    cmd = [
-        "ethereumetl","export_blocks_and_transactions",
-        "--start-block", str(s), "--end-block", str(e),
-        "--provider-uri", RPC,
-        "--blocks-output", blk_out,
-        "--transactions-output", tx_out,
-        "--max-workers", "1",
-        "--batch-size", "10"
-    ]
-    for attempt in range(1, MAX_RETRY+1):
-        try:
-            print(f">> [{s}-{e}] attempt {attempt}: {' '.join(cmd)}")
-            subprocess.run(cmd, check=True)
-            time.sleep(SLEEP_MS/1000)
-            return True
-        except subprocess.CalledProcessError as exc:
-            print(f"[warn] chunk {s}-{e} failed (attempt {attempt}): {exc}")
-            time.sleep((SLEEP_MS/1000) * attempt)
-    return False
-
-def bisect_and_run(s, e):
-    # 이진 분할로 더 쪼개서 시도
-    if s >= e:
-        return run_chunk(s, e)
-    mid = (s + e) // 2
-    ok1 = run_chunk(s, mid)
-    ok2 = run_chunk(mid+1, e)
-    if not ok1:
-        if s < mid:
-            bisect_and_run(s, mid)
-    if not ok2:
-        if mid+1 < e:
-            bisect_and_run(mid+1, e)
-
-for s in range(start, end+1, STEP):
-    e = min(s+STEP-1, end)
-    ok = run_chunk(s, e)
-    if not ok:
-        print(f"[split] bisecting {s}-{e}")
-        bisect_and_run(s, e)
-
-print("done blocks/transactions")
+import os, sys, time, subprocess
+from dotenv import load_dotenv
+import manifest
+import metrics
+
+load_dotenv()
+RPC = os.getenv("RPC_URL")
+SLEEP_MS = int(os.getenv("SLEEP_MS","350"))
+
+start, end = map(int, open("out/blocks_range.txt").read().split(","))
+STEP = 1000        # 더 작게
+MAX_RETRY = 4      # 청크별 재시도 횟수
+STAGE  = "04_blocks"
+RESUME = "--resume" in sys.argv   # 완료 기록(manifest)이 있고 파일이 그대로인 범위는 건너뜀
+metrics.start(STAGE)
+
+done = manifest.load(STAGE) if RESUME else {}
+if not RESUME:
+    manifest.reset(STAGE)
+
+def unit_of(s, e):
+    return f"{s}-{e}"
+
+def is_done(s, e):
+    return manifest.is_done(done.get(unit_of(s, e)))
+
+def has_done_inside(s, e):
+    """[s, e] 안에 이미 완료된 (더 작은) 범위가 있는지 → 전체 범위를 다시 받으면 파일이 겹침."""
+    for u, rec in done.items():
+        a, b = map(int, u.split("-"))
+        if s <= a and b <= e and (a, b) != (s, e) and manifest.is_done(rec):
+            return True
+    return False
+
+def run_chunk(s, e):
+    if is_done(s, e):
+        print(f"[resume] skip {s}-{e}")
+        return True
+    blk_out = f"out/blocks_{s}_{e}.csv"
+    tx_out  = f"out/transactions_{s}_{e}.csv"
+    # ethereumetl 은 임시 파일에 쓰고, 성공했을 때만 rename (실패 시 반쯤 쓴 파일이 남지 않음)
+    blk_tmp, tx_tmp = manifest.tmp_path(blk_out), manifest.tmp_path(tx_out)
+    cmd = [
+        "ethereumetl","export_blocks_and_transactions",
+        "--start-block", str(s), "--end-block", str(e),
+        "--provider-uri", RPC,
+        "--blocks-output", blk_tmp,
+        "--transactions-output", tx_tmp,
+        "--max-workers", "1",
+        "--batch-size", "10"
+    ]
+    for attempt in range(1, MAX_RETRY+1):
+        try:
+            print(f">> [{s}-{e}] attempt {attempt}: {' '.join(cmd)}")
+            with metrics.timer("ethereumetl"):
+                subprocess.run(cmd, check=True)
+            manifest.commit(blk_tmp, blk_out)
+            manifest.commit(tx_tmp, tx_out)
+            rec = manifest.record(STAGE, unit_of(s, e), [blk_out, tx_out])
+            metrics.add("rows_in", e - s + 1)
+            for p in [blk_out, tx_out]:
+                metrics.add("rows_out", rec["files"][p]["rows"])
+                metrics.wrote(p)
+            time.sleep(SLEEP_MS/1000)
+            return True
+        except subprocess.CalledProcessError as exc:
+            metrics.add("retries")
+            print(f"[warn] chunk {s}-{e} failed (attempt {attempt}): {exc}")
+            manifest.discard(blk_tmp, tx_tmp)
+            time.sleep((SLEEP_MS/1000) * attempt)
+    manifest.record(STAGE, unit_of(s, e), [], status="failed")
+    return False
+
+def bisect_and_run(s, e):
+    # [s, e] 는 이미 실패(또는 일부만 완료) → 두 반쪽을 각각 시도, 실패한 반쪽만 다시 분할
+    # (성공한 반쪽은 다시 받지 않음; --resume 이면 이전 실행에서 끝난 반쪽도 건너뜀)
+    if s >= e:
+        return False
+    mid = (s + e) // 2
+    ok = True
+    for a, b in [(s, mid), (mid+1, e)]:
+        if has_done_inside(a, b):
+            ok = bisect_and_run(a, b) and ok
+        elif not run_chunk(a, b):
+            ok = (a < b and bisect_and_run(a, b)) and ok
+    return ok
+
+failed = []
+for s in range(start, end+1, STEP):
+    e = min(s+STEP-1, end)
+    if has_done_inside(s, e):
+        ok = bisect_and_run(s, e)
+    elif run_chunk(s, e):
+        ok = True
+    else:
+        print(f"[split] bisecting {s}-{e}")
+        ok = bisect_and_run(s, e)
+    if not ok:
+        failed.append(f"{s}-{e}")
+
+if failed:
+    print(f"[warn] 일부 블록 실패: {failed} → --resume 으로 실패 범위만 다시 실행")
+print("done blocks/transactions")
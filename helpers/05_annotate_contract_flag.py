@@ -1,66 +1,97 @@
-import os, time, glob
-import pandas as pd
-from dotenv import load_dotenv
-from web3 import Web3
-
-load_dotenv()
-RPC = os.getenv("RPC_URL")
-SLEEP_MS = int(os.getenv("SLEEP_MS", "350"))
-
-w3 = Web3(Web3.HTTPProvider(RPC, request_kwargs={"timeout": 30}))
-assert w3.is_connected(), "RPC 연결 실패"
-
-# 1) transactions_* 병합 (또는 선택본이 있으면 그걸 사용)
-tx_files = sorted(glob.glob("out/transactions_*.csv"))
-txfile = "out/transactions_selected.csv" if os.path.exists("out/transactions_selected.csv") else None
-if txfile:
-    tx = pd.read_csv(txfile, usecols=["hash", "to_address"])
-else:
-    if not tx_files:
-        raise SystemExit("out/transactions_*.csv 가 없습니다. 4단계를 먼저 실행하세요.")
-    tx = pd.concat([pd.read_csv(f, usecols=["hash", "to_address"]) for f in tx_files], ignore_index=True)
-
-# 2) 우리가 선별한 TX만 남기기
-if os.path.exists("out/tx_hashes.txt"):
-    sel = set(x.strip() for x in open("out/tx_hashes.txt").read().splitlines() if x.strip())
-    tx = tx[tx["hash"].isin(sel)]
-
-# 3) 주소 정리: None/빈값 제거 + 길이/형식 검증
-def is_hex_addr(s: str) -> bool:
-    if not isinstance(s, str): return False
-    s = s.strip()
-    return s.startswith("0x") and len(s) == 42
-
-cand = sorted(set(a for a in tx["to_address"].dropna().tolist() if is_hex_addr(a)))
-
-# 4) 체크섬 변환 + getCode
-rows = []
-for i, a in enumerate(cand, 1):
-    try:
-        # checksum 변환 (소문자/대문자 무관)
-        cs = Web3.to_checksum_address(a)
-    except Exception:
-        print(f"[skip] invalid address format: {a}")
-        continue
-
-    # 컨트랙트 코드 유무
-    try:
-        code = w3.eth.get_code(cs)
-        is_contract = (code not in (b"", b"0x"))
-    except Exception as e:
-        print(f"[warn] get_code 실패({cs}): {e}; false로 표기")
-        is_contract = False
-
-    rows.append({
-        "address": cs,                 # 체크섬 보존
-        "address_lower": cs.lower(),   # 조인 편의용
-        "to_is_contract": is_contract
-    })
-
-    if i % 5 == 0:
-        time.sleep(SLEEP_MS / 1000.0)  # 무료 플랜: 천천히
-
-df = pd.DataFrame(rows).drop_duplicates(subset=["address_lower"])
-os.makedirs("out", exist_ok=True)
-df.to_csv("out/contract_flags.csv", index=False)
-print("contract flags written:", len(df))
+import os, sys, glob
+import pandas as pd
+from dotenv import load_dotenv
+from web3 import Web3
+import jsonrpc
+import rawstore
+import hexbin
+import metrics
+
+load_dotenv()
+FLAGS_PATH = "out/contract_flags.csv"
+# getCode 요청: 배치 크기 × 동시 배치 수(초당 요청 수는 jsonrpc 토큰 버킷 RPC_RATE 가 조절)
+GETCODE_BATCH_SIZE  = int(os.getenv("GETCODE_BATCH_SIZE", "20"))
+GETCODE_MAX_WORKERS = int(os.getenv("GETCODE_MAX_WORKERS", "2"))
+REFRESH = "--refresh" in sys.argv   # 기존 판정·RPC 캐시 무시하고 전부 다시 조회
+
+metrics.start("05_contract_flags")
+assert jsonrpc.is_connected(), "RPC 연결 실패"
+
+# 1) transactions_* 병합 (또는 선택본이 있으면 그걸 사용)
+tx_files = sorted(glob.glob("out/transactions_*.csv"))
+txfile = "out/transactions_selected.csv" if os.path.exists("out/transactions_selected.csv") else None
+if txfile:
+    tx = pd.read_csv(txfile, usecols=["hash", "to_address"])
+else:
+    if not tx_files:
+        metrics.fail("out/transactions_*.csv 가 없습니다. 4단계를 먼저 실행하세요.")
+    tx = pd.concat([pd.read_csv(f, usecols=["hash", "to_address"]) for f in tx_files], ignore_index=True)
+for f in [txfile] if txfile else tx_files:
+    metrics.read(f)
+
+# 2) 우리가 선별한 TX만 남기기(해시는 32바이트 정렬 배열로 포함 검사)
+if os.path.exists("out/tx_hashes.txt"):
+    sel = hexbin.load_hashes("out/tx_hashes.txt")
+    tx = tx[hexbin.isin(tx["hash"], sel)]
+metrics.add("rows_in", len(tx))
+
+# 3) 주소 정리: None/빈값 제거 + 길이/형식 검증
+def is_hex_addr(s: str) -> bool:
+    if not isinstance(s, str): return False
+    s = s.strip()
+    return s.startswith("0x") and len(s) == 42
+
+cand = {}
+for a in sorted(set(a for a in tx["to_address"].dropna().tolist() if is_hex_addr(a))):
+    try:
+        # checksum 변환 (소문자/대문자 무관)
+        cs = Web3.to_checksum_address(a)
+    except Exception:
+        print(f"[skip] invalid address format: {a}")
+        continue
+    cand[cs.lower()] = cs
+
+# 4) 기존 캐시: 이미 판정된 주소는 다시 조회하지 않음
+known = {}
+if os.path.exists(FLAGS_PATH) and not REFRESH:
+    old = pd.read_csv(FLAGS_PATH)
+    for a, cs, f in zip(old["address_lower"], old["address"], old["to_is_contract"]):
+        known[str(a).lower()] = (cs, bool(f))
+cached = sum(a in known for a in cand)
+
+# 5) 로그를 낸 주소는 컨트랙트 확정(RPC 불필요)
+emitters = set()
+for f in rawstore.files("logs"):
+    emitters.update(rawstore.read(f, "logs", columns=["address"])["address"].dropna().str.lower())
+    metrics.read(f)
+inferred = 0
+for a, cs in cand.items():
+    if a in emitters and a not in known:
+        known[a] = (cs, True)
+        inferred += 1
+
+# 6) 남은 주소만 eth_getCode 배치/동시 조회
+todo = [cs for a, cs in cand.items() if a not in known]
+print(f"candidates={len(cand)} cached={cached} from_logs={inferred} rpc={len(todo)}")
+with metrics.timer("get_code"):
+    res = jsonrpc.batch_call([("eth_getCode", [cs, "latest"]) for cs in todo],
+                             batch_size=GETCODE_BATCH_SIZE, max_workers=GETCODE_MAX_WORKERS, cache=not REFRESH)
+failed = 0
+for cs, code in zip(todo, res):
+    if code is None:
+        # 실패는 캐시에 남기지 않음 → 다음 실행에서 재시도
+        print(f"[warn] get_code 실패({cs}); 다음 실행에서 재시도")
+        failed += 1
+        continue
+    known[cs.lower()] = (cs, code not in ("", "0x"))
+
+rows = [{"address": cs,                 # 체크섬 보존
+         "address_lower": a,            # 조인 편의용
+         "to_is_contract": f} for a, (cs, f) in known.items()]
+df = pd.DataFrame(rows, columns=["address", "address_lower", "to_is_contract"])
+df = df.drop_duplicates(subset=["address_lower"]).sort_values("address_lower")
+os.makedirs("out", exist_ok=True)
+df.to_csv(FLAGS_PATH, index=False)
+metrics.add("rows_out", len(df))
+metrics.wrote(FLAGS_PATH)
+print("contract flags written:", len(df), f"(failed={failed})")
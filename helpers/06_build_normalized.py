@@ -1,114 +1,202 @@
-# helpers/06_build_normalized.py  (robust to optional/missing columns)
-import os, glob, pandas as pd
-
-def read_concat_csv(pattern, use=None, rename=None, drop_dupe_on=None):
-    """각 파일 헤더를 보고 교집합만 읽고, 누락 컬럼은 이후 보강."""
-    frames = []
-    files = sorted(glob.glob(pattern))
-    if not files:
-        raise SystemExit(f"No files matched: {pattern}")
-    for f in files:
-        cols = pd.read_csv(f, nrows=0).columns.str.strip().tolist()
-        take = [c for c in (use or cols) if c in cols]
-        df = pd.read_csv(f, usecols=take)
-        if rename:
-            df.rename(columns=rename, inplace=True)
-        frames.append(df)
-    out = pd.concat(frames, ignore_index=True)
-    if drop_dupe_on:
-        out = out.drop_duplicates(subset=drop_dupe_on)
-    return out
-
-# 1) blocks (우리가 쓰는 최소 컬럼만)
-blocks = read_concat_csv(
-    "out/blocks_*.csv",
-    use=["number","hash","timestamp"],
-    rename={"number":"block_number","hash":"block_hash","timestamp":"ts_utc"},
-    drop_dupe_on=["block_number"]
-)
-
-# 2) transactions (옵션 컬럼 존재 여부에 대응)
-#    최소 필수: hash, block_number, from_address, to_address, value, input
-tx_use_min = ["hash","block_number","from_address","to_address","value","input"]
-tx_opt     = ["type"]  # 있으면 읽고, 없으면 나중에 생성
-# 헤더를 한 번 보고 opt 중 실제로 있는 것만 추가
-any_tx = sorted(glob.glob("out/transactions_*.csv"))[:1]
-if not any_tx:
-    raise SystemExit("No transactions files. Run 04_export_blocks_txs.py first.")
-tx_cols0 = pd.read_csv(any_tx[0], nrows=0).columns.str.strip().tolist()
-tx_use = tx_use_min + [c for c in tx_opt if c in tx_cols0]
-
-txs = read_concat_csv(
-    "out/transactions_*.csv",
-    use=tx_use,
-    rename={"hash":"tx_hash","from_address":"from","to_address":"to","value":"value_wei"},
-    drop_dupe_on=["tx_hash"]
-)
-
-# 빠진 컬럼 보강
-for c in tx_opt:
-    if c not in txs.columns:
-        txs[c] = pd.NA
-
-# 3) receipts (effective_gas_price 없을 수도 있음)
-rcpt_use_min = ["transaction_hash","status","gas_used"]
-rcpt_opt     = ["effective_gas_price"]
-any_r = sorted(glob.glob("out/chunks/receipts_*.csv"))[:1]
-if not any_r:
-    raise SystemExit("No receipts files. Run 03_export_receipts_and_logs.py first.")
-r_cols0 = pd.read_csv(any_r[0], nrows=0).columns.str.strip().tolist()
-rcpt_use = rcpt_use_min + [c for c in rcpt_opt if c in r_cols0]
-
-rcpt = read_concat_csv(
-    "out/chunks/receipts_*.csv",
-    use=rcpt_use,
-    rename={"transaction_hash":"tx_hash"},
-    drop_dupe_on=["tx_hash"]
-)
-if "effective_gas_price" not in rcpt.columns:
-    rcpt["effective_gas_price"] = pd.NA
-
-# 4) 선별 TX로 제한 (필수는 아니지만 용량 감소)
-if os.path.exists("out/tx_hashes.txt"):
-    sel = set(open("out/tx_hashes.txt").read().splitlines())
-    txs = txs[txs["tx_hash"].isin(sel)]
-
-# 5) 조인 & 파생
-df = txs.merge(blocks, on="block_number", how="left") \
-        .merge(rcpt, on="tx_hash",      how="left")
-
-# 수치 파생
-df["gas_used"] = pd.to_numeric(df["gas_used"], errors="coerce")
-df["effective_gas_price"] = pd.to_numeric(df["effective_gas_price"], errors="coerce")
-df["gas_fee_eth"] = (df["gas_used"].fillna(0) * df["effective_gas_price"].fillna(0)) / 1e18
-df["input"] = df["input"].fillna("0x")
-df["input_selector"] = df["input"].str.slice(0,10)
-
-# 6) to_is_contract 조인 (lower 키로 안전하게)
-if os.path.exists("out/contract_flags.csv"):
-    flags = pd.read_csv("out/contract_flags.csv")  # address, address_lower, to_is_contract
-    # 주소가 없는 경우 대비
-    df["to_lower"] = df["to"].fillna("").str.lower()
-    flags = flags.drop_duplicates(subset=["address_lower"])
-    df = df.merge(flags[["address_lower","to_is_contract"]],
-                  left_on="to_lower", right_on="address_lower", how="left") \
-           .drop(columns=["address_lower"])
-else:
-    df["to_is_contract"] = pd.NA
-
-# 7) 출력 스키마(우리 표)
-cols = [
-    "block_number","block_hash","ts_utc",
-    "tx_hash","from","to","type",
-    "status","value_wei",
-    "gas_used","effective_gas_price","gas_fee_eth",
-    "input","input_selector","to_is_contract"
-]
-# 일부 파일에 'type'이 없던 케이스 보강
-for c in cols:
-    if c not in df.columns:
-        df[c] = pd.NA
-
-os.makedirs("out", exist_ok=True)
-df[cols].to_csv("out/normalized.csv", index=False)
-print("normalized rows:", len(df))
+# helpers/06_build_normalized.py  (robust to optional/missing columns)
+# - 블록 구간 파티션 단위 out-of-core 빌드(메모리 상한 ≈ 입력 청크 1개 + 파티션 1개)
+#   1) blocks/transactions/receipts 를 NORM_CHUNK_ROWS 행씩 읽어 block_number 구간별 임시 parquet 로 나눔
+#   2) 파티션마다 로컬 조인 → out/normalized/blocks=<구간>.csv (normstore: 원자적 교체 + 카탈로그)
+#   세 입력 모두 block_number 로 나뉘므로 파티션 조인 결과 = 전체 조인 결과
+# - 증분: 카탈로그에 입력 파일별 (size, mtime)·걸친 구간을 남겨 두고, 다음 실행에서는
+#   새로/바뀐/없어진 입력 파일이 걸친 구간 + 선별 TX(tx_hashes)가 바뀐 구간
+#   + contract_flags 가 바뀌었을 때 플래그 없던 행이 있는 구간만 다시 조인(그 구간의 다른 입력 파일도 읽음)
+#   --full: 전부 다시 빌드 / NORM_EXPORT=경로: 끝나고 단일 CSV 로도 내보냄(기존 out/normalized.csv 소비자용)
+# - 입력 값은 문자열 그대로 옮김(파일/파티션마다 dtype 추론이 달라 2 → 2.0 처럼 바뀌지 않도록)
+import os, sys, glob, hashlib, tempfile, pandas as pd
+import rawstore
+import normstore
+import hexbin
+import metrics
+
+NORM_CHUNK_ROWS = int(os.getenv("NORM_CHUNK_ROWS", "200000"))
+NORM_DIR        = os.getenv("NORM_DIR", "out/normalized")
+NORM_EXPORT     = os.getenv("NORM_EXPORT", "")
+metrics.start("06_normalized")
+
+def csv_batches(f, use):
+    """파일 헤더를 보고 있는 열만 청크로 읽고, 누락 컬럼은 NA 로 보강."""
+    cols = pd.read_csv(f, nrows=0).columns.str.strip().tolist()
+    take = [c for c in use if c in cols]
+    for df in pd.read_csv(f, usecols=take, dtype=str, chunksize=NORM_CHUNK_ROWS):
+        yield df.reindex(columns=use)
+
+def spill(batches, name, key, tmp, order, only=None):
+    """
+    batches 를 key(block_number) 구간별 parquet 조각으로 저장. only: 이 구간들만 저장.
+    조각 이름 = (입력 파일 순번, 일련번호) → 읽는 순서와 무관하게 전체 빌드와 같은 행 순서.
+    반환: 입력에 있던 구간 전체(only 와 무관).
+    """
+    seen, n = set(), 0
+    for df in batches:
+        metrics.add("rows_in", len(df))
+        df = df.astype("string")
+        part = pd.to_numeric(df[key]) // normstore.PARTITION_BLOCKS * normstore.PARTITION_BLOCKS
+        for p, sub in df.groupby(part, sort=False):
+            seen.add(int(p))
+            if only is not None and int(p) not in only:
+                continue
+            d = os.path.join(tmp, name, str(int(p)))
+            os.makedirs(d, exist_ok=True)
+            sub.to_parquet(os.path.join(d, f"{order:06d}-{n:08d}.parquet"), index=False)
+            n += 1
+    return seen
+
+def load(tmp, name, p, cols):
+    files = sorted(glob.glob(os.path.join(tmp, name, str(p), "*.parquet")))
+    if not files:
+        return pd.DataFrame({c: pd.Series(dtype="string") for c in cols})
+    return pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+
+# 1) blocks (우리가 쓰는 최소 컬럼만)
+blk_use = ["number","hash","timestamp"]
+# 2) transactions — 최소 필수: hash, block_number, from_address, to_address, value, input (+ type 있으면)
+tx_use  = ["hash","block_number","from_address","to_address","value","input","type"]
+# 3) receipts (effective_gas_price 없을 수도 있음) — rawstore(parquet) 또는 레거시 CSV 청크
+r_use   = ["transaction_hash","block_number","status","gas_used","effective_gas_price"]
+if not glob.glob("out/blocks_*.csv"):
+    metrics.fail("No files matched: out/blocks_*.csv")
+if not glob.glob("out/transactions_*.csv"):
+    metrics.fail("No transactions files. Run 04_export_blocks_txs.py first.")
+if not rawstore.files("receipts"):
+    metrics.fail("No receipts files. Run 03_export_receipts_and_logs.py first.")
+
+# 4) 선별 TX로 제한 (필수는 아니지만 용량 감소) — 32바이트 정렬 배열(파이썬 set 대비 1/4 이하 메모리)
+sel = None
+if os.path.exists("out/tx_hashes.txt"):
+    sel = hexbin.load_hashes("out/tx_hashes.txt")
+
+# 6) to_is_contract 조인용 (lower 키로 안전하게)
+flags = None
+if os.path.exists("out/contract_flags.csv"):
+    flags = pd.read_csv("out/contract_flags.csv")  # address, address_lower, to_is_contract
+    flags = flags.drop_duplicates(subset=["address_lower"])[["address_lower","to_is_contract"]]
+
+# 7) 출력 스키마(우리 표)
+cols = [
+    "block_number","block_hash","ts_utc",
+    "tx_hash","from","to","type",
+    "status","value_wei",
+    "gas_used","effective_gas_price","gas_fee_eth",
+    "input","input_selector","to_is_contract"
+]
+
+def build_partition(blocks, txs, rcpt):
+    blocks = blocks.drop_duplicates(subset=["number"]).rename(
+        columns={"number":"block_number","hash":"block_hash","timestamp":"ts_utc"})
+    txs = txs.drop_duplicates(subset=["hash"]).rename(
+        columns={"hash":"tx_hash","from_address":"from","to_address":"to","value":"value_wei"})
+    rcpt = rcpt.drop_duplicates(subset=["transaction_hash"]).rename(
+        columns={"transaction_hash":"tx_hash"}).drop(columns=["block_number"])
+    if sel is not None:
+        txs = txs[hexbin.isin(txs["tx_hash"], sel)]
+
+    # 5) 조인 & 파생
+    df = txs.merge(blocks, on="block_number", how="left") \
+            .merge(rcpt, on="tx_hash",      how="left")
+    gas = pd.to_numeric(df["gas_used"], errors="coerce")
+    egp = pd.to_numeric(df["effective_gas_price"], errors="coerce")
+    df["gas_fee_eth"] = (gas.fillna(0) * egp.fillna(0)) / 1e18
+    df["input"] = df["input"].fillna("0x")
+    df["input_selector"] = df["input"].str.slice(0,10)
+
+    if flags is not None:
+        # 주소가 없는 경우 대비
+        df["to_lower"] = df["to"].fillna("").str.lower()
+        df = df.merge(flags, left_on="to_lower", right_on="address_lower", how="left") \
+               .drop(columns=["address_lower"])
+    else:
+        df["to_is_contract"] = pd.NA
+    for c in cols:
+        if c not in df.columns:
+            df[c] = pd.NA
+    return df[cols]
+
+# ── 증분 판단 ────────────────────────────────────────────────────
+def stamp(f):
+    st = os.stat(f)
+    return [st.st_size, st.st_mtime_ns]
+
+def selection_keys():
+    """구간별 선별 TX 지문. tx_blocks.csv 로 구간을 알 수 없으면 tx_hashes.txt 전체 지문 하나를 모든 구간에."""
+    if not os.path.exists("out/tx_hashes.txt"):
+        return {}, "-"
+    whole = hashlib.sha1(open("out/tx_hashes.txt", "rb").read()).hexdigest()
+    if not os.path.exists("out/tx_blocks.csv"):
+        return {}, whole
+    tb = pd.read_csv("out/tx_blocks.csv", dtype=str).dropna()
+    tb = tb[hexbin.isin(tb.iloc[:, 0], sel)]
+    if len(tb) != len(sel):
+        return {}, whole
+    part = pd.to_numeric(tb.iloc[:, 1]) // normstore.PARTITION_BLOCKS * normstore.PARTITION_BLOCKS
+    keys = {int(p): hashlib.sha1("\n".join(sorted(g.iloc[:, 0].str.lower())).encode()).hexdigest()
+            for p, g in tb.groupby(part)}
+    return keys, ""
+
+table = normstore.open_table(NORM_DIR, reset="--full" in sys.argv, owner="06")
+prev_inputs = table.get("inputs", {})     # 경로 → {"stamp": [size, mtime_ns], "parts": [구간, ...]}
+kinds = [  # (이름, 파일 목록, 읽기, block_number 열)
+    ("blocks",   sorted(glob.glob("out/blocks_*.csv")),       lambda f: csv_batches(f, blk_use), "number"),
+    ("txs",      sorted(glob.glob("out/transactions_*.csv")), lambda f: csv_batches(f, tx_use), "block_number"),
+    ("receipts", rawstore.files("receipts"),
+     lambda f: rawstore.iter_batches("receipts", r_use, NORM_CHUNK_ROWS, as_str=True, paths=[f]), "block_number"),
+]
+current = {f for _, fs, _, _ in kinds for f in fs}
+changed = {f for f in current if prev_inputs.get(f, {}).get("stamp") != stamp(f)}
+removed = set(prev_inputs) - current
+sel_keys, sel_default = selection_keys()
+prev_sel = table.get("selection", {"default": None, "parts": {}})
+flags_stamp = stamp("out/contract_flags.csv") if flags is not None else None
+
+# 바뀐 입력이 예전에 걸쳤던 구간, 선별 TX 가 바뀐 구간(입력이 있는 구간 중), 플래그가 바뀌었고 플래그 없던 행이 있던 구간
+affected = {p for f in changed | removed for p in prev_inputs.get(f, {}).get("parts", [])}
+known = {p for f, v in prev_inputs.items() if f in current for p in v["parts"]}
+affected |= {p for p in known
+             if prev_sel["parts"].get(str(p), prev_sel["default"]) != sel_keys.get(p, sel_default)}
+if flags_stamp != table.get("flags"):
+    affected |= {p["start"] for p in normstore.partitions(table) if p.get("unflagged", 1)}
+
+os.makedirs("out", exist_ok=True)
+n = 0
+inputs = {f: v for f, v in prev_inputs.items() if f in current}
+with tempfile.TemporaryDirectory(dir="out") as tmp:
+    # 1) 바뀐 입력은 전부 나눠 두고(걸친 구간 = 다시 만들 구간)
+    for name, fs, batches, key in kinds:
+        for i, f in enumerate(fs):
+            if f in changed:
+                metrics.read(f)
+                parts = spill(batches(f), name, key, tmp, i)
+                inputs[f] = {"stamp": stamp(f), "parts": sorted(parts)}
+                affected |= parts
+    # 2) 다시 만들 구간에 걸친 나머지 입력은 그 구간 행만
+    for name, fs, batches, key in kinds:
+        for i, f in enumerate(fs):
+            if f not in changed and affected & set(inputs[f]["parts"]):
+                metrics.read(f)
+                spill(batches(f), name, key, tmp, i, only=affected)
+
+    # 3) 구간마다 조인 → 파티션 교체(행이 없어진 구간은 삭제)
+    for p in sorted(affected):
+        df = build_partition(load(tmp, "blocks", p, blk_use),
+                             load(tmp, "txs", p, tx_use),
+                             load(tmp, "receipts", p, r_use))
+        if df.empty:
+            normstore.drop_partition(table, p)
+            continue
+        unflagged = int((df["to"].notna() & (df["to"] != "") & df["to_is_contract"].isna()).sum())
+        metrics.wrote(normstore.write_partition(table, p, df, "csv", unflagged=unflagged))
+        n += len(df)
+table["inputs"], table["flags"] = inputs, flags_stamp
+table["selection"] = {"default": sel_default, "parts": {str(p): k for p, k in sel_keys.items()}}
+normstore.save(table)
+total = sum(p["rows"] for p in normstore.partitions(table))
+if NORM_EXPORT:
+    normstore.export(table, NORM_EXPORT)
+    metrics.wrote(NORM_EXPORT)
+metrics.add("rows_out", n)
+print(f"normalized rows: {total} (partitions={len(table['partitions'])}, rebuilt={len(affected)} rows={n})")
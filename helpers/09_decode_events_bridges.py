@@ -1,339 +1,579 @@
-# helpers/run_pipeline_with_etl.py
-# - 중간 파일은 OS 임시 폴더에만 잠깐 생성/즉시 삭제. 최종물만 out/ 저장
-# - ethereum-etl==2.4.2 가정: receipts는 --transaction-hashes만 사용
-# - 429(CUPS) 자동 재시도(동시성/배치 다운시프트), web3 미사용
-
-import os, sys, json, subprocess, tempfile, math, shlex, time
-from pathlib import Path
-import pandas as pd
-from dotenv import load_dotenv
-from eth_abi import decode as abi_decode
-from eth_utils import to_checksum_address
-import requests
-
-load_dotenv(dotenv_path=".env")
-RPC_URL         = os.getenv("RPC_URL")
-OUT_DIR         = Path(os.getenv("OUT_DIR", "out"))
-OUTPUT_FORMAT   = os.getenv("OUTPUT_FORMAT", "parquet").lower()
-SAFE_LAG        = int(os.getenv("SAFE_LAG", "12"))
-
-# 보수적 기본값(Alchemy 무료/체험 안전)
-ETL_MAX_WORKERS = int(os.getenv("ETL_MAX_WORKERS", "1"))
-ETL_BATCH_SIZE  = int(os.getenv("ETL_BATCH_SIZE",  "2"))
-RECEIPTS_MAX_WORKERS = int(os.getenv("RECEIPTS_MAX_WORKERS", ETL_MAX_WORKERS))
-RECEIPTS_BATCH_SIZE  = int(os.getenv("RECEIPTS_BATCH_SIZE",  ETL_BATCH_SIZE))
-TX_HASH_CHUNK   = int(os.getenv("TX_HASH_CHUNK", "500"))
-USE_TXS_FROM_BLOCKS = os.getenv("USE_TXS_FROM_BLOCKS", "0") == "1"
-
-ETL_BIN   = os.getenv("ETL_BIN", 'python -m pipx run --spec "ethereum-etl==2.4.2" ethereumetl')
-ETL_PREFIX = shlex.split(ETL_BIN)
-
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-
-# ---------- JSON-RPC ----------
-def rpc(method, params=None, timeout=30):
-    payload = {"jsonrpc":"2.0","id":1,"method":method,"params":params or []}
-    r = requests.post(RPC_URL, json=payload, timeout=timeout)
-    r.raise_for_status()
-    data = r.json()
-    if "error" in data:
-        raise RuntimeError(data["error"])
-    return data["result"]
-
-def latest_safe_block():
-    latest_hex = rpc("eth_blockNumber")
-    latest = int(latest_hex, 16)
-    return max(0, latest - SAFE_LAG)
-
-# ---------- 실행 헬퍼 ----------
-def run_cli(args_list):
-    full = ETL_PREFIX + args_list
-    print(">>", " ".join(shlex.quote(a) for a in full))
-    cp = subprocess.run(full, capture_output=True, text=True, shell=False)
-    if cp.stdout:
-        print(cp.stdout, end="")
-    if cp.stderr:
-        print(cp.stderr, end="", file=sys.stderr)
-    return cp.returncode
-
-def run_cli_or_raise(args_list):
-    code = run_cli(args_list)
-    if code != 0:
-        raise RuntimeError(f"Command failed (exit={code})")
-
-def save_df(df: pd.DataFrame, name: str):
-    path = OUT_DIR / f"{name}.{'parquet' if OUTPUT_FORMAT=='parquet' else 'csv'}"
-    if OUTPUT_FORMAT == "parquet":
-        df.to_parquet(path, index=False)
-    else:
-        df.to_csv(path, index=False)
-    print(f"[saved] {path}")
-
-# ---------- 디코딩 유틸 ----------
-def topic_to_addr(topic_hex: str) -> str:
-    try:
-        if not isinstance(topic_hex, str) or not topic_hex.startswith("0x"): return ""
-        return to_checksum_address("0x" + topic_hex[-40:])
-    except Exception:
-        return ""
-
-def ensure_topic_cols(logs: pd.DataFrame):
-    # topic0..topic2 없고 'topics'만 있으면 파싱해서 생성
-    need = any(c not in logs.columns for c in ["topic0","topic1","topic2"])
-    if need and "topics" in logs.columns:
-        def pick(topic_str, idx):
-            try:
-                arr = json.loads(topic_str) if isinstance(topic_str, str) else []
-                return arr[idx] if len(arr) > idx else None
-            except Exception:
-                return None
-        logs["topic0"] = logs["topics"].apply(lambda s: pick(s,0))
-        logs["topic1"] = logs["topics"].apply(lambda s: pick(s,1))
-        logs["topic2"] = logs["topics"].apply(lambda s: pick(s,2))
-    for c in ["topic0","topic1","topic2","data","address","transaction_hash","log_index"]:
-        if c not in logs.columns:
-            logs[c] = pd.NA
-    return logs
-
-def decode_all_df(logs: pd.DataFrame, topics_json: str, addresses_json: str):
-    topics = json.load(open(topics_json))
-    addrs  = json.load(open(addresses_json))
-    BRIDGES = {a.lower() for a in addrs.get("bridges", [])}
-
-    logs = logs.copy()
-    logs.columns = [c.lower() for c in logs.columns]
-    logs = ensure_topic_cols(logs)
-
-    # ERC20 Transfer
-    tf = logs[logs["topic0"].astype(str).str.lower() == topics["erc20_transfer"].lower()].copy()
-    tf["from"] = tf["topic1"].astype(str).apply(topic_to_addr).str.lower()
-    tf["to"]   = tf["topic2"].astype(str).apply(topic_to_addr).str.lower()
-    tf["amount_raw"] = tf["data"].astype(str).apply(lambda x: int(x,16) if isinstance(x,str) and x.startswith("0x") else 0)
-    transfers = tf[["transaction_hash","log_index","address","from","to","amount_raw"]].rename(
-        columns={"transaction_hash":"tx_hash","address":"token_address"})
-
-    # Uniswap V2/V3
-    v2 = logs[logs["topic0"].astype(str).str.lower() == topics["univ2_swap"].lower()].copy()
-    v3 = logs[logs["topic0"].astype(str).str.lower() == topics["univ3_swap"].lower()].copy()
-
-    def _decode_v2(row):
-        d = row["data"]
-        if isinstance(d, str) and d.startswith("0x"):
-            a0i,a1i,a0o,a1o = abi_decode(["uint256","uint256","uint256","uint256"], bytes.fromhex(d[2:]))
-            return pd.Series([a0i,a1i,a0o,a1o])
-        return pd.Series([0,0,0,0])
-    if not v2.empty:
-        v2[["a0i","a1i","a0o","a1o"]] = v2.apply(_decode_v2, axis=1)
-    else:
-        v2[["a0i","a1i","a0o","a1o"]] = 0
-
-    def _decode_v3(row):
-        d = row["data"]
-        if isinstance(d, str) and d.startswith("0x"):
-            a0,a1,_,_,_ = abi_decode(["int256","int256","uint160","uint128","int24"], bytes.fromhex(d[2:]))
-            return pd.Series([a0,a1])
-        return pd.Series([0,0])
-    if not v3.empty:
-        v3[["a0","a1"]] = v3.apply(_decode_v3, axis=1)
-    else:
-        v3[["a0","a1"]] = 0
-
-    swaps_v2 = v2[["transaction_hash","log_index","address","a0i","a1i","a0o","a1o"]].rename(
-        columns={"transaction_hash":"tx_hash","address":"pair_or_pool"})
-    swaps_v2["dex"]="UNI-V2"
-
-    swaps_v3 = v3[["transaction_hash","log_index","address","a0","a1"]].rename(
-        columns={"transaction_hash":"tx_hash","address":"pair_or_pool"})
-    swaps_v3["dex"]="UNI-V3"
-
-    swaps = pd.concat([swaps_v2, swaps_v3], ignore_index=True)
-
-    # Wormhole (sequence/nonce 간이 추출)
-    worm = logs[logs["topic0"].astype(str).str.lower() == topics["wormhole_log"].lower()].copy()
-    def _decode_worm(row):
-        d = row["data"]
-        if isinstance(d, str) and d.startswith("0x"):
-            try:
-                seq, nonce = abi_decode(["uint64","uint32"], bytes.fromhex(d[2:12*2]))
-                return pd.Series([str(seq), str(nonce)])
-            except Exception:
-                pass
-        return pd.Series([None, None])
-    if not worm.empty:
-        worm[["sequence","nonce"]] = worm.apply(_decode_worm, axis=1)
-    bridges = worm[["transaction_hash","log_index","sequence","nonce"]].rename(columns={"transaction_hash":"tx_hash"})
-
-    if not bridges.empty and not transfers.empty and BRIDGES:
-        tsub = transfers[transfers["to"].isin(BRIDGES)]
-        est = tsub.groupby("tx_hash").head(1)[["tx_hash","amount_raw","token_address"]]
-        bridges = bridges.merge(est, on="tx_hash", how="left")
-
-    return transfers, swaps, bridges
-
-# ---------- 429 대응: receipts 청크 실행 + 다운시프트 ----------
-def run_receipts_chunk(txfile: Path, rcpt_path: Path, logs_path: Path,
-                       max_workers: int, batch_size: int,
-                       max_retries: int = 4, backoff: float = 2.0):
-    attempt = 0
-    mw, bs = max_workers, batch_size
-    while True:
-        attempt += 1
-        code = run_cli([
-            "export_receipts_and_logs",
-            "--transaction-hashes", str(txfile),
-            "--provider-uri", RPC_URL,
-            "--max-workers",  str(mw),
-            "--batch-size",   str(bs),
-            "--receipts-output", str(rcpt_path),
-            "--logs-output",     str(logs_path),
-        ])
-        if code == 0:
-            return
-        # stderr에 429가 찍혔는지 여부는 여기선 코드만 보고 보수적으로 다운시프트
-        if mw > 1:
-            mw = max(1, mw // 2)
-        elif bs > 1:
-            bs = max(1, bs // 2)
-        else:
-            raise RuntimeError(f"receipts chunk failed (exit={code}) and no more downshift")
-        sleep_s = backoff ** attempt
-        print(f"[retry {attempt}] receipts downshift → workers={mw}, batch={bs}; {sleep_s:.1f}s sleep")
-        time.sleep(sleep_s)
-
-# ---------- 메인 ----------
-def main(start_block: int, end_block: int, safe: bool = True):
-    if safe:
-        end_block = min(end_block, latest_safe_block())
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        TMP = Path(tmpdir)
-
-        # 1) 토큰 전송 기반 해시 수집
-        token_csv = TMP/"token_transfers.csv"
-        run_cli_or_raise([
-            "export_token_transfers",
-            "--start-block", str(start_block),
-            "--end-block",   str(end_block),
-            "--provider-uri", RPC_URL,
-            "--max-workers",  str(ETL_MAX_WORKERS),
-            "--batch-size",   str(ETL_BATCH_SIZE),
-            "--output",       str(token_csv),
-        ])
-        tx_hashes = set()
-        if token_csv.exists():
-            df_tt = pd.read_csv(token_csv, usecols=["transaction_hash"])
-            tx_hashes = set(df_tt["transaction_hash"].dropna().tolist())
-
-        # (옵션) 블록 전체 TX 포함
-        if USE_TXS_FROM_BLOCKS:
-            txs_csv = TMP/f"txs_{start_block}_{end_block}.csv"
-            blocks_csv = TMP/f"blocks_{start_block}_{end_block}.csv"
-            run_cli_or_raise([
-                "export_blocks_and_transactions",
-                "--start-block", str(start_block),
-                "--end-block",   str(end_block),
-                "--provider-uri", RPC_URL,
-                "--max-workers",  str(ETL_MAX_WORKERS),
-                "--batch-size",   str(ETL_BATCH_SIZE),
-                "--blocks-output",       str(blocks_csv),
-                "--transactions-output", str(txs_csv),
-            ])
-            df_txs = pd.read_csv(txs_csv, usecols=["hash"])
-            tx_hashes |= set(df_txs["hash"].dropna().tolist())
-
-        tx_hashes = sorted(tx_hashes)
-        if not tx_hashes:
-            print("no tx found in the given range"); return
-
-        # 2) receipts/logs: 청크 + 즉시 로드 + 즉시 삭제
-        receipts_list = []
-        logs_list = []
-        total = len(tx_hashes)
-        chunks = math.ceil(total / TX_HASH_CHUNK)
-        for i in range(chunks):
-            sub = tx_hashes[i*TX_HASH_CHUNK:(i+1)*TX_HASH_CHUNK]
-            txfile = TMP/f"tx_{i}.txt"
-            rcpt_csv = TMP/f"rcpt_{i}.csv"
-            logs_csv = TMP/f"logs_{i}.csv"
-            Path(txfile).write_text("\n".join(sub))
-            run_receipts_chunk(
-                txfile=txfile,
-                rcpt_path=rcpt_csv,
-                logs_path=logs_csv,
-                max_workers=RECEIPTS_MAX_WORKERS,
-                batch_size=RECEIPTS_BATCH_SIZE,
-            )
-            receipts_list.append(pd.read_csv(rcpt_csv))
-            logs_list.append(pd.read_csv(logs_csv))
-            # 청크 파일 즉시 삭제
-            for p in [txfile, rcpt_csv, logs_csv]:
-                try: p.unlink()
-                except: pass
-
-        rcpt_df = pd.concat(receipts_list, ignore_index=True)
-        logs_df = pd.concat(logs_list, ignore_index=True)
-
-        # 3) blocks & transactions — receipts 등장 블록만
-        r = rcpt_df[["block_number","transaction_hash","status","gas_used","effective_gas_price"]].copy()
-        bmin, bmax = int(r["block_number"].min()), int(r["block_number"].max())
-        blocks_csv2 = TMP/f"blocks_{bmin}_{bmax}.csv"
-        txs_csv2    = TMP/f"txs_{bmin}_{bmax}.csv"
-        run_cli_or_raise([
-            "export_blocks_and_transactions",
-            "--start-block", str(bmin),
-            "--end-block",   str(bmax),
-            "--provider-uri", RPC_URL,
-            "--max-workers",  str(ETL_MAX_WORKERS),
-            "--batch-size",   str(ETL_BATCH_SIZE),
-            "--blocks-output",       str(blocks_csv2),
-            "--transactions-output", str(txs_csv2),
-        ])
-        blocks = pd.read_csv(blocks_csv2, usecols=["number","hash","timestamp"]).rename(
-            columns={"number":"block_number","hash":"block_hash","timestamp":"ts_utc"})
-        txs = pd.read_csv(txs_csv2, usecols=["hash","block_number","from_address","to_address","value","input","type"]).rename(
-            columns={"hash":"tx_hash","from_address":"from","to_address":"to","value":"value_wei"})
-        # 즉시 삭제
-        for p in [blocks_csv2, txs_csv2]:
-            try: Path(p).unlink()
-            except: pass
-
-        # 4) 정규화 (최종만 저장)
-        r = r.rename(columns={"transaction_hash":"tx_hash"})
-        txs = txs[txs["tx_hash"].isin(tx_hashes)]
-        df = (txs.merge(blocks, on="block_number", how="left")
-                 .merge(r,      on="tx_hash",      how="left"))
-        df["gas_fee_eth"]    = (df["gas_used"].fillna(0) * df["effective_gas_price"].fillna(0)) / 1e18
-        df["input_selector"] = df["input"].fillna("0x").str.slice(0,10)
-        df["to_is_contract"] = pd.NA
-        cols = ["block_number","block_hash","ts_utc","tx_hash","from","to","type","status","value_wei",
-                "gas_used","effective_gas_price","gas_fee_eth","input","input_selector","to_is_contract"]
-        save_df(df[cols], "normalized")
-
-        # 5) 디코딩(메모리 로그 → 최종만 저장)
-        transfers, swaps, bridges = decode_all_df(
-            logs=logs_df,
-            topics_json=str(Path("config/topics.json")),
-            addresses_json=str(Path("config/addresses.json")),
-        )
-        if not transfers.empty: save_df(transfers, "transfers")
-        if not swaps.empty:     save_df(swaps, "dex_swaps")
-        if not bridges.empty:   save_df(bridges, "bridge_events")
-
-        print("DONE",
-              len(df), "normalized;",
-              0 if transfers is None else len(transfers), "transfers;",
-              0 if swaps is None else len(swaps), "swaps;",
-              0 if bridges is None else len(bridges), "bridges.")
-
-if __name__ == "__main__":
-    import argparse
-    p = argparse.ArgumentParser()
-    p.add_argument("--start", type=int, required=True)
-    p.add_argument("--end",   type=int, required=True)
-    p.add_argument("--safe",  action="store_true")
-    a = p.parse_args()
-    t0 = time.perf_counter()
-    if a.safe:
-        print(f"[safe] latest_safe={latest_safe_block()}")
-    main(a.start, a.end, a.safe)
-    print(f"\n⏱ {time.perf_counter() - t0:.2f}s")
+# helpers/run_pipeline_with_etl.py
+# - 중간 파일은 OS 임시 폴더에만 잠깐 생성/즉시 삭제. 최종물만 out/ 저장
+# - ethereum-etl==2.4.2 가정(token transfers/blocks), receipts 는 receipts 모듈로 프로세스 내 배치 수집
+# - 429(CUPS) 대응은 jsonrpc 공용 클라이언트(토큰 버킷 + Retry-After, 성공이 이어지면 속도 회복), web3 미사용
+
+import os, sys, json, subprocess, tempfile, math, shlex, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+from evtdecode import (event, decode_event, expand,
+                       decode_v2_swap_data, decode_v3_swap_data, decode_wormhole)
+from logscan import route
+import jsonrpc
+import receipts
+import amounts
+import normstore
+import metrics
+
+load_dotenv(dotenv_path=".env")
+RPC_URL         = os.getenv("RPC_URL")
+OUT_DIR         = Path(os.getenv("OUT_DIR", "out"))
+OUTPUT_FORMAT   = os.getenv("OUTPUT_FORMAT", "parquet").lower()
+SAFE_LAG        = int(os.getenv("SAFE_LAG", "12"))
+# --follow: 최신-SAFE_LAG 를 작은 배치로 따라감. 최근 REORG_WINDOW 블록은 해시를 기억해 재편성(reorg) 검사
+FOLLOW_BATCH    = max(1, int(os.getenv("FOLLOW_BATCH", "20")))
+FOLLOW_POLL_S   = float(os.getenv("FOLLOW_POLL_S", "4"))
+FOLLOW_BACKOFF_MAX = float(os.getenv("FOLLOW_BACKOFF_MAX", "60"))
+REORG_WINDOW    = int(os.getenv("REORG_WINDOW", "64"))
+
+# 보수적 기본값(Alchemy 무료/체험 안전)
+ETL_MAX_WORKERS = int(os.getenv("ETL_MAX_WORKERS", "1"))
+ETL_BATCH_SIZE  = int(os.getenv("ETL_BATCH_SIZE",  "2"))
+RECEIPTS_MAX_WORKERS = int(os.getenv("RECEIPTS_MAX_WORKERS", ETL_MAX_WORKERS))
+RECEIPTS_BATCH_SIZE  = int(os.getenv("RECEIPTS_BATCH_SIZE",  ETL_BATCH_SIZE))
+TX_HASH_CHUNK   = int(os.getenv("TX_HASH_CHUNK", "500"))
+# 받는 중/받아 둔 receipts 청크 최대 개수(디코딩 중인 1개 별도) → 메모리 상한
+PIPELINE_INFLIGHT = max(1, int(os.getenv("PIPELINE_INFLIGHT", "2")))
+USE_TXS_FROM_BLOCKS = os.getenv("USE_TXS_FROM_BLOCKS", "0") == "1"
+
+ETL_BIN   = os.getenv("ETL_BIN", 'python -m pipx run --spec "ethereum-etl==2.4.2" ethereumetl')
+ETL_PREFIX = shlex.split(ETL_BIN)
+
+OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+# ---------- JSON-RPC ----------
+def latest_safe_block():
+    return max(0, jsonrpc.block_number() - SAFE_LAG)
+
+# ---------- 실행 헬퍼 ----------
+def run_cli(args_list):
+    full = ETL_PREFIX + args_list
+    print(">>", " ".join(shlex.quote(a) for a in full))
+    with metrics.timer(f"etl:{args_list[0]}"):
+        cp = subprocess.run(full, capture_output=True, text=True, shell=False)
+    if cp.stdout:
+        print(cp.stdout, end="")
+    if cp.stderr:
+        print(cp.stderr, end="", file=sys.stderr)
+    return cp.returncode
+
+def run_cli_or_raise(args_list):
+    code = run_cli(args_list)
+    if code != 0:
+        raise RuntimeError(f"Command failed (exit={code})")
+
+# 이벤트 출력(배치 실행): 청크 결과를 임시 파일에 이어 쓰고 끝나면 os.replace — 한 번에 쓰던 save_df 와 같은 파일
+#   parquet 은 ParquetWriter(행 그룹 = 청크), 열 형식은 log_index 만 정수 나머지 문자열로 고정(청크마다 추론이 달라지지 않게)
+#   행이 하나도 없으면 파일을 만들지 않음(이전과 같음)
+def open_out(name: str):
+    path = OUT_DIR / f"{name}.{'parquet' if OUTPUT_FORMAT=='parquet' else 'csv'}"
+    return {"path": path, "tmp": path.with_name(f".{path.name}.tmp"), "rows": 0, "writer": None, "file": None}
+
+def append_out(w, df: pd.DataFrame):
+    if df.empty:
+        return
+    if OUTPUT_FORMAT == "parquet":
+        schema = pa.schema([(c, pa.int64() if c == "log_index" else pa.string()) for c in df.columns])
+        cols = {c: (df[c].to_numpy() if c == "log_index" else
+                    [None if pd.isna(v) else str(v) for v in df[c]]) for c in df.columns}
+        table = pa.Table.from_pydict(cols, schema=schema)
+        if w["writer"] is None:
+            w["writer"] = pq.ParquetWriter(str(w["tmp"]), schema)
+        w["writer"].write_table(table)
+    else:
+        if w["file"] is None:
+            w["file"] = open(w["tmp"], "w", newline="")
+        df.to_csv(w["file"], index=False, header=w["rows"] == 0)
+    w["rows"] += len(df)
+
+def close_out(w):
+    for k in ("writer", "file"):
+        if w[k] is not None:
+            w[k].close()
+    if w["rows"]:
+        os.replace(w["tmp"], w["path"])
+        metrics.add("rows_out", w["rows"])
+        metrics.wrote(str(w["path"]))
+        print(f"[saved] {w['path']}")
+
+def abort_out(w):
+    for k in ("writer", "file"):
+        if w[k] is not None:
+            w[k].close()
+    if w["tmp"].exists():
+        w["tmp"].unlink()
+
+# 정규화 표는 블록 구간 파티션(normstore)에 이번 범위만 upsert — 다른 범위의 기존 행은 그대로
+# 06 의 out/normalized 와 따로(06 은 자기 입력으로 파티션을 다시 만들므로 같은 표를 쓰면 09 행이 지워짐)
+NORM09_DIR = Path(os.getenv("NORM09_DIR", str(OUT_DIR / "normalized_09")))
+NORM_COLS = ["block_number","block_hash","ts_utc","tx_hash","from","to","type","status","value_wei",
+             "gas_used","effective_gas_price","gas_fee_eth","input","input_selector","to_is_contract"]
+
+def save_normalized(df: pd.DataFrame, start_block: int, end_block: int):
+    table = normstore.open_table(str(NORM09_DIR), owner="09")
+    touched = normstore.upsert(table, df, start_block, end_block,
+                               fmt="parquet" if OUTPUT_FORMAT == "parquet" else "csv")
+    metrics.add("rows_out", len(df))
+    for f in normstore.files(table, start_block, end_block):
+        metrics.wrote(f)
+    print(f"[saved] {table['dir']} blocks {start_block}-{end_block} ({len(df)} rows, partitions={touched})")
+
+# ---------- 디코딩 ----------
+def _raw_transfers(tf: pd.DataFrame):
+    # route 가 topic0 로 거른 행만 넘기므로 idx 는 전체 행
+    _, f = decode_event(event("erc20_transfer"), tf)
+    tf = tf.copy()
+    tf["from"] = f["from"]
+    tf["to"]   = f["to"]
+    # raw 수량은 uint256 → 10진 문자열로 보관(parquet int64 범위를 넘어도 정확)
+    tf["amount_raw"] = amounts.int_str(f["value"])
+    return tf[["transaction_hash","log_index","address","from","to","amount_raw"]].rename(
+        columns={"transaction_hash":"tx_hash","address":"token_address"})
+
+def _raw_v2(v2: pd.DataFrame):
+    # Swap data는 32B word 고정 레이아웃 → 행렬로 일괄 디코딩(실패 행은 0)
+    v2 = v2.copy()
+    ok, w = decode_v2_swap_data(v2["data"].tolist())
+    for c, k in zip(["a0i","a1i","a0o","a1o"], ["amount0In","amount1In","amount0Out","amount1Out"]):
+        v2[c] = amounts.int_str(expand(len(v2), ok, w[k]))
+    out = v2[["transaction_hash","log_index","address","a0i","a1i","a0o","a1o"]].rename(
+        columns={"transaction_hash":"tx_hash","address":"pair_or_pool"})
+    out["dex"] = "UNI-V2"
+    return out
+
+def _raw_v3(v3: pd.DataFrame):
+    v3 = v3.copy()
+    ok, w = decode_v3_swap_data(v3["data"].tolist())
+    v3["a0"] = amounts.int_str(expand(len(v3), ok, w["amount0"]))
+    v3["a1"] = amounts.int_str(expand(len(v3), ok, w["amount1"]))
+    out = v3[["transaction_hash","log_index","address","a0","a1"]].rename(
+        columns={"transaction_hash":"tx_hash","address":"pair_or_pool"})
+    out["dex"] = "UNI-V3"
+    return out
+
+SWAP_COLS = ["tx_hash","log_index","pair_or_pool","a0i","a1i","a0o","a1o","dex","a0","a1"]
+
+def decode_all_df(logs: pd.DataFrame, topics_json: str, addresses_json: str):
+    topics = json.load(open(topics_json))
+    addrs  = json.load(open(addresses_json))
+    BRIDGES = {a.lower() for a in addrs.get("bridges", [])}
+    t_worm = topics["wormhole_log"]
+
+    logs = logs.copy()
+    logs.columns = [c.lower() for c in logs.columns]
+    for c in ["data","address","transaction_hash","log_index"]:
+        if c not in logs.columns:
+            logs[c] = pd.NA
+
+    # topics 분해 1회 + topic0 디스패치(logscan.route)
+    parts = route(logs, {
+        "transfers": ([topics["erc20_transfer"]], _raw_transfers),
+        "v2":        ([topics["univ2_swap"]], _raw_v2),
+        "v3":        ([topics["univ3_swap"]], _raw_v3),
+        "wormhole":  ([t_worm], lambda lg: decode_wormhole(lg, t_worm)),
+    })
+    empty = pd.DataFrame(columns=["tx_hash","log_index"])
+    transfers = parts.get("transfers", pd.DataFrame(
+        columns=["tx_hash","log_index","token_address","from","to","amount_raw"]))
+    # 열 고정(V2/V3 합집합) — 청크마다 결과를 이어 쓰므로 어느 한쪽만 있는 청크도 같은 열
+    swaps = pd.concat([parts.get("v2", empty), parts.get("v3", empty)], ignore_index=True).reindex(columns=SWAP_COLS)
+
+    # Wormhole (sequence/nonce)
+    worm = parts.get("wormhole", pd.DataFrame(columns=["tx_hash","log_index","sequence","nonce"]))
+    bridges = worm[["tx_hash","log_index","sequence","nonce"]].copy()
+    for c in ["sequence","nonce"]:
+        bridges[c] = [None if v is None else str(v) for v in bridges[c]]
+
+    if BRIDGES:   # 빈 청크도 같은 열(amount_raw/token_address)
+        tsub = transfers[transfers["to"].isin(BRIDGES)]
+        est = tsub.groupby("tx_hash").head(1)[["tx_hash","amount_raw","token_address"]]
+        bridges = bridges.merge(est, on="tx_hash", how="left")
+
+    return transfers, swaps, bridges
+
+# ---------- receipts 청크 실행(속도 조절/429 재시도는 jsonrpc 토큰 버킷이 담당) ----------
+def run_receipts_chunk(sub, tx_blocks, max_workers: int, batch_size: int, max_retries: int = 4):
+    """receipts.fetch(프로세스 내 배치 RPC, 블록 모드 자동) → (receipts df, logs df). 실패분만 다시 요청."""
+    rcpts, logs, todo = [], [], list(sub)
+    for attempt in range(1, max_retries + 1):
+        r, l, todo = receipts.fetch(todo, tx_blocks, batch_size=batch_size, max_workers=max_workers)
+        rcpts += r; logs += l
+        if not todo:
+            metrics.add("rows_in", len(logs))
+            return (pd.DataFrame(rcpts, columns=receipts.RECEIPT_COLS),
+                    pd.DataFrame(logs, columns=receipts.LOG_COLS))
+        metrics.add("retries")
+        print(f"[retry {attempt}] receipts {len(todo)} tx 재요청 (rate={jsonrpc.stats()['rate']} req/s)")
+    raise RuntimeError(f"receipts chunk failed ({len(todo)} tx) after {max_retries} attempts")
+
+def fetch_chunks(subs, tx_blocks, inflight=PIPELINE_INFLIGHT):
+    """
+    청크 receipts 를 순서대로 yield. 소비자가 청크 N 을 디코딩하는 동안
+    N+1..N+inflight 를 백그라운드에서 받아 둔다(그 이상은 제출하지 않음).
+    """
+    subs = iter(subs)
+    with ThreadPoolExecutor(max_workers=inflight) as ex:
+        def submit(sub):
+            return ex.submit(run_receipts_chunk, sub, tx_blocks,
+                             max_workers=RECEIPTS_MAX_WORKERS, batch_size=RECEIPTS_BATCH_SIZE)
+        pending = deque(submit(sub) for _, sub in zip(range(inflight), subs))
+        while pending:
+            res = pending.popleft().result()
+            nxt = next(subs, None)
+            if nxt is not None:
+                pending.append(submit(nxt))
+            yield res
+
+# ---------- 메인 ----------
+EVENT_TABLES = ["transfers", "dex_swaps", "bridge_events"]
+
+def normalize_blocks(TMP: Path, r: pd.DataFrame, selected: set):
+    """receipts r(tx_hash 열)이 걸친 블록의 blocks/transactions 를 받아 정규화 행(NORM_COLS)."""
+    bmin, bmax = int(r["block_number"].min()), int(r["block_number"].max())
+    blocks_csv2 = TMP/f"blocks_{bmin}_{bmax}.csv"
+    txs_csv2    = TMP/f"txs_{bmin}_{bmax}.csv"
+    run_cli_or_raise([
+        "export_blocks_and_transactions",
+        "--start-block", str(bmin),
+        "--end-block",   str(bmax),
+        "--provider-uri", RPC_URL,
+        "--max-workers",  str(ETL_MAX_WORKERS),
+        "--batch-size",   str(ETL_BATCH_SIZE),
+        "--blocks-output",       str(blocks_csv2),
+        "--transactions-output", str(txs_csv2),
+    ])
+    blocks = pd.read_csv(blocks_csv2, usecols=["number","hash","timestamp"]).rename(
+        columns={"number":"block_number","hash":"block_hash","timestamp":"ts_utc"})
+    txs = pd.read_csv(txs_csv2, usecols=["hash","block_number","from_address","to_address","value","input","type"]).rename(
+        columns={"hash":"tx_hash","from_address":"from","to_address":"to","value":"value_wei"})
+    # 즉시 삭제
+    for p in [blocks_csv2, txs_csv2]:
+        try: Path(p).unlink()
+        except: pass
+
+    txs = txs[txs["tx_hash"].isin(selected)]
+    df = (txs.merge(blocks, on="block_number", how="left")
+             .merge(r.drop(columns="block_number"), on="tx_hash", how="left"))   # block_number 는 txs 쪽 사용(_x/_y 충돌 방지)
+    df["gas_fee_eth"]    = (df["gas_used"].fillna(0) * df["effective_gas_price"].fillna(0)) / 1e18
+    df["input_selector"] = df["input"].fillna("0x").str.slice(0,10)
+    df["to_is_contract"] = pd.NA
+    return df[NORM_COLS]
+
+def process_range(start_block: int, end_block: int, emit):
+    """
+    [start_block, end_block] 수집·디코딩. receipts 청크가 끝날 때마다 emit(name, df, lo, hi) 로 넘김
+    (name: normalized/transfers/dex_swaps/bridge_events, df = 블록 [lo, hi] 의 행 전부).
+    청크 경계에 걸친 마지막 블록은 다음 청크로 미뤄 한 블록이 두 번에 나뉘지 않게 함 → 구간 upsert 가능.
+    이벤트 표에는 block_number 열을 덧붙임. 메모리 ≈ 청크 몇 개(범위 크기와 무관).
+    반환: 대상 tx 가 없으면 None, 있으면 {name: 행 수}.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        TMP = Path(tmpdir)
+
+        # 1) 토큰 전송 기반 해시 수집
+        token_csv = TMP/"token_transfers.csv"
+        run_cli_or_raise([
+            "export_token_transfers",
+            "--start-block", str(start_block),
+            "--end-block",   str(end_block),
+            "--provider-uri", RPC_URL,
+            "--max-workers",  str(ETL_MAX_WORKERS),
+            "--batch-size",   str(ETL_BATCH_SIZE),
+            "--output",       str(token_csv),
+        ])
+        tx_hashes = set()
+        tx_blocks = {}   # tx → block_number (receipts 블록 모드 판단용)
+        if token_csv.exists():
+            df_tt = pd.read_csv(token_csv, usecols=["transaction_hash","block_number"]).dropna()
+            tx_hashes = set(df_tt["transaction_hash"].tolist())
+            tx_blocks.update(zip(df_tt["transaction_hash"], df_tt["block_number"]))
+
+        # (옵션) 블록 전체 TX 포함
+        if USE_TXS_FROM_BLOCKS:
+            txs_csv = TMP/f"txs_{start_block}_{end_block}.csv"
+            blocks_csv = TMP/f"blocks_{start_block}_{end_block}.csv"
+            run_cli_or_raise([
+                "export_blocks_and_transactions",
+                "--start-block", str(start_block),
+                "--end-block",   str(end_block),
+                "--provider-uri", RPC_URL,
+                "--max-workers",  str(ETL_MAX_WORKERS),
+                "--batch-size",   str(ETL_BATCH_SIZE),
+                "--blocks-output",       str(blocks_csv),
+                "--transactions-output", str(txs_csv),
+            ])
+            df_txs = pd.read_csv(txs_csv, usecols=["hash","block_number"]).dropna()
+            tx_hashes |= set(df_txs["hash"].tolist())
+            tx_blocks.update(zip(df_txs["hash"], df_txs["block_number"]))
+
+        tx_hashes = sorted(tx_hashes)
+        if not tx_hashes:
+            return None
+
+        # 2) receipts/logs → 디코딩 → 정규화 파이프라인: 블록 순 청크를 미리 받아 두고(fetch_chunks)
+        #    받은 청크는 바로 디코딩 + 그 블록들의 blocks/transactions 조인 → emit, 원본 로그는 버림
+        #    (한 tx 의 로그는 한 청크에 모두 있으므로 청크 단위 디코딩 = 전체 디코딩)
+        selected = set(tx_hashes)
+        order = sorted(tx_hashes, key=lambda h: (int(tx_blocks.get(h, 0)), h))
+        total = len(order)
+        chunks = math.ceil(total / TX_HASH_CHUNK)
+        subs = (order[i*TX_HASH_CHUNK:(i+1)*TX_HASH_CHUNK] for i in range(chunks))
+        counts = dict.fromkeys(["normalized"] + EVENT_TABLES, 0)
+        pending = {k: [] for k in ["receipts"] + EVENT_TABLES}   # 아직 내보내지 않은 블록의 행
+        lo = start_block
+        for i, (rcpt_df_i, logs_df_i) in enumerate(fetch_chunks(subs, tx_blocks), 1):
+            r = rcpt_df_i[["block_number","transaction_hash","status","gas_used","effective_gas_price"]].rename(
+                columns={"transaction_hash":"tx_hash"})
+            with metrics.timer("decode"):
+                tf, sw, br = decode_all_df(
+                    logs=logs_df_i,
+                    topics_json=str(Path("config/topics.json")),
+                    addresses_json=str(Path("config/addresses.json")),
+                )
+            print(f"[chunk {i}/{chunks}] receipts={len(rcpt_df_i)} logs={len(logs_df_i)} "
+                  f"transfers={len(tf)} swaps={len(sw)} bridges={len(br)}")
+            # 이벤트 → 블록 번호(receipts 기준)
+            tx_block = dict(zip(r["tx_hash"], r["block_number"]))
+            pending["receipts"].append(r)
+            for name, ev in zip(EVENT_TABLES, (tf, sw, br)):
+                pending[name].append(ev.assign(block_number=ev["tx_hash"].map(tx_block)))
+            hi = end_block if i == chunks else int(r["block_number"].max()) - 1
+            if hi < lo:
+                continue
+            done = {}
+            for k, parts in pending.items():
+                df = pd.concat(parts, ignore_index=True)
+                cut = (pd.to_numeric(df["block_number"]) <= hi).to_numpy()
+                done[k], pending[k] = df[cut], [df[~cut]]
+            # 3) blocks & transactions — 이번에 끝난 블록만 정규화
+            r_done = done.pop("receipts")
+            norm = normalize_blocks(TMP, r_done, selected) if len(r_done) else pd.DataFrame(columns=NORM_COLS)
+            emit("normalized", norm, lo, hi)
+            counts["normalized"] += len(norm)
+            for name in EVENT_TABLES:
+                emit(name, done[name], lo, hi)
+                counts[name] += len(done[name])
+            lo = hi + 1
+        return counts
+
+def collect():
+    """emit 로 받은 조각을 모으는 (emit, 결과 dict) — --follow 처럼 배치 전체를 확인한 뒤 저장할 때."""
+    parts = {}
+    def emit(name, df, lo, hi):
+        parts.setdefault(name, []).append(df)
+    def result():
+        return {k: pd.concat(v, ignore_index=True) for k, v in parts.items()}
+    return emit, result
+
+def main(start_block: int, end_block: int, safe: bool = True):
+    if safe:
+        end_block = min(end_block, latest_safe_block())
+    # 청크가 끝날 때마다 저장: 정규화는 구간 upsert, 이벤트는 범위 단위 파일에 이어 씀(전체를 메모리에 모으지 않음)
+    outs = {name: open_out(name) for name in EVENT_TABLES}
+    def emit(name, df, lo, hi):
+        if name == "normalized":
+            save_normalized(df, lo, hi)
+        else:
+            append_out(outs[name], df.drop(columns="block_number"))
+    try:
+        res = process_range(start_block, end_block, emit)
+    except BaseException:
+        for w in outs.values():
+            abort_out(w)
+        raise
+    for w in outs.values():
+        close_out(w)
+    if res is None:
+        save_normalized(pd.DataFrame(columns=NORM_COLS), start_block, end_block)
+        print("no tx found in the given range"); return
+
+    print("DONE",
+          res["normalized"], "normalized;",
+          res["transfers"], "transfers;",
+          res["dex_swaps"], "swaps;",
+          res["bridge_events"], "bridges.")
+
+# ---------- --follow(데몬) ----------
+# - 상태 OUT_DIR/follow_state.json: {"cursor": 마지막 처리 블록, "ts": 그 블록 시각, "hashes": {블록: 해시}}
+#   (최근 REORG_WINDOW 블록만, 임시 파일 → os.replace)
+# - 결과는 블록 구간 파티션 표에 배치 범위만 upsert: NORM09_DIR, OUT_DIR/{transfers,dex_swaps,bridge_events}/
+# - 매 루프: 커서 블록 해시를 다시 조회 → 다르면 창 전체를 비교해 갈라진 지점(fork)부터 네 표를 지우고 커서를 되돌림
+#   새 배치는 첫 블록 parentHash 가 커서 해시와 이어지는지, 처리 결과의 block_hash 가 헤더와 같은지 확인(다르면 버리고 다시)
+# - 지표(metrics 09_follow): gauges head/safe_head/processed_block/lag_blocks/lag_seconds/batch_seconds,
+#   카운터 reorgs/rolled_back_blocks/batches_discarded/parent_mismatches/follow_errors — 루프마다(다시 시도할 때도) flush("running")
+FOLLOW_STATE = OUT_DIR / "follow_state.json"
+
+def _table_fmt():
+    return "parquet" if OUTPUT_FORMAT == "parquet" else "csv"
+
+def block_headers(numbers):
+    """블록 번호 → {"hash", "parent", "ts"}. 재편성 검사용이라 캐시를 거치지 않음(post_batch)."""
+    numbers = list(numbers)
+    res = jsonrpc.post_batch([("eth_getBlockByNumber", [hex(n), False]) for n in numbers])
+    missing = [n for n, h in zip(numbers, res) if not h]
+    if missing:
+        raise RuntimeError(f"eth_getBlockByNumber 실패: {missing[:5]}")
+    return {int(h["number"], 16): {"hash": h["hash"].lower(), "parent": h["parentHash"].lower(),
+                                   "ts": int(h["timestamp"], 16)} for h in res}
+
+def load_state():
+    if not FOLLOW_STATE.exists():
+        return None
+    st = json.load(open(FOLLOW_STATE))
+    st["hashes"] = {int(k): v for k, v in st.get("hashes", {}).items()}
+    return st
+
+def save_state(st):
+    keep = {n: h for n, h in st["hashes"].items() if n > st["cursor"] - REORG_WINDOW}
+    st["hashes"] = keep
+    doc = dict(st, hashes={str(n): keep[n] for n in sorted(keep)})
+    tmp = FOLLOW_STATE.with_name(f".{FOLLOW_STATE.name}.tmp")
+    tmp.write_text(json.dumps(doc, indent=1))
+    os.replace(tmp, FOLLOW_STATE)
+
+def find_fork(st):
+    """기억한 해시와 노드가 달라진 가장 낮은 블록(없으면 None). 창보다 깊으면 창 맨 아래부터."""
+    if not st["hashes"]:
+        return None
+    cur = st["cursor"]
+    if block_headers([cur])[cur]["hash"] == st["hashes"].get(cur):
+        return None
+    now = block_headers(sorted(st["hashes"]))
+    fork = min(n for n, h in st["hashes"].items() if now[n]["hash"] != h)
+    if fork == min(st["hashes"]):
+        print(f"[reorg] 창({REORG_WINDOW} 블록)보다 깊을 수 있음 — {fork} 부터 되돌림")
+    return fork
+
+def rollback(st, tables, fork):
+    """[fork, cursor] 범위 행을 모든 표에서 지우고 커서를 fork-1 로."""
+    cur = st["cursor"]
+    empty = pd.DataFrame(columns=[normstore.KEY])
+    for t in tables.values():
+        normstore.upsert(t, empty, fork, cur, fmt=_table_fmt())
+    st["cursor"] = fork - 1
+    st["hashes"] = {n: h for n, h in st["hashes"].items() if n < fork}
+    save_state(st)
+    metrics.add("reorgs")
+    metrics.add("rolled_back_blocks", cur - fork + 1)
+    print(f"[reorg] blocks {fork}-{cur} 되돌림 → cursor={fork - 1}")
+
+def follow_batch(st, tables, lo, hi):
+    """
+    [lo, hi] 처리 → 네 표에 upsert + 상태 저장 후 True.
+    첫 블록이 커서 해시와 이어지지 않거나 처리 중 해시가 바뀌면 아무것도 저장하지 않고 False.
+    """
+    hdr = block_headers(range(lo, hi + 1))
+    prev = st["hashes"].get(lo - 1)
+    if prev and hdr[lo]["parent"] != prev:
+        metrics.add("parent_mismatches")
+        print(f"[follow] block {lo}: parentHash 가 커서 해시와 다름 → 재편성 검사 후 다시")
+        return False
+    emit, result = collect()
+    res = result() if process_range(lo, hi, emit) is not None else None
+    if res is not None:
+        got = res["normalized"].drop_duplicates("block_number")
+        bad = [int(b) for b, h in zip(got["block_number"], got["block_hash"])
+               if str(h).lower() != hdr[int(b)]["hash"]]
+        if bad:
+            metrics.add("batches_discarded")
+            print(f"[follow] blocks {lo}-{hi}: 처리 중 해시가 바뀜({bad[:3]}) → 다시")
+            return False
+    for name, t in tables.items():
+        df = res[name] if res is not None else pd.DataFrame(columns=[normstore.KEY])
+        normstore.upsert(t, df, lo, hi, fmt=_table_fmt())
+        metrics.add("rows_out", len(df))
+    st["cursor"], st["ts"] = hi, hdr[hi]["ts"]
+    st["hashes"].update({n: h["hash"] for n, h in hdr.items()})
+    save_state(st)
+    n = {k: 0 if res is None else len(res[k]) for k in tables}
+    print(f"[follow] blocks {lo}-{hi} | normalized={n['normalized']} "
+          f"transfers={n['transfers']} swaps={n['dex_swaps']} bridges={n['bridge_events']}")
+    return True
+
+def report(st, head, target):
+    metrics.gauge("head", head)
+    metrics.gauge("safe_head", target)
+    metrics.gauge("processed_block", st["cursor"])
+    metrics.gauge("lag_blocks", head - st["cursor"])
+    if st.get("ts"):
+        metrics.gauge("lag_seconds", round(max(0.0, time.time() - st["ts"]), 1))
+    metrics.flush("running")
+
+def open_follow_tables():
+    dirs = dict({name: OUT_DIR / name for name in EVENT_TABLES}, normalized=NORM09_DIR)
+    return {name: normstore.open_table(str(dirs[name]), owner="09") for name in ["normalized"] + EVENT_TABLES}
+
+def follow(start=None, once=False):
+    """
+    최신-SAFE_LAG 까지 FOLLOW_BATCH 블록씩 처리하며 계속 따라감(once: 따라잡으면 종료).
+    start: 상태 파일이 없을 때 시작 블록(있으면 상태의 커서 다음부터 이어감).
+    배치를 버리거나 오류가 나면 FOLLOW_POLL_S 부터 두 배씩(FOLLOW_BACKOFF_MAX 까지) 쉬었다 다시.
+    """
+    st = load_state()
+    if st is None:
+        if start is None:
+            metrics.fail(f"--start 필요({FOLLOW_STATE} 없음)")
+        st = {"cursor": start - 1, "ts": None, "hashes": {}}
+    tables = open_follow_tables()
+    print(f"[follow] cursor={st['cursor']} batch={FOLLOW_BATCH} safe_lag={SAFE_LAG} window={REORG_WINDOW}")
+    retries = 0
+    while True:
+        t0 = time.perf_counter()
+        try:
+            head = jsonrpc.block_number()
+            target = max(0, head - SAFE_LAG)
+            fork = find_fork(st)
+            if fork is not None:
+                rollback(st, tables, fork)
+            lo = st["cursor"] + 1
+            hi = min(target, lo + FOLLOW_BATCH - 1)
+            ok = lo > hi or follow_batch(st, tables, lo, hi)
+        except Exception as e:
+            # RPC 타임아웃/5xx, ethereumetl 실패 등 — 저장은 배치/되돌림 단위로 멱등이라 같은 자리부터 다시
+            metrics.add("follow_errors")
+            metrics.flush("running")
+            print(f"[follow] 오류({type(e).__name__}: {e}) → 다시")
+            ok = None
+        if ok is not None:
+            if ok and lo <= hi:
+                metrics.gauge("batch_seconds", round(time.perf_counter() - t0, 3))
+            report(st, head, target)
+        if not ok:
+            retries += 1
+            time.sleep(min(FOLLOW_POLL_S * 2 ** (retries - 1), FOLLOW_BACKOFF_MAX))
+            continue
+        retries = 0
+        if st["cursor"] >= target:
+            if once:
+                return
+            time.sleep(FOLLOW_POLL_S)
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser()
+    p.add_argument("--start", type=int, help="--follow 는 상태 파일이 없을 때만 필요")
+    p.add_argument("--end",   type=int)
+    p.add_argument("--safe",  action="store_true")
+    p.add_argument("--follow", action="store_true", help="최신-SAFE_LAG 를 계속 따라감(재편성 시 되돌림)")
+    p.add_argument("--once",  action="store_true", help="--follow: 따라잡으면 종료")
+    a = p.parse_args()
+    t0 = time.perf_counter()
+    if a.follow:
+        metrics.start("09_follow")
+        try:
+            follow(a.start, once=a.once)
+        except KeyboardInterrupt:
+            print("[follow] 중단")
+    else:
+        if a.start is None or a.end is None:
+            p.error("--start/--end 필요(--follow 가 아닐 때)")
+        metrics.start("09_bridges")
+        if a.safe:
+            print(f"[safe] latest_safe={latest_safe_block()}")
+        main(a.start, a.end, a.safe)
+    print(f"\n⏱ {time.perf_counter() - t0:.2f}s")
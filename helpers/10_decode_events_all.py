@@ -0,0 +1,79 @@
+# helpers/10_decode_events_all.py
+# - 07(transfers) + 08(dex_swaps) + 브리지(Wormhole)를 로그 청크 한 번 읽기로 처리
+# - 각 logs_*.csv 를 한 번만 파싱하고 topic0 디스패치 테이블로 디코더에 분배
+# - config/topics.json "events" 에 ABI 조각만 추가한 이벤트는 범용 디코더로 out/events_<키>.csv
+#   (01 이 모은 TX 의 receipt 로그 중 해당 topic0 인 것)
+# 사용: python helpers/10_decode_events_all.py [--workers N]  (N>1: 청크 파일 단위 프로세스 풀 디코딩)
+import os, json
+import tokenmeta
+import metrics
+import streamout
+from evtdecode import (decode_transfers, decode_swaps, decode_wormhole, build_bridge_events,
+                       registry, event_frame, event_columns)
+from logscan import log_files, scan, concat_sorted, addresses_by_topic0, workers_arg
+
+metrics.start("10_all")
+tokenmeta.connect()
+
+LOG_FILES = log_files()
+if not LOG_FILES:
+    metrics.fail("logs 파일이 없습니다. ③단계를 먼저 실행하세요.")
+
+topics = json.load(open("config/topics.json"))
+addrs  = json.load(open("config/addresses.json"))
+T_TRANSFER = topics["erc20_transfer"].lower()
+T_V2, T_V3 = topics["univ2_swap"].lower(), topics["univ3_swap"].lower()
+T_WORM     = topics["wormhole_log"].lower()
+BRIDGES    = {a.lower() for a in addrs.get("bridges", [])}
+os.makedirs("out", exist_ok=True)
+
+# topic0 → 디코더 디스패치 테이블
+DECODERS = {
+    "transfers": ([T_TRANSFER], lambda lg: decode_transfers(lg, T_TRANSFER, tokenmeta.token_meta)),
+    "swaps":     ([T_V2, T_V3], lambda lg: decode_swaps(lg, T_V2, T_V3, tokenmeta.tokens_of_pool, tokenmeta.token_meta)),
+    "wormhole":  ([T_WORM],     lambda lg: decode_wormhole(lg, T_WORM)),
+}
+BUILTIN = {"erc20_transfer", "univ2_swap", "univ3_swap", "wormhole_log"}
+EXTRA = {k: ev for k, ev in registry().items() if k not in BUILTIN}
+for k, ev in EXTRA.items():
+    DECODERS[f"event:{k}"] = ([ev["topic0"]], lambda lg, ev=ev: event_frame(ev, lg))
+
+# 디코딩 전에 청크 그룹 단위로 토큰/풀 주소를 모아 메타를 배치로 일괄 해결
+def prefetch(frames):
+    tokenmeta.prefetch(tokens=addresses_by_topic0(frames, [T_TRANSFER]),
+                       pools=addresses_by_topic0(frames, [T_V2, T_V3]))
+
+# 출력(빈 결과도 헤더 생성) — 07/08 과 동일 스키마
+tf_cols = ["tx_hash","log_index","token_address","symbol","decimals",
+           "from","to","amount_raw","amount_norm","token_alias"]
+sw_cols = ["tx_hash","log_index","dex","pair_or_pool","token_in","token_out","amount_in","amount_out"]
+wm_cols = ["tx_hash","log_index","emitter","sequence","nonce","consistency_level"]
+
+# transfers/swaps 는 스트리밍 출력. 브리지 매칭에는 브리지 주소로 들어간 Transfer 만 있으면 되므로 그것만 모아 둠
+tf_out = streamout.open_writer("out/transfers.csv", tf_cols)
+sw_out = streamout.open_writer("out/dex_swaps.csv", sw_cols)
+ev_out = {k: streamout.open_writer(f"out/events_{k}.csv", event_columns(ev)) for k, ev in EXTRA.items()}
+to_bridge = []
+
+def on_transfers(df):
+    streamout.append(tf_out, df)
+    if BRIDGES:
+        to_bridge.append(df[df["to"].isin(BRIDGES)])
+
+try:
+    parts = scan(LOG_FILES, DECODERS, prefetch=prefetch, workers=workers_arg(), worker_init=tokenmeta.freeze,
+                 sinks={"transfers": on_transfers, "swaps": lambda df: streamout.append(sw_out, df),
+                        **{f"event:{k}": (lambda df, w=w: streamout.append(w, df)) for k, w in ev_out.items()}})
+except BaseException:
+    for w in [tf_out, sw_out, *ev_out.values()]:
+        streamout.abort(w)
+    raise
+n_tf, n_sw = streamout.close(tf_out), streamout.close(sw_out)
+n_ev = {k: streamout.close(w) for k, w in ev_out.items()}
+bridges = build_bridge_events(concat_sorted(parts["wormhole"], wm_cols), concat_sorted(to_bridge, tf_cols), BRIDGES)
+bridges.to_csv("out/bridge_events.csv", index=False)
+metrics.add("rows_out", n_tf + n_sw + len(bridges) + sum(n_ev.values()))
+for p in ["out/transfers.csv", "out/dex_swaps.csv", "out/bridge_events.csv", *(w["path"] for w in ev_out.values())]:
+    metrics.wrote(p)
+print("transfers:", n_tf, "| dex_swaps:", n_sw, "| bridge_events:", len(bridges),
+      *(f"| events_{k}: {n}" for k, n in n_ev.items()))
@@ -0,0 +1,64 @@
+# helpers/amounts.py
+# - 토큰 수량 정규화(raw 정수 / 10**decimals) 공용 컴포넌트 — evtdecode(07/08/10), 09
+# - 기본(AMOUNT_FORMAT=exact): 정확한 10진 문자열. 정수 자릿수 문자열에서 소수점 위치만 옮기므로
+#   2^53 wei 를 넘는 18자리 토큰도 손실 없음(예: 1108240000000000071 / 10**9 → "1108240000.000000071")
+# - 분석용 float 보기(AMOUNT_FORMAT=float): 기존 float(raw) / 10**dec 과 같은 값
+# - decimals 가 같은 행끼리 묶어 pyarrow 문자열 연산 한 번씩(고유 decimals 는 보통 몇 개뿐)
+import os
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+AMOUNT_FORMAT = os.getenv("AMOUNT_FORMAT", "exact").lower()   # exact | float
+
+# 10**d 를 float로 미리 계산 (uint8 decimals 범위)
+_POW10 = np.array([float(10**d) for d in range(256)])
+
+
+def _ints(raw) -> np.ndarray:
+    out = np.empty(len(raw), dtype=object)
+    out[:] = list(raw)
+    return out
+
+
+def int_str(raw) -> np.ndarray:
+    """Python int 배열 → 10진 문자열 object 배열(None 유지). parquet/CSV 어디서나 정확."""
+    out = _ints(raw)
+    ok = out != None  # noqa: E711
+    out[ok] = list(map(str, out[ok]))
+    return out
+
+
+def exact(raw, decimals) -> np.ndarray:
+    """raw / 10**dec 를 정확한 10진 문자열로(뒤쪽 0 과 소수점은 생략, 음수 허용)."""
+    raw = _ints(raw)
+    dec = np.asarray(decimals, dtype=np.int64)
+    out = np.empty(len(raw), dtype=object)
+    if len(raw) == 0:
+        return out
+    neg = raw < 0
+    if neg.any():
+        raw = np.where(neg, -raw, raw)
+    digits = pa.array(list(map(str, raw)), type=pa.string())
+    for d in np.unique(dec):
+        pos = np.flatnonzero(dec == d)
+        s = digits.take(pos)
+        if d > 0:
+            s = pc.utf8_lpad(s, int(d) + 1, "0")
+            whole = pc.utf8_slice_codeunits(s, 0, -int(d))
+            frac = pc.utf8_rtrim(pc.utf8_slice_codeunits(s, -int(d)), "0")
+            s = pc.if_else(pc.equal(frac, ""), whole, pc.binary_join_element_wise(whole, frac, "."))
+        out[pos] = s.to_numpy(zero_copy_only=False)
+    if neg.any():
+        out[neg] = ["-" + v for v in out[neg]]
+    return out
+
+
+def to_float(raw, decimals) -> np.ndarray:
+    """분석용 float 보기: float(raw) / 10**dec (큰 값은 유효숫자 ~16자리로 반올림됨)."""
+    return _ints(raw).astype(float) / _POW10[np.asarray(decimals, dtype=np.int64)]
+
+
+def normalize(raw, decimals, fmt=None) -> np.ndarray:
+    """AMOUNT_FORMAT(또는 fmt)에 따라 exact 문자열 / float 배열."""
+    return to_float(raw, decimals) if (fmt or AMOUNT_FORMAT) == "float" else exact(raw, decimals)
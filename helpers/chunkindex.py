@@ -0,0 +1,135 @@
+# helpers/chunkindex.py
+# - 로그 청크별 사이드카 인덱스: <청크 경로>.idx.json
+#     {"size", "mtime_ns": 원본 식별, "rows": 전체 행 수,
+#      "topics": {topic0: {"rows": 행 수, "addresses": [emitter 주소(소문자), ...]}}}  — 정확한 집합
+# - 07/08/10(logscan.scan)이 디코더 topic0 가 하나도 없는 청크는 열지 않음
+# - 만드는 곳: 03 이 청크를 쓴 직후, 인덱스가 없거나 원본이 바뀐(size/mtime 불일치) 청크는 scan 이
+#   어차피 읽을 때 함께(CSV 는 전체를 읽으므로 그 프레임으로, parquet 은 topic0/address 두 열만 따로)
+# - CHUNK_INDEX=0 이면 끔(전부 읽음)
+# 사용: python helpers/chunkindex.py [--build] [topics.json 키 또는 topic0 ...] [--address 0x..]
+#   → 인덱스만으로 topic0 별 행 수·해당 청크 수 집계(예: wormhole_log 만)
+import os, sys, json
+import numpy as np
+import rawstore
+import metrics
+from evtdecode import topic_arrays
+
+CHUNK_INDEX = os.getenv("CHUNK_INDEX", "1") == "1"
+SUFFIX = ".idx.json"
+
+def sidecar(path):
+    return path + SUFFIX
+
+def _stamp(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def write(path, topic0, address):
+    """청크 전체 행의 topic0/address 배열 → 사이드카(임시 파일 → os.replace)."""
+    topic0 = np.asarray(topic0, dtype=object)
+    address = np.asarray(address, dtype=object)
+    topics = {}
+    for t, a in zip(topic0, address):
+        if not isinstance(t, str):
+            continue   # topics 없는 로그(anonymous)는 rows 에만 셈
+        e = topics.get(t)
+        if e is None:
+            e = topics[t] = {"rows": 0, "addresses": set()}
+        e["rows"] += 1
+        if isinstance(a, str) and a:
+            e["addresses"].add(a.lower())
+    idx = dict(_stamp(path), rows=len(topic0),
+               topics={t: {"rows": e["rows"], "addresses": sorted(e["addresses"])} for t, e in sorted(topics.items())})
+    tmp = os.path.join(os.path.dirname(path) or ".", f".{os.path.basename(path)}{SUFFIX}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(idx, f, separators=(",", ":"))
+    os.replace(tmp, sidecar(path))
+    metrics.add("chunks_indexed")
+    return idx
+
+def build(path):
+    """청크에서 topic0/address 만 읽어 인덱스 생성."""
+    cols = ["topic0", "address"] if path.endswith(".parquet") else ["topics", "address"]
+    logs = rawstore.read(path, "logs", columns=cols)
+    if "address" not in logs.columns:
+        logs["address"] = None
+    return write(path, topic_arrays(logs)[0], logs["address"].to_numpy(dtype=object, na_value=None))
+
+def load(path):
+    """유효한 인덱스(원본과 size/mtime 일치) 또는 None."""
+    try:
+        with open(sidecar(path)) as f:
+            idx = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return idx if {k: idx.get(k) for k in ("size", "mtime_ns")} == _stamp(path) else None
+
+def get(path):
+    return load(path) or build(path)
+
+def remove(path):
+    """청크를 지울 때 사이드카도 함께."""
+    if os.path.exists(sidecar(path)):
+        os.remove(sidecar(path))
+
+def may_contain(idx, topic0s, addresses=None):
+    for t in topic0s:
+        e = idx["topics"].get(t.lower())
+        if e and (addresses is None or not addresses.isdisjoint(e["addresses"])):
+            return True
+    return False
+
+def select(files, topic0s, addresses=None):
+    """
+    topic0s(또는 addresses 까지) 에 해당하는 행이 있을 수 있는 청크만.
+    반환: (읽을 파일, 그중 인덱스가 없어 읽으면서 만들어야 할 파일 집합)
+    """
+    if not CHUNK_INDEX:
+        return list(files), set()
+    addresses = {a.lower() for a in addresses} if addresses else None
+    keep, missing = [], set()
+    for f in files:
+        idx = load(f)
+        if idx is None:
+            keep.append(f)
+            missing.add(f)
+        elif may_contain(idx, topic0s, addresses):
+            keep.append(f)
+    metrics.add("chunks_skipped", len(files) - len(keep))
+    return keep, missing
+
+def after_read(path, logs):
+    """scan 이 읽은 청크(split_topics 됨)로 인덱스 생성. 필터 읽기(parquet)면 두 열만 다시 읽음."""
+    if path.endswith(".parquet"):
+        build(path)
+    else:
+        write(path, logs["topic0"].to_numpy(dtype=object), logs["address"].to_numpy(dtype=object, na_value=None))
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    addrs = None
+    if "--address" in args:
+        i = args.index("--address")
+        addrs = {a.lower() for a in args[i + 1].split(",")}
+        del args[i:i + 2]
+    files = rawstore.files("logs")
+    if "--build" in args:
+        args.remove("--build")
+        for f in files:
+            build(f)
+    topics = json.load(open("config/topics.json"))
+    names = {v.lower(): k for k, v in topics.items() if isinstance(v, str)}
+    want = [(t if t.startswith("0x") else topics[t]).lower() for t in args] or list(names)
+    rows, hits = dict.fromkeys(want, 0), dict.fromkeys(want, 0)
+    total = 0
+    for f in files:
+        idx = get(f)
+        total += idx["rows"]
+        for t in want:
+            if may_contain(idx, [t], addrs):
+                rows[t] += idx["topics"][t]["rows"]
+                hits[t] += 1
+    # 주소 조건이 있으면 rows 는 그 주소가 있는 청크의 topic0 전체 행 수(상한)
+    print(f"chunks={len(files)} rows={total}" + (f" address={','.join(sorted(addrs))}" if addrs else ""))
+    for t in want:
+        print(f"{names.get(t, t):<16} rows={rows[t]:<10} chunks={hits[t]}")
@@ -0,0 +1,509 @@
+# helpers/evtdecode.py
+# - 07/08/09 공용 컬럼 단위(vectorized) 로그 디코더
+# - iterrows 대신 청크(DataFrame) 단위로 topics 분해 → topic0 필터 → 필드 추출
+# - 청크가 작아(수십 행) pandas 연산 1회 비용이 크므로, 칼럼을 object 배열로 꺼내 한 번에 처리
+# - 이벤트 레이아웃은 config/topics.json 의 ABI 조각에서 컴파일(레지스트리) — Transfer/Swap/Wormhole 도 같은 경로
+import os, re, json
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from eth_utils import to_checksum_address, keccak
+import amounts
+
+TOPIC_COLS = ["topic0", "topic1", "topic2", "topic3"]
+_BRACKETS = re.compile(r"[\[\]\(\)'\"\s]")
+
+
+def _col(logs: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in logs.columns:
+        return np.full(len(logs), None, dtype=object)
+    return logs[name].to_numpy(dtype=object, na_value=None)
+
+
+def _split_one(s):
+    if not isinstance(s, str):
+        return ()
+    if s[:1] in "[(":
+        s = _BRACKETS.sub("", s)
+    return [p.strip().lower() for p in s.split(",") if p.strip()]
+
+
+def topic_arrays(logs: pd.DataFrame) -> list:
+    """topics(또는 topic0..3) → [topic0, topic1, topic2, topic3] object 배열(소문자, 결측 None)."""
+    n = len(logs)
+    if "topic0" in logs.columns or "topics" not in logs.columns:
+        return [np.array([x.strip().lower() if isinstance(x, str) and x.strip() else None
+                          for x in _col(logs, c)], dtype=object) for c in TOPIC_COLS]
+    arr = [_split_one(s) for s in _col(logs, "topics")]
+    out = []
+    for i in range(len(TOPIC_COLS)):
+        col = np.empty(n, dtype=object)
+        col[:] = [a[i] if len(a) > i else None for a in arr]
+        out.append(col)
+    return out
+
+
+def split_topics(logs: pd.DataFrame) -> pd.DataFrame:
+    """
+    topics 칼럼(콤마 구분 문자열 / JSON 리스트 문자열)을 topic0..topic3 칼럼으로 한 번에 분해.
+    topic0..3 칼럼이 이미 있으면 그대로 두고, 소문자/공백만 정리한다.
+    """
+    for c, v in zip(TOPIC_COLS, topic_arrays(logs)):
+        logs[c] = v
+    return logs
+
+
+def topic_addr(topics) -> list:
+    """indexed address topic(32B) → '0x' + 하위 20B(소문자). 형식이 아니면 ''."""
+    return ["0x" + t[-40:] if isinstance(t, str) and t.startswith("0x") and len(t) >= 42 else ""
+            for t in topics]
+
+
+def hex_data(data) -> list:
+    """data 칼럼을 '0x...' 문자열로 정규화(결측 → '0x')."""
+    out = []
+    for d in data:
+        if not isinstance(d, str):
+            out.append("0x")
+        else:
+            d = d.strip()
+            out.append(d if d.startswith("0x") else "0x" + d)
+    return out
+
+
+def _int16(x):
+    try:
+        return int(x, 16)
+    except (TypeError, ValueError):
+        return 0
+
+
+def hex_to_int(data_hex) -> list:
+    """'0x..' → Python int (256bit 이상도 정확). 파싱 실패 → 0."""
+    return [_int16(x) for x in data_hex]
+
+
+@lru_cache(maxsize=1 << 16)
+def checksum(addr):
+    """주소 → 체크섬 주소(프로세스 내 캐시). 잘못된 주소 → None."""
+    try:
+        return to_checksum_address(str(addr))
+    except Exception:
+        return None
+
+
+def log_index_arr(log_index) -> np.ndarray:
+    li = pd.to_numeric(pd.Series(log_index, dtype=object), errors="coerce")
+    return li.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def topic0_index(topic0: np.ndarray, *topic0s) -> np.ndarray:
+    """topic0 가 주어진 값 중 하나인 행 위치(정수 인덱스)."""
+    mask = np.zeros(len(topic0), dtype=bool)
+    for t in topic0s:
+        mask |= topic0 == t.lower()
+    return np.flatnonzero(mask)
+
+
+def take(logs: pd.DataFrame, name: str, idx: np.ndarray) -> np.ndarray:
+    """칼럼 하나를 object 배열로 꺼내 idx 행만 선택."""
+    return _col(logs, name)[idx]
+
+
+def decode_transfers(logs: pd.DataFrame, topic_transfer: str, meta_fn) -> pd.DataFrame:
+    """
+    ERC20 Transfer 로그 청크(레지스트리 "erc20_transfer") → transfers 스키마 DataFrame.
+    meta_fn(token_cs) -> (symbol, decimals) 는 청크 내 고유 토큰마다 한 번만(등장 순서대로) 호출.
+    """
+    cols = ["tx_hash", "log_index", "token_address", "symbol", "decimals",
+            "from", "to", "amount_raw", "amount_norm", "token_alias"]
+    idx, f = decode_event(event("erc20_transfer"), logs, topic_transfer)
+    if len(idx) == 0:
+        return pd.DataFrame(columns=cols)
+
+    token_cs = np.array([checksum(a) for a in take(logs, "address", idx)], dtype=object)
+    keep = token_cs != None  # noqa: E711  (object 배열 원소별 비교)
+    idx, token_cs = idx[keep], token_cs[keep]
+    if len(idx) == 0:
+        return pd.DataFrame(columns=cols)
+
+    metas = {t: meta_fn(t) for t in dict.fromkeys(token_cs)}
+    sym = [metas[t][0] for t in token_cs]
+    dec = np.array([int(metas[t][1]) for t in token_cs], dtype=np.int64)
+    raw = f["value"][keep]
+
+    return pd.DataFrame({
+        "tx_hash": [str(x) if x is not None else "<NA>" for x in take(logs, "transaction_hash", idx)],
+        "log_index": log_index_arr(take(logs, "log_index", idx)),
+        "token_address": token_cs,
+        "symbol": sym,
+        "decimals": dec,
+        "from": f["from"][keep],
+        "to": f["to"][keep],
+        "amount_raw": raw,
+        "amount_norm": amounts.normalize(raw, dec),
+        "token_alias": [f"{s}.ETH" for s in sym],
+    }, columns=cols)
+
+
+# ── 고정폭 32바이트 word 디코딩 (Swap 등 정적 레이아웃 data) ─────────────
+_U256 = 1 << 256
+
+
+def word_matrix(data, n_words: int):
+    """
+    data('0x..' 문자열 배열) → (ok, mat)
+      ok : 길이 n bool 배열. data가 유효한 hex이고 n_words*32 바이트 이상인 행
+      mat: ok 행만 모은 (k, n_words*32) uint8 행렬(앞쪽 n_words 개 word)
+    모든 행의 hex를 이어붙여 bytes.fromhex 한 번으로 변환한 뒤 오프셋으로 잘라낸다.
+    """
+    width = 32 * n_words
+    body = [d[2:] if isinstance(d, str) and d.startswith("0x") else "" for d in data]
+    ok = np.array([len(h) % 2 == 0 and len(h) >= 2 * width for h in body], dtype=bool)
+    try:
+        blob = bytes.fromhex("".join(h if o else "" for h, o in zip(body, ok)))
+    except ValueError:
+        # 잘못된 hex 문자가 섞인 경우만 행 단위 검증
+        for i, h in enumerate(body):
+            if ok[i]:
+                try:
+                    bytes.fromhex(h)
+                except ValueError:
+                    ok[i] = False
+        blob = bytes.fromhex("".join(h if o else "" for h, o in zip(body, ok)))
+    buf = np.frombuffer(blob, dtype=np.uint8)
+    lens = np.array([len(h) // 2 for h, o in zip(body, ok) if o], dtype=np.int64)
+    starts = np.concatenate(([0], np.cumsum(lens)[:-1])) if len(lens) else lens
+    mat = buf[starts[:, None] + np.arange(width)] if len(lens) else np.zeros((0, width), np.uint8)
+    return ok, np.ascontiguousarray(mat)
+
+
+def _limbs(mat: np.ndarray, i: int) -> np.ndarray:
+    """i번째 word → (k, 4) uint64 limb(big-endian 순서)."""
+    w = np.ascontiguousarray(mat[:, 32 * i:32 * (i + 1)])
+    return w.view(">u8").astype(np.uint64)
+
+
+def word_uint(mat: np.ndarray, i: int) -> np.ndarray:
+    """i번째 word → uint256 Python int object 배열(정확)."""
+    lb = _limbs(mat, i).astype(object)
+    return (lb[:, 0] << 192) | (lb[:, 1] << 128) | (lb[:, 2] << 64) | lb[:, 3]
+
+
+def word_int(mat: np.ndarray, i: int) -> np.ndarray:
+    """i번째 word → int256(2의 보수) Python int object 배열(정확)."""
+    u = word_uint(mat, i)
+    neg = mat[:, 32 * i] >= 0x80
+    u[neg] = u[neg] - _U256
+    return u
+
+
+def word_padding_ok(mat: np.ndarray, i: int, bits: int, signed: bool = False) -> np.ndarray:
+    """eth_abi strict 디코딩과 동일한 패딩 검사(uintN: 상위 0, intN: 부호 확장)."""
+    pad = 32 - bits // 8
+    w = mat[:, 32 * i:32 * (i + 1)]
+    if pad == 0:
+        return np.ones(len(mat), dtype=bool)
+    head = w[:, :pad]
+    if not signed:
+        return (head == 0).all(axis=1)
+    fill = np.where(w[:, pad] >= 0x80, 0xFF, 0x00).astype(np.uint8)
+    return (head == fill[:, None]).all(axis=1)
+
+
+# ── 설정 기반 이벤트 레지스트리(ABI 조각 → 컴파일된 컬럼 디코더) ─────────────
+# config/topics.json 의 "events": {키: JSON ABI event 조각}
+#   · topic0: 같은 키의 문자열 항목(기존 값)이 있으면 그것, 없으면 keccak(시그니처)
+#   · indexed 필드 → topic1..3 슬롯, 정적 data 필드 → 고정 word 오프셋
+#     동적 타입(bytes/string/T[])은 헤드의 오프셋 word 만 차지하고 값은 디코딩하지 않음
+#   · "x_whole_data": true 필드(유일한 data 필드일 때만) → data 전체를 정수로(길이 무관, 실패 → 0)
+#     data 가 32바이트가 아닌 Transfer(ERC721 등)를 기존 07 과 같게 처리하기 위한 것
+# 새 이벤트는 topics.json 에 조각만 추가하면 decode_event / event_frame 으로 같은 벡터화 경로를 탄다
+TOPICS_JSON = os.getenv("TOPICS_JSON", "config/topics.json")
+_ABI_NUM = re.compile(r"^(uint|int|bytes)(\d+)$")
+_registries = {}
+
+
+def _abi_type(t: str) -> tuple:
+    """ABI 타입 → (종류, 비트 수). 종류: uint/int/address/bool/bytes(bytesN)/dynamic."""
+    if t in ("bytes", "string") or t.endswith("[]"):
+        return "dynamic", 0
+    if t == "address":
+        return "address", 160
+    if t == "bool":
+        return "bool", 8
+    m = _ABI_NUM.match(t)
+    if m:
+        kind, n = m.group(1), int(m.group(2))
+        return kind, n * 8 if kind == "bytes" else n
+    if t in ("uint", "int"):
+        return t, 256
+    raise ValueError(f"지원하지 않는 ABI 타입: {t}")
+
+
+def compile_event(key: str, abi: dict, topic0: str = None) -> dict:
+    """ABI event 조각 → 디코더 명세(dict): topic0, indexed(이름,종류,비트,슬롯), fields(이름,종류,비트,word)."""
+    if abi.get("anonymous"):
+        raise ValueError(f"{key}: anonymous 이벤트는 topic0 가 없어 등록할 수 없음")
+    ins = abi.get("inputs", [])
+    sig = f"{abi['name']}({','.join(i['type'] for i in ins)})"
+    ev = {"key": key, "name": abi["name"], "signature": sig,
+          "topic0": (topic0 or "0x" + keccak(text=sig).hex()).lower(),
+          "indexed": [], "fields": [], "whole": None, "n_words": 0}
+    slot = word = 0
+    for j, i in enumerate(ins):
+        name = i.get("name") or f"arg{j}"
+        kind, bits = _abi_type(i["type"])
+        if i.get("indexed"):
+            slot += 1
+            ev["indexed"].append((name, kind, bits, slot))
+        elif i.get("x_whole_data"):
+            ev["whole"] = name
+        else:
+            if kind != "dynamic":
+                ev["fields"].append((name, kind, bits, word))
+            word += 1
+    if slot > 3:
+        raise ValueError(f"{key}: indexed 필드는 최대 3개")
+    if ev["whole"] and word:
+        raise ValueError(f"{key}: x_whole_data 는 유일한 data 필드여야 함")
+    ev["n_words"] = word
+    return ev
+
+
+def registry(path: str = None) -> dict:
+    """topics.json 의 events → {키: 컴파일된 디코더}(경로별 1회)."""
+    path = path or TOPICS_JSON
+    if path not in _registries:
+        cfg = json.load(open(path))
+        _registries[path] = {k: compile_event(k, abi, cfg[k] if isinstance(cfg.get(k), str) else None)
+                             for k, abi in cfg.get("events", {}).items()}
+    return _registries[path]
+
+
+def event(key: str, path: str = None) -> dict:
+    return registry(path)[key]
+
+
+def _word_values(mat: np.ndarray, kind: str, bits: int, i: int) -> np.ndarray:
+    if kind == "uint":
+        return word_uint(mat, i)
+    if kind == "int":
+        return word_int(mat, i)
+    if kind == "bool":
+        return mat[:, 32 * i + 31] == 1
+    lo, hi = (32 * i + 12, 32 * (i + 1)) if kind == "address" else (32 * i, 32 * i + bits // 8)
+    out = np.empty(len(mat), dtype=object)
+    out[:] = ["0x" + r.tobytes().hex() for r in mat[:, lo:hi]]
+    return out
+
+
+def _topic_values(topics: np.ndarray, kind: str, bits: int) -> np.ndarray:
+    out = np.empty(len(topics), dtype=object)
+    if kind == "address":
+        out[:] = topic_addr(topics)
+    elif kind in ("uint", "int", "bool"):
+        v = [_int16(t) for t in topics]
+        if kind == "int":
+            v = [x - _U256 if x >> 255 else x for x in v]
+        out[:] = [x == 1 for x in v] if kind == "bool" else v
+    else:
+        out[:] = topics   # bytesN / 동적 타입(keccak 해시) → topic 그대로
+    return out
+
+
+def decode_data(ev: dict, data) -> tuple:
+    """
+    data('0x..' 배열) → (ok, {필드: 값 배열}) — 값 배열은 ok 행만.
+    패딩이 잘못된 행(uintN 상위 비트, intN 부호 확장, bytesN 하위, bool 0/1)은 eth_abi 처럼 ok=False.
+    """
+    if ev["whole"]:
+        vals = np.empty(len(data), dtype=object)
+        vals[:] = hex_to_int(hex_data(data))
+        return np.ones(len(data), dtype=bool), {ev["whole"]: vals}
+    ok, mat = word_matrix(data, ev["n_words"])
+    valid = np.ones(len(mat), dtype=bool)
+    for _, kind, bits, i in ev["fields"]:
+        if kind == "bytes":
+            valid &= (mat[:, 32 * i + bits // 8:32 * (i + 1)] == 0).all(axis=1)
+        elif bits < 256:
+            valid &= word_padding_ok(mat, i, bits, signed=kind == "int")
+        if kind == "bool":
+            valid &= mat[:, 32 * i + 31] <= 1
+    if not valid.all():
+        ok[np.flatnonzero(ok)[~valid]] = False
+        mat = mat[valid]
+    return ok, {name: _word_values(mat, kind, bits, i) for name, kind, bits, i in ev["fields"]}
+
+
+def decode_event(ev: dict, logs: pd.DataFrame, topic0: str = None) -> tuple:
+    """
+    로그 청크에서 ev 의 topic0 행만 디코딩. 반환: (idx, {필드: 길이 len(idx) object 배열, "_ok": bool 배열})
+    data 디코딩에 실패한 행의 data 필드는 None(indexed 필드는 항상 채움).
+    """
+    tp = topic_arrays(logs)
+    idx = topic0_index(tp[0], topic0 or ev["topic0"])
+    out = {name: _topic_values(tp[slot][idx], kind, bits) for name, kind, bits, slot in ev["indexed"]}
+    ok, vals = decode_data(ev, hex_data(take(logs, "data", idx)))
+    pos = np.flatnonzero(ok)
+    for name, v in vals.items():
+        col = np.full(len(idx), None, dtype=object)
+        col[pos] = v
+        out[name] = col
+    out["_ok"] = ok
+    return idx, out
+
+
+def event_columns(ev: dict) -> list:
+    return (["tx_hash", "log_index", "address"] + [f[0] for f in ev["indexed"]]
+            + ([ev["whole"]] if ev["whole"] else []) + [f[0] for f in ev["fields"]])
+
+
+def event_frame(ev: dict, logs: pd.DataFrame) -> pd.DataFrame:
+    """범용 출력: tx_hash, log_index, address(체크섬) + ABI 필드(등록 순서). 설정만 추가한 이벤트용."""
+    idx, f = decode_event(ev, logs)
+    cols = event_columns(ev)
+    if len(idx) == 0:
+        return pd.DataFrame(columns=cols)
+    return pd.DataFrame({
+        "tx_hash": [str(x) if x is not None else "<NA>" for x in take(logs, "transaction_hash", idx)],
+        "log_index": log_index_arr(take(logs, "log_index", idx)),
+        "address": [checksum(a) for a in take(logs, "address", idx)],
+        **{c: f[c] for c in cols[3:]},
+    }, columns=cols)
+
+
+def decode_v2_swap_data(data) -> tuple:
+    """
+    Uniswap V2 Swap data(uint256 x4) 일괄 디코딩(레지스트리 "univ2_swap").
+    반환: (ok, {"amount0In","amount1In","amount0Out","amount1Out"}) — 값 배열은 ok 행만.
+    """
+    return decode_data(event("univ2_swap"), data)
+
+
+def decode_v3_swap_data(data) -> tuple:
+    """
+    Uniswap V3 Swap data(int256,int256,uint160,uint128,int24) 일괄 디코딩(레지스트리 "univ3_swap").
+    반환: (ok, {"amount0","amount1","sqrtPriceX96","liquidity","tick"}) — 값 배열은 ok 행만.
+    패딩이 잘못된 행은 eth_abi와 동일하게 실패(ok=False) 처리.
+    """
+    return decode_data(event("univ3_swap"), data)
+
+
+def expand(n: int, pos, vals) -> np.ndarray:
+    """pos 위치에만 값이 있는 배열을 길이 n object 배열로 펼침(나머지는 0)."""
+    out = np.zeros(n, dtype=object)
+    out[pos] = vals
+    return out
+
+
+def decode_swaps(logs: pd.DataFrame, topic_v2: str, topic_v3: str, pool_fn, meta_fn) -> pd.DataFrame:
+    """
+    Uniswap V2/V3 Swap 로그 청크 → dex_swaps 스키마 DataFrame.
+    pool_fn(pool_cs) -> (token0, token1), meta_fn(token_cs) -> (symbol, decimals) 는
+    디코딩에 성공한 행의 고유 풀/토큰마다 한 번씩(등장 순서대로) 호출.
+    """
+    cols = ["tx_hash", "log_index", "dex", "pair_or_pool", "token_in", "token_out", "amount_in", "amount_out"]
+    topic_v2, topic_v3 = topic_v2.lower(), topic_v3.lower()
+    t0 = topic_arrays(logs)[0]
+    idx = topic0_index(t0, topic_v2, topic_v3)
+    if len(idx) == 0:
+        return pd.DataFrame(columns=cols)
+
+    pool_cs = np.array([checksum(a) for a in take(logs, "address", idx)], dtype=object)
+    keep = pool_cs != None  # noqa: E711
+    idx, pool_cs = idx[keep], pool_cs[keep]
+    data = np.array(hex_data(take(logs, "data", idx)), dtype=object)
+    is_v2 = t0[idx] == topic_v2
+
+    # V2/V3 각각 word 행렬로 일괄 디코딩 → 원래 행 위치로 되돌림
+    n = len(idx)
+    ok2, w2 = decode_v2_swap_data(data[is_v2])
+    ok3, w3 = decode_v3_swap_data(data[~is_v2])
+    pos2, pos3 = np.flatnonzero(is_v2)[ok2], np.flatnonzero(~is_v2)[ok3]
+    ok = np.zeros(n, dtype=bool)
+    ok[pos2] = ok[pos3] = True
+    if not ok.any():
+        return pd.DataFrame(columns=cols)
+
+    a0i, a1i = expand(n, pos2, w2["amount0In"]), expand(n, pos2, w2["amount1In"])
+    a0o, a1o = expand(n, pos2, w2["amount0Out"]), expand(n, pos2, w2["amount1Out"])
+    a0, a1 = expand(n, pos3, w3["amount0"]), expand(n, pos3, w3["amount1"])
+
+    # 풀 → 토큰, 토큰 → 메타 (고유값 단위)
+    pools = {}
+    for p in dict.fromkeys(pool_cs[ok]):
+        t_0, t_1 = pool_fn(p)
+        pools[p] = (t_0, t_1, meta_fn(t_0), meta_fn(t_1))
+    pool_cs, is_v2 = pool_cs[ok], is_v2[ok]
+    a0i, a1i, a0o, a1o, a0, a1 = (x[ok] for x in (a0i, a1i, a0o, a1o, a0, a1))
+    s0 = np.array([pools[p][2][0] for p in pool_cs], dtype=object)
+    s1 = np.array([pools[p][3][0] for p in pool_cs], dtype=object)
+    d0 = np.array([int(pools[p][2][1]) for p in pool_cs], dtype=np.int64)
+    d1 = np.array([int(pools[p][3][1]) for p in pool_cs], dtype=np.int64)
+
+    # 방향 판정: V2는 amount0In>0 이면 token0 → token1, V3는 amount0<0 이면 token0 → token1
+    zero_in = np.where(is_v2, a0i > 0, a0 < 0).astype(bool)
+    raw_in = np.where(is_v2, np.where(zero_in, a0i, a1i), np.where(zero_in, -a0, -a1))
+    raw_out = np.where(is_v2, np.where(zero_in, a1o, a0o), np.where(zero_in, a1, a0))
+    sym_in, sym_out = np.where(zero_in, s0, s1), np.where(zero_in, s1, s0)
+    dec_in, dec_out = np.where(zero_in, d0, d1), np.where(zero_in, d1, d0)
+
+    sel = idx[ok]
+    return pd.DataFrame({
+        "tx_hash": [str(x) if x is not None else "<NA>" for x in take(logs, "transaction_hash", sel)],
+        "log_index": log_index_arr(take(logs, "log_index", sel)),
+        "dex": np.where(is_v2, "UNI-V2", "UNI-V3"),
+        "pair_or_pool": pool_cs,
+        "token_in": [f"{s}.ETH" for s in sym_in],
+        "token_out": [f"{s}.ETH" for s in sym_out],
+        "amount_in": amounts.normalize(raw_in, dec_in),
+        "amount_out": amounts.normalize(raw_out, dec_out),
+    }, columns=cols)
+
+
+def decode_wormhole(logs: pd.DataFrame, topic_worm: str) -> pd.DataFrame:
+    """
+    Wormhole LogMessagePublished(address indexed sender, uint64 sequence, uint32 nonce,
+    bytes payload, uint8 consistencyLevel) 로그 → sender/sequence/nonce/consistency_level.
+    레지스트리 "wormhole_log": 정적 필드는 word 0,1,3 (word 2는 payload 오프셋).
+    디코딩 실패 행은 sequence/nonce 가 None.
+    """
+    cols = ["tx_hash", "log_index", "emitter", "sequence", "nonce", "consistency_level"]
+    idx, f = decode_event(event("wormhole_log"), logs, topic_worm)
+    if len(idx) == 0:
+        return pd.DataFrame(columns=cols)
+    return pd.DataFrame({
+        "tx_hash": [str(x) if x is not None else "<NA>" for x in take(logs, "transaction_hash", idx)],
+        "log_index": log_index_arr(take(logs, "log_index", idx)),
+        "emitter": f["sender"],
+        "sequence": f["sequence"],
+        "nonce": f["nonce"],
+        "consistency_level": f["consistencyLevel"],
+    }, columns=cols)
+
+
+def build_bridge_events(worm: pd.DataFrame, transfers: pd.DataFrame, bridges) -> pd.DataFrame:
+    """
+    Wormhole 메시지 + 같은 TX에서 브리지 주소로 들어간 첫 Transfer → bridge_events 스키마.
+    bridges: 브리지 컨트랙트 주소(소문자) 집합. 비어 있으면 token_in/amount_in 은 비움.
+    """
+    cols = ["tx_hash", "log_index", "bridge_id", "fields", "token_in", "amount_in"]
+    if worm.empty:
+        return pd.DataFrame(columns=cols)
+    fields = [json.dumps({"emitter": e, "sequence": None if s is None else str(s),
+                          "nonce": None if n is None else str(n),
+                          "consistency_level": None if c is None else int(c)})
+              for e, s, n, c in zip(worm["emitter"], worm["sequence"], worm["nonce"],
+                                    worm["consistency_level"])]
+    out = pd.DataFrame({"tx_hash": worm["tx_hash"].to_numpy(), "log_index": worm["log_index"].to_numpy(),
+                        "bridge_id": "WORMHOLE", "fields": fields})
+    if bridges and not transfers.empty:
+        tin = transfers[transfers["to"].isin(bridges)].groupby("tx_hash").head(1)
+        tin = tin[["tx_hash", "token_alias", "amount_norm"]].rename(
+            columns={"token_alias": "token_in", "amount_norm": "amount_in"})
+        out = out.merge(tin, on="tx_hash", how="left")
+    else:
+        out["token_in"] = pd.NA
+        out["amount_in"] = pd.NA
+    return out[cols]
@@ -0,0 +1,62 @@
+# helpers/hexbin.py
+# - tx 해시/블록 해시/주소를 고정 폭 바이너리(numpy S32/S20)로 다루는 헬퍼
+#   "0x"+hex 파이썬 문자열(66/42자, 객체당 100B 안팎) 대신 32/20 바이트 → 메모리 3~4배 절감
+# - 집합 포함 검사: 정렬된 바이너리 배열 + searchsorted (파이썬 set / pandas isin 대체)
+# - hex 문자열은 출력할 때만 만든다(to_hex)
+import numpy as np
+
+HASH_BYTES = 32
+ADDR_BYTES = 20
+
+def _strip(v):
+    if not isinstance(v, str):
+        return ""
+    return v[2:] if v[:2] in ("0x", "0X") else v
+
+def to_bin(values, width):
+    """
+    hex 문자열 목록 → (ok, np.ndarray dtype S{width}).
+    길이가 맞지 않거나 hex 가 아닌 값은 ok=False, 바이트는 0 으로 채움.
+    """
+    vals = [_strip(v) for v in values]
+    ok = np.fromiter((len(v) == 2 * width for v in vals), dtype=bool, count=len(vals))
+    pad = "00" * width
+    try:
+        buf = bytes.fromhex("".join(v if o else pad for v, o in zip(vals, ok)))
+    except ValueError:   # 드문 경우: 잘못된 문자가 섞임 → 행 단위로
+        parts = []
+        for i, (v, o) in enumerate(zip(vals, ok)):
+            try:
+                parts.append(bytes.fromhex(v) if o else bytes(width))
+            except ValueError:
+                ok[i] = False
+                parts.append(bytes(width))
+        buf = b"".join(parts)
+    return ok, np.frombuffer(buf, dtype=f"S{width}")
+
+def to_hex(arr, ok=None):
+    """S{width} 배열 → "0x.." 문자열 목록(ok=False 인 행은 None). 출력 직전에만 사용."""
+    w = arr.dtype.itemsize
+    hx = np.ascontiguousarray(arr).tobytes().hex()
+    out = ["0x" + hx[i:i + 2 * w] for i in range(0, len(hx), 2 * w)]
+    if ok is not None:
+        out = [s if o else None for s, o in zip(out, ok)]
+    return out
+
+def sorted_set(values, width=HASH_BYTES):
+    """hex 문자열 목록 → 정렬된 고유 바이너리 배열(집합 대용)."""
+    ok, arr = to_bin(values, width)
+    return np.unique(arr[ok])
+
+def isin(values, sset, width=HASH_BYTES):
+    """values(hex 문자열) 각각이 sorted_set 결과에 있는지 → bool 배열."""
+    ok, arr = to_bin(values, width)
+    if len(sset) == 0:
+        return np.zeros(len(arr), dtype=bool)
+    idx = np.searchsorted(sset, arr).clip(max=len(sset) - 1)
+    return ok & (sset[idx] == arr)
+
+def load_hashes(path):
+    """tx_hashes.txt 같은 줄 단위 해시 파일 → sorted_set."""
+    with open(path) as f:
+        return sorted_set([x.strip() for x in f if x.strip()], HASH_BYTES)
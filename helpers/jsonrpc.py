@@ -0,0 +1,277 @@
+# helpers/jsonrpc.py
+# - 공용 JSON-RPC 클라이언트(01/03/05/07/08/09/10 이 모두 이 모듈로 요청)
+#   · 커넥션 풀: 프로세스 공용 requests.Session + HTTPAdapter(RPC_POOL_SIZE) → keep-alive 재사용
+#   · call: 단건 요청(JSON-RPC error 는 RuntimeError), batch_call: [(method, params), ...] → 결과 리스트
+#     (실패 항목은 None), 동시 배치 수 제한
+#   · 속도 제한: 스레드 공용 토큰 버킷(요청 1건 = 토큰 1개, 배치는 건수만큼). 고정 SLEEP_MS 휴식 대체
+#   · 429 / Retry-After / rate-limit error: 속도 절반 + Retry-After 동안 전 스레드 대기 → 해당 항목만 재시도
+#     RPC_SPEEDUP_AFTER 회 연속 성공하면 RPC_SPEEDUP 배씩 회복(RPC_RATE_MAX 까지)
+# - SLEEP_MS 는 이제 일시 오류(타임아웃/5xx) 재시도 간격 기준으로만 사용
+# - 확정 블록 응답은 rpccache(디스크 LRU)에서 먼저 찾고, 받은 응답도 저장(RPC_CACHE=0 이면 끔)
+import os, time, threading
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+import rpccache   # import 시점에 RPC_CACHE* 를 읽음 → .env 를 먼저 불러 둔 뒤
+
+RPC_URL        = os.getenv("RPC_URL")
+SLEEP_MS       = int(os.getenv("SLEEP_MS", "350"))
+RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", "50"))
+RPC_MAX_WORKERS = int(os.getenv("RPC_MAX_WORKERS", "4"))
+RPC_POOL_SIZE  = int(os.getenv("RPC_POOL_SIZE", "16"))
+RPC_TIMEOUT    = float(os.getenv("RPC_TIMEOUT", "30"))
+SAFE_LAG       = int(os.getenv("SAFE_LAG", "12"))
+RPC_HEAD_TTL   = float(os.getenv("RPC_HEAD_TTL", "30"))   # 캐시 저장 판단용 head 재조회 주기(초)
+# 토큰 버킷: 초당 요청 수(시작값) / 하한 / 상한, 버스트(버킷 크기)
+RPC_RATE       = float(os.getenv("RPC_RATE", "100"))
+RPC_RATE_MIN   = float(os.getenv("RPC_RATE_MIN", "1"))
+RPC_RATE_MAX   = float(os.getenv("RPC_RATE_MAX", str(RPC_RATE * 8)))
+RPC_BURST      = float(os.getenv("RPC_BURST", str(max(RPC_RATE, RPC_BATCH_SIZE))))
+RPC_SPEEDUP_AFTER = int(os.getenv("RPC_SPEEDUP_AFTER", "20"))
+RPC_SPEEDUP    = float(os.getenv("RPC_SPEEDUP", "1.25"))
+RPC_CUT_COOLDOWN = float(os.getenv("RPC_CUT_COOLDOWN", "1.0"))   # 동시에 몰린 429 로 여러 번 깎지 않도록
+
+# 제공자별 rate-limit 응답(HTTP 200 + error 객체로 오는 경우)
+_LIMIT_CODES = {429, -32005}
+_LIMIT_WORDS = ("rate limit", "too many requests", "compute units", "exceeded its capacity", "throughput")
+
+_session = None
+_session_lock = threading.Lock()
+_lock = threading.Lock()
+_bucket = {"rate": RPC_RATE, "tokens": RPC_BURST, "ts": time.monotonic(),
+           "pause_until": 0.0, "ok_run": 0, "cut_at": -1e9}
+_stats = {"requests": 0, "calls": 0, "throttled": 0, "retries": 0, "errors": 0}
+_methods = Counter()                     # 메서드별 전송 건수(재전송 포함)
+_head = {"safe": None, "ts": -1e9}
+
+def session():
+    """프로세스 공용 keep-alive 세션(스레드들이 같은 커넥션 풀을 씀)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                ad = HTTPAdapter(pool_connections=4, pool_maxsize=RPC_POOL_SIZE)
+                s.mount("http://", ad)
+                s.mount("https://", ad)
+                _session = s
+    return _session
+
+def stats():
+    """누적 요청 통계 + 메서드별 건수 + 현재 속도(req/s)."""
+    with _lock:
+        return dict(_stats, methods=dict(_methods), rate=round(_bucket["rate"], 2))
+
+# ── 토큰 버킷 ───────────────────────────────────────────────────
+def acquire(n=1):
+    """토큰 n 개 확보. 모자라면 빚으로 잡고 그만큼(또는 Retry-After 끝까지) 대기."""
+    with _lock:
+        now = time.monotonic()
+        b = _bucket
+        b["tokens"] = min(RPC_BURST, b["tokens"] + (now - b["ts"]) * b["rate"])
+        b["ts"] = now
+        b["tokens"] -= n
+        wait = max(-b["tokens"] / b["rate"], b["pause_until"] - now, 0.0)
+    if wait > 0:
+        time.sleep(wait)
+
+def _throttled(retry_after=None):
+    with _lock:
+        now = time.monotonic()
+        b = _bucket
+        _stats["throttled"] += 1
+        b["ok_run"] = 0
+        if now - b["cut_at"] >= RPC_CUT_COOLDOWN:
+            b["rate"] = max(RPC_RATE_MIN, b["rate"] / 2)
+            b["tokens"] = min(b["tokens"], 0.0)
+            b["cut_at"] = now
+        if retry_after:
+            b["pause_until"] = max(b["pause_until"], now + retry_after)
+        rate = b["rate"]
+    print(f"[rpc] rate limited → {rate:.1f} req/s" + (f", retry after {retry_after:.1f}s" if retry_after else ""))
+
+def _succeeded():
+    with _lock:
+        b = _bucket
+        b["ok_run"] += 1
+        if b["ok_run"] >= RPC_SPEEDUP_AFTER:
+            b["ok_run"] = 0
+            b["rate"] = min(RPC_RATE_MAX, b["rate"] * RPC_SPEEDUP)
+
+def _retry_after(resp):
+    v = resp.headers.get("Retry-After") if resp is not None else None
+    if not v:
+        return None
+    try:
+        return max(0.0, float(v))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(v).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+def _is_limit_error(err):
+    if not isinstance(err, dict):
+        return False
+    msg = str(err.get("message", "")).lower()
+    return err.get("code") in _LIMIT_CODES or any(w in msg for w in _LIMIT_WORDS)
+
+def _backoff(attempt):
+    with _lock:
+        _stats["retries"] += 1
+    time.sleep((SLEEP_MS / 1000.0) * 2 ** attempt)
+
+# ── 전송 ────────────────────────────────────────────────────────
+def _post(payload, n, url=None, timeout=None):
+    """토큰 n 개 확보 후 POST 1회 → (json, Retry-After). HTTP 429 면 (None, None), 전송 오류는 예외."""
+    acquire(n)
+    with _lock:
+        _stats["requests"] += 1
+        _stats["calls"] += n
+        _methods.update(p["method"] for p in (payload if isinstance(payload, list) else [payload]))
+    r = session().post(url or RPC_URL, json=payload, timeout=timeout or RPC_TIMEOUT)
+    if r.status_code == 429:
+        _throttled(_retry_after(r))
+        return None, None
+    r.raise_for_status()
+    return r.json(), _retry_after(r)
+
+def block_number():
+    """현재 head 블록 번호(캐시 안 함)."""
+    return int(call("eth_blockNumber"), 16)
+
+def safe_block():
+    """확정 블록 상한(head - SAFE_LAG). RPC_HEAD_TTL 초 동안 재사용, 조회 실패 → None(캐시 저장 안 함)."""
+    now = time.monotonic()
+    if now - _head["ts"] > RPC_HEAD_TTL:
+        try:
+            _head["safe"] = block_number() - SAFE_LAG
+        except Exception:
+            _head["safe"] = None
+        _head["ts"] = now
+    return _head["safe"]
+
+def call(method, params=None, url=None, timeout=None, max_retry=5):
+    """단건 요청 → result. JSON-RPC error 는 RuntimeError(rate-limit 은 내부에서 재시도). 확정 블록 응답은 캐시."""
+    if method not in rpccache.CACHEABLE:
+        return _call(method, params, url, timeout, max_retry)
+    hit = rpccache.get_many([(method, params)])[0]
+    if hit is not rpccache.MISS:
+        return hit
+    res = _call(method, params, url, timeout, max_retry)
+    rpccache.put_many([(method, params)], [res], safe_block())
+    return res
+
+def _call(method, params=None, url=None, timeout=None, max_retry=5):
+    """캐시를 거치지 않는 단건 요청."""
+    payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []}
+    for attempt in range(1, max_retry + 1):
+        try:
+            data, ra = _post(payload, 1, url, timeout)
+        except (requests.RequestException, ValueError):
+            if attempt == max_retry:
+                raise
+            _backoff(attempt)
+            continue
+        if data is None:
+            continue
+        if "error" in data:
+            if _is_limit_error(data["error"]):
+                _throttled(ra)
+                continue
+            raise RuntimeError(data["error"])
+        _succeeded()
+        return data.get("result")
+    raise RuntimeError(f"{method}: rate limited after {max_retry} attempts")
+
+def is_connected():
+    try:
+        _call("eth_chainId", max_retry=2)
+        return True
+    except Exception:
+        return False
+
+def post_batch(calls, url=None, timeout=None, max_retry=4, max_limited=16, errors=None):
+    """
+    배치 1회 전송. 응답은 id 순서로 정렬, 항목별 error → None.
+    rate-limit 으로 거절된 항목만 모아 다시 보냄(이미 받은 결과는 유지, 최대 max_limited 회).
+    errors(dict)를 주면 노드가 error 로 답한 항목의 {인덱스: error 객체}를 채움
+    (None 중 노드가 실제로 거절한 것과 전송 실패로 포기한 것을 구분할 때).
+    """
+    out = [None] * len(calls)
+    todo = list(range(len(calls)))
+    failures = limited = 0
+    while todo:
+        payload = [{"jsonrpc":"2.0","id":i,"method":calls[i][0],"params":calls[i][1]} for i in todo]
+        try:
+            data, ra = _post(payload, len(todo), url, timeout)
+            if isinstance(data, dict) and not _is_limit_error(data.get("error")):
+                raise RuntimeError(data.get("error"))   # 배치 자체가 거부된 경우(단일 error 객체)
+        except Exception as e:
+            failures += 1
+            if failures >= max_retry:
+                print(f"[warn] batch({len(todo)}) 실패: {e}")
+                break
+            _backoff(failures)
+            continue
+        if isinstance(data, list):
+            by_id = {d.get("id"): d for d in data if isinstance(d, dict)}
+            again = []
+            for i in todo:
+                d = by_id.get(i, {})
+                if _is_limit_error(d.get("error")):
+                    again.append(i)
+                else:
+                    out[i] = d.get("result")
+                    if errors is not None and d.get("error") is not None:
+                        errors[i] = d["error"]
+        else:                              # HTTP 429 또는 배치 전체 rate-limit
+            again = todo
+        if not again:
+            _succeeded()
+            todo = []
+            break
+        if data is not None:
+            _throttled(ra)
+        limited += 1
+        todo = again
+        if limited > max_limited:
+            print(f"[warn] batch: {len(todo)}건 rate limit 재시도 초과")
+            break
+    if todo:
+        with _lock:
+            _stats["errors"] += len(todo)
+    return out
+
+def batch_call(calls, url=None, batch_size=None, max_workers=None, cache=True, errors=None):
+    """
+    calls 를 batch_size 단위로 나눠 최대 max_workers 개까지 동시에 전송(속도는 토큰 버킷이 조절).
+    캐시에 있는 항목은 보내지 않고, 받은 확정 블록 응답은 캐시에 저장.
+    cache=False: 캐시를 읽지 않고 전부 다시 조회(받은 확정 응답으로 캐시를 갱신).
+    errors(dict): 노드가 error 로 답한 항목의 {calls 인덱스: error 객체}(post_batch 참고).
+    """
+    out = rpccache.get_many(calls) if cache else [rpccache.MISS] * len(calls)
+    miss = [i for i, r in enumerate(out) if r is rpccache.MISS]
+    todo = [calls[i] for i in miss]
+    bs = batch_size or RPC_BATCH_SIZE
+    groups = [todo[i:i+bs] for i in range(0, len(todo), bs)]
+    errs = [{} for _ in groups]
+    if len(groups) <= 1:
+        results = [post_batch(g, url=url, errors=e) for g, e in zip(groups, errs)]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers or RPC_MAX_WORKERS) as ex:
+            results = list(ex.map(lambda ge: post_batch(ge[0], url=url, errors=ge[1]), zip(groups, errs)))
+    got = [x for res in results for x in res]
+    for i, r in zip(miss, got):
+        out[i] = r
+    if errors is not None:
+        for k, e in enumerate(errs):
+            errors.update((miss[k * bs + j], err) for j, err in e.items())
+    if any(m in rpccache.CACHEABLE and r is not None for (m, _), r in zip(todo, got)):
+        rpccache.put_many(todo, got, safe_block())
+    return out
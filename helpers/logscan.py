@@ -0,0 +1,208 @@
+# helpers/logscan.py
+# - 로그 청크 공용 리더 + topic0 디스패치
+# - 각 로그 파일(rawstore parquet 파티션 또는 레거시 logs_*.csv)을 한 번만 읽고,
+#   topic0 기준으로 등록된 디코더들에 행을 나눠 준다
+# - --workers N(또는 DECODE_WORKERS): 파일 단위 프로세스 풀 디코딩
+#   1) 워커가 파일을 읽어 임시 pickle 로 두고 (topic0, address) 만 부모에 넘김 → 부모가 prefetch(메타 일괄 해결)
+#   2) fork 된 워커는 메모리 스냅샷만 읽고 파일별 결과를 임시 pickle 로 저장
+#   3) 부모가 파일 순서대로 모음(이후 concat_sorted 정렬 = 단일 프로세스와 동일)
+# - 청크 사이드카 인덱스(chunkindex)로 디코더 topic0 가 없는 파일은 아예 열지 않음
+import os, sys, time, pickle, shutil, tempfile, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from evtdecode import split_topics, checksum
+import rawstore
+import chunkindex
+import metrics
+
+# prefetch 단위: 이 개수만큼 청크를 읽어 두고 메타를 한 번에 해결한 뒤 디코딩
+PREFETCH_GROUP = int(os.getenv("PREFETCH_GROUP", "64"))
+DECODE_WORKERS = int(os.getenv("DECODE_WORKERS", "1"))
+
+LOG_DTYPES = rawstore.DTYPES["logs"]
+
+def log_files():
+    """rawstore parquet 파티션(없으면 out/chunks/logs_*.csv, 그것도 없으면 out/logs.csv)."""
+    return rawstore.files("logs")
+
+def read_log_chunk(path, topic0s=None):
+    # dtype 강제: topics/data/address/tx 해시를 문자열로 고정
+    # topic0s: parquet 이면 해당 topic0 행만 읽음(푸시다운), CSV 는 전체
+    logs = rawstore.read(path, "logs", topic0s=topic0s)
+    for c in ["transaction_hash","log_index","address","data"]:
+        if c not in logs.columns:
+            logs[c] = "" if c != "log_index" else -1
+    return logs
+
+def route(logs, decoders):
+    """
+    decoders: {출력이름: (topic0 목록, fn(sub_logs) -> DataFrame)}
+    topics 분해는 한 번만 하고, 각 디코더에는 자기 topic0 행만 넘긴다.
+    반환: {출력이름: DataFrame}
+    """
+    logs = split_topics(logs)
+    t0 = logs["topic0"].to_numpy(dtype=object)
+    out = {}
+    for name, (topic0s, fn) in decoders.items():
+        mask = np.zeros(len(logs), dtype=bool)
+        for t in topic0s:
+            mask |= t0 == t.lower()
+        if mask.any():
+            out[name] = fn(logs[mask])
+    return out
+
+def addresses_by_topic0(frames, topic0s):
+    """split_topics 된 청크들에서 topic0 가 일치하는 행의 emitter 주소(체크섬, 등장 순서 고유값)."""
+    want = {t.lower() for t in topic0s}
+    out = {}
+    for lg in frames:
+        t0 = lg["topic0"].to_numpy(dtype=object)
+        addr = lg["address"].to_numpy(dtype=object, na_value=None)
+        for t, a in zip(t0, addr):
+            if t in want and a is not None:
+                cs = checksum(a)
+                if cs is not None:
+                    out[cs] = None
+    return list(out)
+
+def workers_arg(argv=None):
+    """명령행 --workers N(없으면 DECODE_WORKERS)."""
+    argv = sys.argv if argv is None else argv
+    if "--workers" in argv:
+        return max(1, int(argv[argv.index("--workers") + 1]))
+    return max(1, DECODE_WORKERS)
+
+def _collector(decoders, sinks):
+    """출력이름 → 청크 결과 받는 함수(sinks 에 있으면 그쪽으로 흘려보내고, 없으면 parts 에 모음)."""
+    parts = {name: [] for name in decoders if name not in (sinks or {})}
+    put = {name: (sinks or {}).get(name) or parts[name].append for name in decoders}
+    return parts, put
+
+def scan(files, decoders, prefetch=None, workers=1, worker_init=None, sinks=None):
+    """
+    파일마다 한 번 읽어 route. 반환: {출력이름: [청크별 DataFrame, ...]}
+    prefetch(frames): PREFETCH_GROUP 개 청크를 읽은 뒤 디코딩 전에 한 번 호출(메타 일괄 해결용).
+    workers > 1: 프로세스 풀(worker_init: fork 직후 워커에서 한 번 호출, 예: tokenmeta.freeze)
+    sinks: {출력이름: fn(df)} — 해당 출력은 모으지 않고 청크마다 파일 순서대로 넘김(streamout 등)
+    인덱스상 topic0 가 하나도 없는 파일은 건너뜀(인덱스가 없는 파일은 읽으면서 만듦)
+    """
+    topic0s = sorted({t.lower() for ts, _ in decoders.values() for t in ts})
+    n_all = len(files)
+    files, missing = chunkindex.select(files, topic0s)
+    if len(files) < n_all:
+        print(f"[index] reading {len(files)}/{n_all} log files (others have none of the decoder topic0s)")
+    if workers > 1 and len(files) > 1 and "fork" in multiprocessing.get_all_start_methods():
+        return _scan_pool(files, decoders, prefetch, workers, worker_init, sinks, topic0s, missing)
+    parts, put = _collector(decoders, sinks)
+    for g in range(0, len(files), PREFETCH_GROUP):
+        group = files[g:g+PREFETCH_GROUP]
+        with metrics.timer("read"):
+            frames = [split_topics(read_log_chunk(f, topic0s)) for f in group]
+        for f, logs in zip(group, frames):
+            metrics.read(f)
+            metrics.add("rows_in", len(logs))
+            if f in missing:
+                chunkindex.after_read(f, logs)
+        if prefetch is not None:
+            with metrics.timer("prefetch"):
+                prefetch(frames)
+        for f, logs in zip(group, frames):
+            with metrics.timer("decode"):
+                res = route(logs, decoders)
+            counts = []
+            for name, df in res.items():
+                if not df.empty:
+                    put[name](df)
+                counts.append(f"{name}={len(df)}")
+            print(f"[{rawstore.label(f)}] matched: {' '.join(counts) or '-'}")
+    return parts
+
+# ── 프로세스 풀 ──────────────────────────────────────────────────
+_job = {}   # fork 전에 채워 두면 워커가 그대로 물려받음(디코더 lambda 는 pickle 불가)
+
+def _init_worker():
+    if _job.get("init") is not None:
+        _job["init"]()
+
+def _pkl(name, i):
+    return os.path.join(_job["tmp"], f"{name}-{i:06d}.pkl")
+
+def _dump(obj, path):
+    with open(path, "wb") as fh:
+        pickle.dump(obj, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _load(path):
+    with open(path, "rb") as fh:
+        return pickle.load(fh)
+
+def _read_file(i):
+    """워커 1차: 파일 i 읽기 + topics 분해 → 임시 pickle. 반환 (i, 행 수, 초, prefetch 용 (topic0, address) 고유 쌍)."""
+    t = time.perf_counter()
+    path = _job["files"][i]
+    logs = split_topics(read_log_chunk(path, _job["topic0s"]))
+    if path in _job["missing"]:
+        chunkindex.after_read(path, logs)
+    _dump(logs, _pkl("logs", i))
+    keys = logs[["topic0", "address"]].drop_duplicates()
+    return i, len(logs), time.perf_counter() - t, keys
+
+def _decode_file(i):
+    """워커 2차: 메타 스냅샷으로 route → 결과별 pickle. 반환 (i, {이름: 행 수}, 초)."""
+    t = time.perf_counter()
+    path = _pkl("logs", i)
+    res = route(_load(path), _job["decoders"])
+    os.remove(path)
+    counts = {}
+    for name, df in res.items():
+        counts[name] = len(df)
+        if not df.empty:
+            _dump(df, _pkl(name, i))
+    return i, counts, time.perf_counter() - t
+
+def _scan_pool(files, decoders, prefetch, workers, worker_init, sinks, topic0s, missing):
+    """
+    1) 워커가 파일을 읽어 두고 (topic0, address) 고유 쌍만 돌려줌 → 부모가 prefetch(RPC·저장소 접근은 부모에서만)
+    2) 메타가 채워진 뒤 fork 된 워커(worker_init 으로 고정)가 디코딩 → 3) 부모가 파일 순서대로 결과를 모음
+    prefetch 에는 topic0/address 열만 있는 축약 프레임이 넘어감.
+    """
+    parts, put = _collector(decoders, sinks)
+    tmp = tempfile.mkdtemp(prefix=".scan-", dir="out" if os.path.isdir("out") else None)
+    _job.update(files=files, decoders=decoders, topic0s=topic0s, missing=missing, tmp=tmp, init=None)
+    ctx = multiprocessing.get_context("fork")
+    try:
+        keys = [None] * len(files)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as ex:
+            for i, n_in, dt, k in ex.map(_read_file, range(len(files)), chunksize=1):
+                metrics.read(files[i])
+                metrics.add("rows_in", n_in)
+                metrics.add_time("read", dt)
+                keys[i] = k
+        if prefetch is not None:
+            with metrics.timer("prefetch"):
+                for g in range(0, len(keys), PREFETCH_GROUP):
+                    prefetch(keys[g:g+PREFETCH_GROUP])
+        del keys
+        _job["init"] = worker_init
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as ex:
+            # map 은 제출 순서대로 결과를 돌려줌 → 파일 순서 유지
+            for i, counts, dt in ex.map(_decode_file, range(len(files)), chunksize=1):
+                metrics.add_time("decode", dt)
+                for name in decoders:
+                    if os.path.exists(_pkl(name, i)):
+                        put[name](_load(_pkl(name, i)))
+                        os.remove(_pkl(name, i))
+                shown = " ".join(f"{k}={v}" for k, v in counts.items())
+                print(f"[{rawstore.label(files[i])}] matched: {shown or '-'}")
+    finally:
+        _job.clear()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return parts
+
+def concat_sorted(frames, cols):
+    """청크별 결과 합치기 + (tx_hash, log_index) 정렬(빈 결과도 헤더 유지)."""
+    frames = [p for p in frames if not p.empty]
+    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=cols)
+    if not out.empty:
+        out = out.sort_values(["tx_hash","log_index"]).reset_index(drop=True)
+    return out[cols]
@@ -0,0 +1,81 @@
+# helpers/manifest.py
+# - 청크 단위 단계(03 receipts, 04 blocks/txs)의 완료 기록(체크포인트)
+# - out/manifest/<stage>.jsonl 에 단위별 한 줄씩 추가(같은 단위는 뒤쪽 기록 우선, 잘린 마지막 줄은 무시)
+# - 기록: unit, key(입력 식별), status(done/failed), 출력 파일별 rows + sha256
+# - 출력 파일은 임시 파일에 쓰고 os.replace 로 교체 → 중간에 죽어도 반쯤 쓴 파일이 남지 않음
+import os, json, time, hashlib
+
+MANIFEST_DIR = os.getenv("MANIFEST_DIR", "out/manifest")
+
+def path_of(stage):
+    return os.path.join(MANIFEST_DIR, f"{stage}.jsonl")
+
+def load(stage):
+    """stage 기록 → {unit: 마지막 기록}."""
+    out = {}
+    p = path_of(stage)
+    if not os.path.exists(p):
+        return out
+    with open(p) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue   # 기록 중 끊긴 줄
+            out[rec["unit"]] = rec
+    return out
+
+def reset(stage):
+    """새로 시작(--resume 아님): 이전 기록 삭제."""
+    if os.path.exists(path_of(stage)):
+        os.remove(path_of(stage))
+
+def sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for b in iter(lambda: f.read(1 << 20), b""):
+            h.update(b)
+    return h.hexdigest()
+
+def count_rows(path):
+    """데이터 행 수(CSV 는 헤더 제외, parquet 은 메타데이터)."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_metadata(path).num_rows
+    with open(path, "rb") as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+def record(stage, unit, files, status="done", key=None, rows=None, **extra):
+    """files: 출력 경로 목록. rows: {path: 행 수}(없으면 파일에서 셈)."""
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    rows = rows or {}
+    rec = {"unit": unit, "key": key, "status": status, "ts": int(time.time()),
+           "files": {p: {"rows": rows.get(p, count_rows(p)), "sha256": sha256(p)}
+                     for p in files if os.path.exists(p)}}
+    rec.update(extra)
+    with open(path_of(stage), "a") as f:
+        f.write(json.dumps(rec) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    return rec
+
+def is_done(rec, key=None):
+    """완료 기록이 있고, 입력 key 가 같고, 출력 파일이 그대로(sha256 일치)인지."""
+    if not rec or rec.get("status") != "done":
+        return False
+    if key is not None and rec.get("key") != key:
+        return False
+    return all(os.path.exists(p) and sha256(p) == v["sha256"] for p, v in rec["files"].items())
+
+def tmp_path(path):
+    """같은 디렉터리의 임시 경로(os.replace 가 원자적이려면 같은 파일시스템이어야 함)."""
+    d, name = os.path.split(path)
+    return os.path.join(d, f".{name}.tmp")
+
+def commit(tmp, path):
+    os.replace(tmp, path)
+
+def discard(*paths):
+    for p in paths:
+        try: os.remove(p)
+        except OSError: pass
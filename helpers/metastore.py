@@ -0,0 +1,123 @@
+# helpers/metastore.py
+# - 토큰 메타/풀 토큰 영구 저장소(SQLite, WAL 모드)
+# - 키: 소문자 주소(PRIMARY KEY → O(1) 조회), 일괄 upsert, 여러 프로세스 동시 사용 가능
+# - 최초 1회 기존 out/token_meta.csv, out/pool_tokens.csv 를 가져옴
+import os, sqlite3
+import pandas as pd
+
+DB_PATH   = os.getenv("META_DB", "out/meta.sqlite")
+META_CSV  = "out/token_meta.csv"
+POOL_CSV  = "out/pool_tokens.csv"
+_IN_CHUNK = 500   # SQLite 변수 개수 제한 대비 IN (...) 분할 크기
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_meta (
+    address   TEXT PRIMARY KEY,   -- 소문자
+    address_cs TEXT NOT NULL,     -- 체크섬
+    symbol    TEXT,
+    decimals  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pool_tokens (
+    pool      TEXT PRIMARY KEY,   -- 소문자
+    pool_cs   TEXT NOT NULL,
+    token0    TEXT NOT NULL,      -- 체크섬
+    token1    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    source    TEXT PRIMARY KEY,
+    rows      INTEGER NOT NULL
+);
+"""
+
+def open_store(path=None):
+    """DB 열기(없으면 생성) + WAL 설정 + 레거시 CSV 1회 가져오기."""
+    path = path or DB_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=60000")
+    conn.executescript(SCHEMA)
+    import_legacy_csv(conn)
+    return conn
+
+def import_legacy_csv(conn):
+    """기존 CSV 캐시를 한 번만 가져옴(중복 주소는 뒤쪽 행 우선). imports 테이블에 기록."""
+    done = {r[0] for r in conn.execute("SELECT source FROM imports")}
+    if META_CSV not in done and os.path.exists(META_CSV):
+        # 빈 심볼("")이 NaN 으로 바뀌지 않도록 symbol 은 문자열 그대로 읽음
+        df = pd.read_csv(META_CSV, dtype={"symbol": str}, keep_default_na=False)
+        rows = [(str(a), s, int(d)) for a, s, d in zip(df["address"], df["symbol"], df["decimals"])]
+        with conn:
+            upsert_tokens(conn, rows, commit=False)
+            conn.execute("INSERT OR REPLACE INTO imports VALUES (?,?)", (META_CSV, len(rows)))
+        print(f"[metastore] imported {META_CSV}: {len(rows)} rows")
+    if POOL_CSV not in done and os.path.exists(POOL_CSV):
+        df = pd.read_csv(POOL_CSV, dtype=str)
+        rows = list(zip(df["pool"], df["token0"], df["token1"]))
+        with conn:
+            upsert_pools(conn, rows, commit=False)
+            conn.execute("INSERT OR REPLACE INTO imports VALUES (?,?)", (POOL_CSV, len(rows)))
+        print(f"[metastore] imported {POOL_CSV}: {len(rows)} rows")
+
+def upsert_tokens(conn, rows, commit=True):
+    """rows: [(address_cs, symbol, decimals), ...]"""
+    sql = ("INSERT INTO token_meta(address, address_cs, symbol, decimals) VALUES (?,?,?,?) "
+           "ON CONFLICT(address) DO UPDATE SET address_cs=excluded.address_cs, "
+           "symbol=excluded.symbol, decimals=excluded.decimals")
+    data = [(a.lower(), a, s, int(d)) for a, s, d in rows]
+    if commit:
+        with conn:
+            conn.executemany(sql, data)
+    else:
+        conn.executemany(sql, data)
+
+def upsert_pools(conn, rows, commit=True):
+    """rows: [(pool_cs, token0_cs, token1_cs), ...]"""
+    sql = ("INSERT INTO pool_tokens(pool, pool_cs, token0, token1) VALUES (?,?,?,?) "
+           "ON CONFLICT(pool) DO UPDATE SET pool_cs=excluded.pool_cs, "
+           "token0=excluded.token0, token1=excluded.token1")
+    data = [(p.lower(), p, t0, t1) for p, t0, t1 in rows]
+    if commit:
+        with conn:
+            conn.executemany(sql, data)
+    else:
+        conn.executemany(sql, data)
+
+def _select_in(conn, sql, keys):
+    out = []
+    keys = list(keys)
+    for i in range(0, len(keys), _IN_CHUNK):
+        part = keys[i:i+_IN_CHUNK]
+        out += conn.execute(sql.format(",".join("?" * len(part))), part).fetchall()
+    return out
+
+def get_tokens(conn, addrs):
+    """소문자 주소 목록 → {lower: (symbol, decimals)} (저장소에 있는 것만)."""
+    rows = _select_in(conn, "SELECT address, symbol, decimals FROM token_meta WHERE address IN ({})",
+                      {a.lower() for a in addrs})
+    return {a: (s, int(d)) for a, s, d in rows}
+
+def get_pools(conn, pools):
+    """풀 주소 목록 → {lower: (token0, token1)} (저장소에 있는 것만)."""
+    rows = _select_in(conn, "SELECT pool, token0, token1 FROM pool_tokens WHERE pool IN ({})",
+                      {p.lower() for p in pools})
+    return {p: (t0, t1) for p, t0, t1 in rows}
+
+def export_csv(conn, meta_csv=META_CSV, pool_csv=POOL_CSV):
+    """저장소 내용을 CSV로 내보내기(중복 없는 스냅샷, 주소 순)."""
+    pd.read_sql_query("SELECT address_cs AS address, symbol, decimals FROM token_meta ORDER BY address",
+                      conn).to_csv(meta_csv, index=False)
+    pd.read_sql_query("SELECT pool_cs AS pool, token0, token1 FROM pool_tokens ORDER BY pool",
+                      conn).to_csv(pool_csv, index=False)
+
+if __name__ == "__main__":
+    # 사용: python helpers/metastore.py [--export]
+    import sys
+    conn = open_store()
+    n_t = conn.execute("SELECT COUNT(*) FROM token_meta").fetchone()[0]
+    n_p = conn.execute("SELECT COUNT(*) FROM pool_tokens").fetchone()[0]
+    print(f"{DB_PATH}: tokens={n_t} pools={n_p}")
+    if "--export" in sys.argv:
+        export_csv(conn)
+        print("exported ->", META_CSV, POOL_CSV)
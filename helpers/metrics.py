@@ -0,0 +1,205 @@
+# helpers/metrics.py
+# - 단계 계측 공용 API(01~10): 단계마다 한 항목으로 out/metrics.json 에 기록
+#   · 자동: 벽시계/CPU 시간(자식 프로세스 포함), 최대 RSS, 블록 I/O, RPC 호출(메서드별)·재시도·429(jsonrpc),
+#     캐시 적중(rpccache) — 각 모듈을 import 한 단계에서만
+#   · 단계가 직접: add("rows_in"/"rows_out"/..., n), read(path)/wrote(path) 로 읽고 쓴 바이트,
+#     with timer("decode"): ... 로 구간별 누적 시간(워커 프로세스에서 잰 시간은 add_time 으로 합산)
+# - 사용: metrics.start("07_transfers") → 프로세스 종료 시(atexit) 기록. 실패로 끝나면 status="failed"
+#   · 잡히지 않은 예외: start 가 sys.excepthook 을 감싸 표시
+#   · 일부러 끝낼 때는 raise SystemExit 대신 metrics.fail("이유") — SystemExit 는 excepthook 을 거치지 않고
+#     atexit 에서는 종료 코드를 알 수 없음
+# - METRICS_PATH(기본 out/metrics.json): {"stages": {stage: {...}}} — 같은 단계는 마지막 실행으로 덮어씀
+#   METRICS_RUN_ID 를 주면 항목에 함께 기록(여러 단계를 한 실행으로 묶어 보기)
+# - METRICS_PROM 경로를 주면 metrics.json 전체를 Prometheus textfile 형식으로도 씀(node_exporter textfile collector)
+# - gauge(key, v): 마지막 값만 남는 지표(09 --follow 의 head/lag 등). 오래 도는 프로세스는 flush("running") 로 중간 기록
+# - METRICS=0 이면 끔
+import os, sys, json, time, fcntl, resource, threading, atexit
+from contextlib import contextmanager
+
+METRICS        = os.getenv("METRICS", "1") == "1"
+METRICS_PATH   = os.getenv("METRICS_PATH", "out/metrics.json")
+METRICS_PROM   = os.getenv("METRICS_PROM", "")
+METRICS_RUN_ID = os.getenv("METRICS_RUN_ID", "")
+
+_lock = threading.Lock()
+_state = {"stage": None, "t0": None, "cpu0": None, "ts": None, "failed": False}
+_counters = {}                  # rows_in, rows_out, bytes_read, bytes_written, ... → 누적값
+_timers = {}                    # 구간 이름 → [초, 횟수]
+_gauges = {}                    # 현재 값(덮어씀)
+
+def start(stage):
+    """이 프로세스의 단계 이름 지정 + 시간 측정 시작(종료 시 자동 기록)."""
+    _state.update(stage=stage, t0=time.perf_counter(), cpu0=os.times(), ts=time.time())
+    if sys.excepthook is not _excepthook:
+        _state["prev_hook"] = sys.excepthook
+        sys.excepthook = _excepthook
+
+def _excepthook(tp, value, tb):
+    _state["failed"] = True
+    _state["prev_hook"](tp, value, tb)
+
+def fail(msg):
+    """실패로 종료(status="failed", 종료 코드 1, msg 출력)."""
+    _state["failed"] = True
+    raise SystemExit(msg)
+
+def add(key, n=1):
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+def read(path):
+    """읽은 파일 크기를 bytes_read 에 더함(없는 파일은 무시)."""
+    if os.path.exists(path):
+        add("bytes_read", os.path.getsize(path))
+
+def wrote(path):
+    """쓴 파일 크기를 bytes_written 에 더함."""
+    if os.path.exists(path):
+        add("bytes_written", os.path.getsize(path))
+
+@contextmanager
+def timer(name):
+    """구간 누적 시간(스레드 안전). 같은 이름은 합산."""
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t
+        with _lock:
+            s = _timers.setdefault(name, [0.0, 0])
+            s[0] += dt
+            s[1] += 1
+
+def gauge(key, value):
+    """현재 값 지표(마지막 값만 기록)."""
+    with _lock:
+        _gauges[key] = value
+
+def add_time(name, seconds, n=1):
+    """다른 프로세스(워커)에서 잰 구간 시간을 합산."""
+    with _lock:
+        s = _timers.setdefault(name, [0.0, 0])
+        s[0] += seconds
+        s[1] += n
+
+def snapshot():
+    """현재까지의 단계 지표(dict)."""
+    c = os.times()
+    c0 = _state["cpu0"] or c
+    me, kids = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+    with _lock:
+        out = {"run_id": METRICS_RUN_ID or None, "started": _state["ts"],
+               "wall_s": round(time.perf_counter() - (_state["t0"] or time.perf_counter()), 3),
+               "cpu_s": round((c.user - c0.user) + (c.system - c0.system), 3),
+               "children_cpu_s": round((c.children_user - c0.children_user)
+                                       + (c.children_system - c0.children_system), 3),
+               "peak_rss_mb": round(me.ru_maxrss / 1024, 1),             # Linux: KiB
+               "children_peak_rss_mb": round(kids.ru_maxrss / 1024, 1),
+               "block_io": {"in": me.ru_inblock + kids.ru_inblock, "out": me.ru_oublock + kids.ru_oublock},
+               **{k: v for k, v in sorted(_counters.items())},
+               "timers": {k: {"s": round(s, 3), "n": n} for k, (s, n) in sorted(_timers.items())}}
+        if _gauges:
+            out["gauges"] = dict(sorted(_gauges.items()))
+    for k in ("rows_in", "rows_out", "bytes_read", "bytes_written"):
+        out.setdefault(k, 0)
+    if out["wall_s"] > 0:
+        out["rows_per_s"] = round(out["rows_out"] / out["wall_s"], 1)
+    # 이 단계가 쓴 모듈만(import 하지 않은 단계에 연결 시도 등의 부작용 없이)
+    if "jsonrpc" in sys.modules:
+        s = sys.modules["jsonrpc"].stats()
+        out["rpc"] = {"requests": s["requests"], "calls": s["calls"], "by_method": s.get("methods", {}),
+                      "retries": s["retries"], "throttled": s["throttled"], "errors": s["errors"],
+                      "final_rate": s["rate"]}
+    if "rpccache" in sys.modules and sys.modules["rpccache"].RPC_CACHE:
+        out["cache"] = sys.modules["rpccache"].stats()
+    return out
+
+def _prom(stages):
+    """{stage: 지표} → Prometheus text exposition."""
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"')
+    series = {}
+    def put(name, help_, labels, v):
+        if v is None:
+            return
+        lab = ",".join(f'{k}="{esc(x)}"' for k, x in labels.items())
+        series.setdefault(name, [help_, []])[1].append(f"{name}{{{lab}}} {v}")
+    for st, m in sorted(stages.items()):
+        L = {"stage": st}
+        put("pipeline_stage_last_run_timestamp_seconds", "stage start time", L, m.get("started"))
+        put("pipeline_stage_success", "1 if the last run finished ok (or is still running)", L,
+            int(m.get("status") in ("ok", "running")))
+        put("pipeline_stage_wall_seconds", "wall clock time", L, m.get("wall_s"))
+        put("pipeline_stage_cpu_seconds", "CPU time (user+sys)", dict(L, proc="self"), m.get("cpu_s"))
+        put("pipeline_stage_cpu_seconds", "CPU time (user+sys)", dict(L, proc="children"), m.get("children_cpu_s"))
+        put("pipeline_stage_peak_rss_bytes", "peak resident set size", dict(L, proc="self"),
+            int(m.get("peak_rss_mb", 0) * 1048576))
+        put("pipeline_stage_peak_rss_bytes", "peak resident set size", dict(L, proc="children"),
+            int(m.get("children_peak_rss_mb", 0) * 1048576))
+        for k in ("rows_in", "rows_out", "bytes_read", "bytes_written"):
+            put(f"pipeline_stage_{k}", k.replace("_", " "), L, m.get(k, 0))
+        for k, v in m.get("gauges", {}).items():
+            put(f"pipeline_stage_{k}", k.replace("_", " "), L, v)
+        for k, t in m.get("timers", {}).items():
+            put("pipeline_stage_section_seconds", "accumulated time per instrumented section", dict(L, section=k), t["s"])
+        r = m.get("rpc")
+        if r:
+            for meth, n in sorted(r["by_method"].items()):
+                put("pipeline_stage_rpc_calls", "JSON-RPC calls sent", dict(L, method=meth), n)
+            put("pipeline_stage_rpc_requests", "HTTP requests (a batch counts once)", L, r["requests"])
+            put("pipeline_stage_rpc_retries", "retries after transport errors", L, r["retries"])
+            put("pipeline_stage_rpc_throttled", "rate-limit responses (429 etc.)", L, r["throttled"])
+            put("pipeline_stage_rpc_errors", "calls that failed for good", L, r["errors"])
+        c = (m.get("cache") or {}).get("all")
+        if c:
+            put("pipeline_stage_cache_hits", "RPC cache hits", L, c["hits"])
+            put("pipeline_stage_cache_misses", "RPC cache misses", L, c["misses"])
+    lines = []
+    for name, (help_, rows) in series.items():
+        lines += [f"# HELP {name} {help_}", f"# TYPE {name} gauge"] + rows
+    return "\n".join(lines) + "\n"
+
+def _replace(path, text):
+    tmp = os.path.join(os.path.dirname(path) or ".", f".{os.path.basename(path)}.tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def flush(status="ok"):
+    """metrics.json 의 이 단계 항목 갱신(+ METRICS_PROM). 여러 프로세스가 동시에 써도 잠금으로 직렬화."""
+    if not METRICS or not _state["stage"]:
+        return None
+    m = dict(snapshot(), status=status)
+    os.makedirs(os.path.dirname(METRICS_PATH) or ".", exist_ok=True)
+    with open(METRICS_PATH + ".lock", "w") as lk:
+        fcntl.flock(lk, fcntl.LOCK_EX)
+        try:
+            doc = json.load(open(METRICS_PATH)) if os.path.exists(METRICS_PATH) else {}
+        except ValueError:
+            doc = {}
+        doc.setdefault("stages", {})[_state["stage"]] = m
+        doc["updated"] = time.time()
+        _replace(METRICS_PATH, json.dumps(doc, indent=2, ensure_ascii=False))
+        if METRICS_PROM:
+            os.makedirs(os.path.dirname(METRICS_PROM) or ".", exist_ok=True)
+            _replace(METRICS_PROM, _prom(doc["stages"]))
+    return m
+
+@atexit.register
+def _at_exit():
+    flush("failed" if _state["failed"] else "ok")
+
+if __name__ == "__main__":
+    # 사용: python helpers/metrics.py [--prom] — metrics.json 요약(또는 Prometheus 텍스트) 출력
+    doc = json.load(open(METRICS_PATH))
+    if "--prom" in sys.argv:
+        sys.stdout.write(_prom(doc["stages"]))
+        raise SystemExit
+    print(f"{'stage':<16}{'status':>8}{'wall_s':>9}{'cpu_s':>9}{'rows_in':>10}{'rows_out':>10}"
+          f"{'rpc':>8}{'429':>6}{'cache%':>8}{'MB_r':>8}{'MB_w':>8}{'rss_mb':>8}")
+    for st, m in sorted(doc["stages"].items()):
+        r, c = m.get("rpc") or {}, (m.get("cache") or {}).get("all") or {}
+        print(f"{st:<16}{m['status']:>8}{m['wall_s']:>9.2f}{m['cpu_s'] + m['children_cpu_s']:>9.2f}"
+              f"{m['rows_in']:>10}{m['rows_out']:>10}{r.get('calls', 0):>8}{r.get('throttled', 0):>6}"
+              f"{c.get('hit_rate', 0) * 100:>7.0f}%{m['bytes_read'] / 1e6:>8.1f}{m['bytes_written'] / 1e6:>8.1f}"
+              f"{max(m['peak_rss_mb'], m['children_peak_rss_mb']):>8.0f}")
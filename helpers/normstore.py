@@ -0,0 +1,170 @@
+# helpers/normstore.py
+# - 블록 구간 파티션 표(정규화 표 out/normalized 등): <dir>/blocks=<구간 시작>.<csv|parquet>
+#   구간 = block_number // NORM_PARTITION_BLOCKS * NORM_PARTITION_BLOCKS
+# - 카탈로그 <dir>/_catalog.json: 있는 파티션(구간·파일·행 수·최소/최대 블록·갱신 시각 + 쓴 쪽이 남긴 입력 키)
+#   파티션 파일은 임시 파일 → os.replace, 카탈로그도 파티션마다 같은 방식으로 갱신
+#   → 중간에 죽어도 카탈로그에 있는 파티션은 온전한 파일
+# - 06: 입력이 바뀐/새로 생긴 구간만 다시 조인해 파티션 교체(write_partition)
+#   09: 처리한 블록 범위만 upsert(기존 파티션에서 그 범위 행을 빼고 새 행을 넣음)
+# - 표마다 쓰는 쪽(owner)은 하나: 카탈로그에 owner 를 남기고, 다른 owner 가 열면 오류
+#   (06 의 out/normalized 와 09 의 OUT_DIR/normalized_09 는 서로 다른 표 — 06 이 09 파티션을 다시 만들거나 지우지 않도록)
+# - 읽기: files(t) / read(t, lo, hi) — 카탈로그 순서(블록 순), 전체 표를 다시 만들 필요 없음
+# 사용: python helpers/normstore.py [표 디렉터리(기본 out/normalized)] [--export out/normalized.csv]
+#   → 파티션 요약 / 단일 CSV 로 내보내기(한 파일을 기대하는 기존 소비자용)
+import os, sys, json, time
+import pandas as pd
+
+PARTITION_BLOCKS = int(os.getenv("NORM_PARTITION_BLOCKS", "10000"))
+CATALOG = "_catalog.json"
+KEY = "block_number"
+
+def bucket_of(block_number):
+    return int(block_number) // PARTITION_BLOCKS * PARTITION_BLOCKS
+
+def _replace(path, text):
+    tmp = os.path.join(os.path.dirname(path) or ".", f".{os.path.basename(path)}.tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def open_table(d, reset=False, owner=None):
+    """
+    표(dict: dir + 카탈로그 내용). 파티션 크기가 카탈로그와 다르거나 reset 이면 기존 파티션을 지우고 새로 시작.
+    owner: 이 표를 쓰는 쪽(예: "06") — 카탈로그의 owner 와 다르면 RuntimeError(읽기만 할 때는 None).
+    """
+    os.makedirs(d, exist_ok=True)
+    path = os.path.join(d, CATALOG)
+    cat = json.load(open(path)) if os.path.exists(path) else {}
+    if owner and cat.get("owner", owner) != owner:
+        raise RuntimeError(f"{d}: {cat['owner']} 가 쓰는 표 — {owner} 는 다른 디렉터리를 써야 함")
+    if cat and (reset or cat.get("partition_blocks") != PARTITION_BLOCKS):
+        if not reset:
+            print(f"[normstore] {d}: partition size {cat.get('partition_blocks')} → {PARTITION_BLOCKS}, rebuilding")
+        for p in cat.get("partitions", {}).values():
+            _remove(os.path.join(d, p["file"]))
+        cat = {}
+    cat.setdefault("partition_blocks", PARTITION_BLOCKS)
+    cat.setdefault("partitions", {})
+    if owner:
+        cat["owner"] = owner
+    return dict(cat, dir=d)
+
+def save(t):
+    doc = {k: v for k, v in t.items() if k != "dir"}
+    doc["updated"] = time.time()
+    _replace(os.path.join(t["dir"], CATALOG), json.dumps(doc, indent=1))
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+def partitions(t):
+    """카탈로그의 파티션 항목(구간 순)."""
+    return [t["partitions"][k] for k in sorted(t["partitions"], key=int)]
+
+def files(t, lo=None, hi=None):
+    """[lo, hi] 블록과 겹치는 파티션 파일(구간 순). 범위를 안 주면 전체."""
+    return [os.path.join(t["dir"], p["file"]) for p in partitions(t)
+            if (lo is None or p["end"] >= lo) and (hi is None or p["start"] <= hi)]
+
+def _read_file(path, raw=False):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    # raw: 값을 쓴 그대로(다시 써도 같은 바이트)
+    return pd.read_csv(path, dtype=str, keep_default_na=False) if raw else pd.read_csv(path, low_memory=False)
+
+def read(t, lo=None, hi=None, columns=None):
+    """[lo, hi] 블록 범위 행(파티션 순으로 이어 붙임)."""
+    frames = []
+    for f in files(t, lo, hi):
+        df = _read_file(f)
+        if lo is not None or hi is not None:
+            bn = pd.to_numeric(df[KEY])
+            df = df[bn.between(lo if lo is not None else bn.min(), hi if hi is not None else bn.max())]
+        frames.append(df[columns] if columns else df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+def write_partition(t, start, df, fmt="csv", **meta):
+    """구간 start 파티션을 df 로 교체(임시 파일 → os.replace) + 카탈로그 갱신. meta: 쓴 쪽의 입력 키 등."""
+    name = f"blocks={start}.{fmt}"
+    path = os.path.join(t["dir"], name)
+    tmp = os.path.join(t["dir"], f".{name}.tmp")
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    old = t["partitions"].get(str(start))
+    if old and old["file"] != name:
+        _remove(os.path.join(t["dir"], old["file"]))
+    bn = pd.to_numeric(df[KEY])
+    t["partitions"][str(start)] = dict(start=start, end=start + PARTITION_BLOCKS - 1, file=name, rows=len(df),
+                                       min_block=int(bn.min()), max_block=int(bn.max()),
+                                       written=time.time(), **meta)
+    save(t)
+    return path
+
+def drop_partition(t, start):
+    old = t["partitions"].pop(str(start), None)
+    if old:
+        save(t)
+        _remove(os.path.join(t["dir"], old["file"]))
+
+def upsert(t, df, lo, hi, fmt="csv"):
+    """
+    블록 [lo, hi] 범위를 df 로 교체: 겹치는 파티션마다 범위 밖 기존 행 + 범위 안 새 행(블록 순 안정 정렬).
+    df 가 비어 있으면 그 범위 행을 지움. 반환: 바뀐 파티션 구간 목록.
+    """
+    bn = pd.to_numeric(df[KEY]) if len(df) else pd.Series(dtype="int64")
+    assert bn.between(lo, hi).all(), f"upsert 범위 밖 행: [{lo}, {hi}]"
+    buckets = bn // PARTITION_BLOCKS * PARTITION_BLOCKS
+    touched = set(buckets.astype(int)) | {p["start"] for p in partitions(t) if p["end"] >= lo and p["start"] <= hi}
+    for s in sorted(touched):
+        parts = []
+        if str(s) in t["partitions"]:
+            old = _read_file(os.path.join(t["dir"], t["partitions"][str(s)]["file"]), raw=True)
+            parts.append(old[~pd.to_numeric(old[KEY]).between(lo, hi)])
+        parts.append(df[(buckets == s).to_numpy()])
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            drop_partition(t, s)
+            continue
+        out = pd.concat(parts, ignore_index=True)
+        out = out.iloc[pd.to_numeric(out[KEY]).argsort(kind="stable").to_numpy()]
+        write_partition(t, s, out, fmt)
+    return sorted(touched)
+
+def export(t, path):
+    """전체 표 → 단일 CSV(헤더 1번 + 파티션 순). 임시 파일 → os.replace. 반환: 행 수."""
+    tmp = os.path.join(os.path.dirname(path) or ".", f".{os.path.basename(path)}.tmp")
+    ps = partitions(t)
+    with open(tmp, "w", newline="") as out:
+        for i, p in enumerate(ps):
+            f = os.path.join(t["dir"], p["file"])
+            if f.endswith(".parquet"):
+                pd.read_parquet(f).to_csv(out, index=False, header=i == 0)
+                continue
+            with open(f, newline="") as src:
+                head = src.readline()
+                if i == 0:
+                    out.write(head)
+                for line in src:
+                    out.write(line)
+    n = sum(p["rows"] for p in ps)
+    os.replace(tmp, path)
+    return n
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    dest = None
+    if "--export" in args:
+        i = args.index("--export")
+        dest = args[i + 1]
+        del args[i:i + 2]
+    t = open_table(args[0] if args else "out/normalized")
+    ps = partitions(t)
+    print(f"{t['dir']}: partitions={len(ps)} rows={sum(p['rows'] for p in ps)} (partition_blocks={PARTITION_BLOCKS})")
+    for p in ps:
+        print(f"  [{p['start']}-{p['end']}] blocks {p['min_block']}-{p['max_block']} rows={p['rows']} {p['file']}")
+    if dest:
+        print(f"exported {export(t, dest)} rows -> {dest}")
@@ -0,0 +1,226 @@
+# helpers/rawstore.py
+# - 원시 logs/receipts 저장소: Parquet(zstd), 블록 구간 단위 파티션
+#     out/raw/<kind>/blocks=<구간 시작>/part-<unit>.parquet   (kind = logs | receipts)
+# - logs 는 topic0 열을 따로 두고(딕셔너리 인코딩) 파일 안에서 topic0 순으로 정렬
+#   → 행 그룹 min/max 통계로 필요 없는 topic0 행 그룹을 읽지 않음(filters 푸시다운)
+# - 리더 API 하나로 새 저장소와 레거시 CSV(out/chunks/*.csv, out/logs.csv)를 같이 처리
+#   (저장소에 파일이 있으면 저장소, 없으면 CSV)
+# - tx/블록 해시는 32바이트, 주소는 20바이트 고정 폭 바이너리로 저장(emitter 주소는 사전 인코딩)
+#   hex 문자열은 읽어서 DataFrame 으로 내보낼 때만 만든다
+import os, glob
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import hexbin
+
+RAW_DIR          = os.getenv("RAW_DIR", "out/raw")
+RAW_FORMAT       = os.getenv("RAW_FORMAT", "parquet").lower()   # 03 출력 형식: parquet | csv
+PARTITION_BLOCKS = int(os.getenv("RAW_PARTITION_BLOCKS", "10000"))
+ROW_GROUP_SIZE   = int(os.getenv("RAW_ROW_GROUP_SIZE", "20000"))
+
+_DICT = pa.dictionary(pa.int32(), pa.string())
+_H32  = pa.binary(hexbin.HASH_BYTES)
+_A20  = pa.binary(hexbin.ADDR_BYTES)
+SCHEMAS = {
+    "logs": pa.schema([
+        ("log_index", pa.int64()), ("transaction_hash", _H32), ("transaction_index", pa.int64()),
+        ("block_hash", _H32), ("block_number", pa.int64()), ("address", pa.dictionary(pa.int32(), _A20)),
+        ("data", pa.string()), ("topics", pa.string()), ("topic0", _DICT),
+    ]),
+    "receipts": pa.schema([
+        ("transaction_hash", _H32), ("transaction_index", pa.int64()), ("block_hash", _H32),
+        ("block_number", pa.int64()), ("cumulative_gas_used", pa.int64()), ("gas_used", pa.int64()),
+        ("contract_address", _A20), ("root", pa.string()), ("status", pa.int64()),
+        ("effective_gas_price", pa.int64()), ("l1_fee", pa.int64()), ("l1_gas_used", pa.int64()),
+        ("l1_gas_price", pa.int64()), ("l1_fee_scalar", pa.float64()), ("blob_gas_price", pa.int64()),
+        ("blob_gas_used", pa.int64()),
+    ]),
+}
+# 레거시 CSV 와 같은 pandas dtype 으로 돌려주기(디코더 결과가 형식과 무관하게 동일하도록)
+DTYPES = {
+    "logs": {"topics":"string", "data":"string", "address":"string", "transaction_hash":"string"},
+    "receipts": {},
+}
+LEGACY_GLOB = {"logs": "out/chunks/logs_*.csv", "receipts": "out/chunks/receipts_*.csv"}
+LEGACY_ONE  = {"logs": "out/logs.csv", "receipts": "out/receipts.csv"}
+
+def bucket_of(block_number):
+    return int(block_number) // PARTITION_BLOCKS * PARTITION_BLOCKS
+
+def parts(kind):
+    """저장소의 parquet 파일(파티션·unit 순)."""
+    return sorted(glob.glob(os.path.join(RAW_DIR, kind, "blocks=*", "part-*.parquet")))
+
+def files(kind):
+    """읽을 파일 목록: 저장소 → 레거시 청크 CSV → 단일 CSV 순으로 있는 것."""
+    out = parts(kind) or sorted(glob.glob(LEGACY_GLOB[kind]))
+    if not out and os.path.exists(LEGACY_ONE[kind]):
+        out = [LEGACY_ONE[kind]]
+    return out
+
+def label(path):
+    """로그 출력용 짧은 이름(parquet 은 파티션 포함)."""
+    if path.endswith(".parquet"):
+        return f"{os.path.basename(os.path.dirname(path))}/{os.path.basename(path)}"
+    return os.path.basename(path)
+
+# ── 쓰기 ─────────────────────────────────────────────────────────
+def _plain(schema):
+    """딕셔너리 열을 값 타입으로 바꾼 스키마(정렬은 일반 열에서만 가능)."""
+    return pa.schema([(f.name, f.type.value_type if pa.types.is_dictionary(f.type) else f.type) for f in schema])
+
+def _is_fixed(t):
+    return pa.types.is_fixed_size_binary(t)
+
+def _to_bin(col, width):
+    """hex 문자열 열 → 고정 폭 바이너리 열(빈 값/잘못된 값은 null)."""
+    ok, arr = hexbin.to_bin(col.to_pylist(), width)
+    out = pa.FixedSizeBinaryArray.from_buffers(pa.binary(width), len(arr), [None, pa.py_buffer(arr.tobytes())])
+    return out if ok.all() else pc.if_else(pa.array(ok), out, pa.scalar(None, pa.binary(width)))
+
+def _to_hex(col):
+    """고정 폭 바이너리 열 → "0x.." 문자열 열(null 유지)."""
+    arr = col.combine_chunks() if isinstance(col, pa.ChunkedArray) else col
+    w = arr.type.byte_width
+    raw = np.frombuffer(arr.buffers()[1], dtype=f"S{w}", count=arr.offset + len(arr))[arr.offset:]
+    ok = arr.is_valid().to_numpy(zero_copy_only=False)
+    return pa.array(hexbin.to_hex(raw, ok), pa.string())
+
+def _table(kind, rows):
+    """행(dict) 목록 → Arrow 테이블(딕셔너리 인코딩 전, logs 는 topic0 추가, 해시/주소는 바이너리)."""
+    if kind == "logs":
+        rows = [dict(r, topic0=(r["topics"].split(",", 1)[0].lower() or None) if r.get("topics") else None)
+                for r in rows]
+    plain = _plain(SCHEMAS[kind])
+    text = pa.schema([(f.name, pa.string() if _is_fixed(f.type) else f.type) for f in plain])
+    table = pa.Table.from_pylist(rows, schema=text)
+    for i, f in enumerate(plain):
+        if _is_fixed(f.type):
+            table = table.set_column(i, f.name, _to_bin(table.column(i), f.type.byte_width))
+    return table
+
+def _dict_encode(table, schema):
+    """스키마에서 딕셔너리 타입인 열만 사전 인코딩(topic0, emitter 주소)."""
+    for i, f in enumerate(schema):
+        if pa.types.is_dictionary(f.type):
+            table = table.set_column(i, f.name, pc.dictionary_encode(table.column(i)))
+    return table
+
+def _to_pandas(table):
+    """Arrow → pandas: 딕셔너리 열은 풀고, 바이너리 해시/주소는 hex 문자열로(레거시 CSV 와 같은 형태)."""
+    for i, f in enumerate(table.schema):
+        col = table.column(i)
+        if pa.types.is_dictionary(f.type):
+            col = col.cast(f.type.value_type)
+        if _is_fixed(col.type):
+            col = _to_hex(col)
+        if col is not table.column(i):
+            table = table.set_column(i, f.name, col)
+    return table.to_pandas()
+
+def remove_unit(kind, unit):
+    """모든 파티션에서 해당 unit 파일 삭제(청크 구성이 바뀌어 다른 파티션에 남은 것 포함)."""
+    for f in glob.glob(os.path.join(RAW_DIR, kind, "blocks=*", f"part-{unit}.parquet")):
+        os.remove(f)
+
+def write_unit(kind, unit, rows):
+    """
+    한 단위(03 의 청크 등)의 행들을 블록 구간 파티션별 parquet 으로 쓴다(임시 파일 → rename).
+    반환: 쓴 파일 경로 목록.
+    """
+    remove_unit(kind, unit)
+    table = _table(kind, rows)
+    if table.num_rows == 0:
+        return []
+    sort_keys = [("block_number", "ascending")]
+    if kind == "logs":
+        sort_keys = [("topic0", "ascending"), ("block_number", "ascending"), ("log_index", "ascending")]
+    buckets = pd.Series(table.column("block_number").to_numpy()) // PARTITION_BLOCKS * PARTITION_BLOCKS
+    out = []
+    for b in sorted(buckets.unique()):
+        sub = table.filter(pa.array((buckets == b).to_numpy())).sort_by(sort_keys)
+        sub = _dict_encode(sub, SCHEMAS[kind])
+        d = os.path.join(RAW_DIR, kind, f"blocks={b}")
+        os.makedirs(d, exist_ok=True)
+        path = os.path.join(d, f"part-{unit}.parquet")
+        tmp = os.path.join(d, f".part-{unit}.parquet.tmp")
+        pq.write_table(sub, tmp, compression="zstd", row_group_size=ROW_GROUP_SIZE,
+                       use_dictionary=["address", "topic0"] if kind == "logs" else True)
+        os.replace(tmp, path)
+        out.append(path)
+    return out
+
+# ── 읽기 ─────────────────────────────────────────────────────────
+def read(path, kind="logs", columns=None, topic0s=None):
+    """
+    파일 하나 읽기(parquet/CSV 공통). columns: 있는 열만 읽음.
+    topic0s: logs parquet 이면 행 그룹/행 필터로 해당 topic0 만 읽음(CSV 는 전체).
+    """
+    if path.endswith(".parquet"):
+        names = pq.read_schema(path).names
+        cols = [c for c in (columns or [n for n in names if n != "topic0"]) if c in names]
+        filters = [("topic0", "in", sorted({t.lower() for t in topic0s}))] if topic0s and "topic0" in names else None
+        df = _to_pandas(pq.read_table(path, columns=cols, filters=filters))
+    else:
+        head = pd.read_csv(path, nrows=0).columns.str.strip().tolist()
+        usecols = [c for c in columns if c in head] if columns else None
+        df = pd.read_csv(path, usecols=usecols, dtype=DTYPES[kind], low_memory=False)
+        if usecols:
+            df = df[usecols]   # parquet 과 같은 열 순서(요청 순서)
+    dt = {c: t for c, t in DTYPES[kind].items() if c in df.columns}
+    return df.astype(dt) if dt else df
+
+def iter_batches(kind, columns=None, batch_rows=200_000, as_str=False, paths=None):
+    """
+    모든 파일(paths 를 주면 그 파일들)을 batch_rows 행 이하 DataFrame 으로 나눠 순서대로 yield(메모리 상한용).
+    as_str: 값을 문자열 그대로(CSV 는 dtype 추론 없이, parquet 은 정수 → 문자열)
+    """
+    for path in (files(kind) if paths is None else paths):
+        if path.endswith(".parquet"):
+            pf = pq.ParquetFile(path)
+            cols = [c for c in (columns or pf.schema_arrow.names) if c in pf.schema_arrow.names]
+            for batch in pf.iter_batches(batch_size=batch_rows, columns=cols):
+                df = _to_pandas(pa.Table.from_batches([batch]))
+                yield df.astype("string") if as_str else df
+        else:
+            head = pd.read_csv(path, nrows=0).columns.str.strip().tolist()
+            usecols = [c for c in columns if c in head] if columns else None
+            for df in pd.read_csv(path, usecols=usecols, dtype=str if as_str else DTYPES[kind],
+                                  chunksize=batch_rows):
+                yield df[usecols] if usecols else df
+
+# ── 레거시 CSV → 저장소 ──────────────────────────────────────────
+def import_csv(kind):
+    """out/chunks/<kind>_*.csv 를 읽어 파티션별 파일로 합쳐 저장(unit='import')."""
+    src = sorted(glob.glob(LEGACY_GLOB[kind]))
+    if not src:
+        return []
+    df = pd.concat([pd.read_csv(p, dtype=str, keep_default_na=False) for p in src], ignore_index=True)
+    ints = [f.name for f in SCHEMAS[kind] if pa.types.is_integer(f.type)]
+    rows = []
+    for r in df.to_dict("records"):
+        for c in list(r):
+            v = r[c]
+            if v == "":
+                r[c] = None
+            elif c in ints:
+                r[c] = int(v)
+            elif c == "l1_fee_scalar":
+                r[c] = float(v)
+        rows.append(r)
+    return write_unit(kind, "import", rows)
+
+if __name__ == "__main__":
+    # 사용: python helpers/rawstore.py [--import-csv]
+    import sys
+    if "--import-csv" in sys.argv:
+        for kind in ["logs", "receipts"]:
+            out = import_csv(kind)
+            print(f"[rawstore] imported {kind}: {len(out)} partition files")
+    for kind in ["logs", "receipts"]:
+        ps = parts(kind)
+        n = sum(pq.ParquetFile(p).metadata.num_rows for p in ps)
+        size = sum(os.path.getsize(p) for p in ps)
+        print(f"{RAW_DIR}/{kind}: files={len(ps)} rows={n} bytes={size}")
@@ -0,0 +1,163 @@
+# helpers/receipts.py
+# - ethereumetl export_receipts_and_logs 를 대체하는 프로세스 내 receipts 수집기
+# - eth_getTransactionReceipt 를 JSON-RPC 배치로 보냄(jsonrpc: keep-alive 세션, 동시 배치 제한)
+# - 출력 스키마는 ethereumetl 2.4.x 와 동일(receipts_*.csv / logs_*.csv → 06~09 그대로 사용)
+# - 블록 모드: tx→블록 번호를 알면 블록별 선택 비율을 보고 eth_getBlockReceipts 1회로 받을지 결정
+#   (선택 비율 >= RECEIPTS_BLOCK_MIN_FRACTION 인 블록만, 미지원/실패 블록은 tx 단위로 폴백)
+import os, csv
+from dotenv import load_dotenv
+import jsonrpc
+
+load_dotenv()
+RECEIPTS_BATCH_SIZE  = int(os.getenv("RECEIPTS_BATCH_SIZE", "50"))
+RECEIPTS_MAX_WORKERS = int(os.getenv("RECEIPTS_MAX_WORKERS", "4"))
+RECEIPTS_MODE        = os.getenv("RECEIPTS_MODE", "auto").lower()   # auto | tx | block
+BLOCK_MIN_FRACTION   = float(os.getenv("RECEIPTS_BLOCK_MIN_FRACTION", "0.25"))
+BLOCK_BATCH_SIZE     = int(os.getenv("RECEIPTS_BLOCK_BATCH_SIZE", "5"))   # 블록 receipts 는 응답이 커서 작게
+
+RECEIPT_COLS = ["transaction_hash","transaction_index","block_hash","block_number",
+                "cumulative_gas_used","gas_used","contract_address","root","status",
+                "effective_gas_price","l1_fee","l1_gas_used","l1_gas_price","l1_fee_scalar",
+                "blob_gas_price","blob_gas_used"]
+LOG_COLS = ["log_index","transaction_hash","transaction_index","block_hash","block_number",
+            "address","data","topics"]
+
+def _int(x):
+    """hex 문자열(0x..)/정수 → int, 없으면 None."""
+    if x is None: return None
+    if isinstance(x, int): return x
+    return int(x, 16) if str(x).startswith("0x") else int(x)
+
+def _float(x):
+    if x is None: return None
+    try:
+        return float(_int(x))
+    except ValueError:
+        return float(x)
+
+def _addr(x):
+    return x.lower() if isinstance(x, str) else None
+
+def receipt_row(r):
+    """RPC receipt(dict) → ethereumetl receipts 행."""
+    return {
+        "transaction_hash":    r.get("transactionHash"),
+        "transaction_index":   _int(r.get("transactionIndex")),
+        "block_hash":          r.get("blockHash"),
+        "block_number":        _int(r.get("blockNumber")),
+        "cumulative_gas_used": _int(r.get("cumulativeGasUsed")),
+        "gas_used":            _int(r.get("gasUsed")),
+        "contract_address":    _addr(r.get("contractAddress")),
+        "root":                r.get("root"),
+        "status":              _int(r.get("status")),
+        "effective_gas_price": _int(r.get("effectiveGasPrice")),
+        "l1_fee":              _int(r.get("l1Fee")),
+        "l1_gas_used":         _int(r.get("l1GasUsed")),
+        "l1_gas_price":        _int(r.get("l1GasPrice")),
+        "l1_fee_scalar":       _float(r.get("l1FeeScalar")),
+        "blob_gas_price":      _int(r.get("blobGasPrice")),
+        "blob_gas_used":       _int(r.get("blobGasUsed")),
+    }
+
+def log_rows(r):
+    """RPC receipt(dict) → ethereumetl logs 행들(topics 는 콤마로 연결)."""
+    return [{
+        "log_index":         _int(lg.get("logIndex")),
+        "transaction_hash":  lg.get("transactionHash"),
+        "transaction_index": _int(lg.get("transactionIndex")),
+        "block_hash":        lg.get("blockHash"),
+        "block_number":      _int(lg.get("blockNumber")),
+        "address":           _addr(lg.get("address")),
+        "data":              lg.get("data"),
+        "topics":            ",".join(lg.get("topics") or []),
+    } for lg in r.get("logs") or []]
+
+def plan_blocks(tx_blocks, mode=None):
+    """
+    {tx: block_number} → (블록 모드로 받을 블록 → 선택 tx 목록, tx 단위로 받을 tx 목록).
+    auto 는 eth_getBlockTransactionCountByNumber 로 블록 tx 수를 받아 선택 비율로 결정.
+    """
+    mode = mode or RECEIPTS_MODE
+    by_block = {}
+    for h, b in tx_blocks.items():
+        by_block.setdefault(int(b), []).append(h)
+    if mode == "tx" or not by_block:
+        return {}, list(tx_blocks)
+    if mode == "block":
+        return by_block, []
+    blocks = sorted(by_block)
+    counts = jsonrpc.batch_call([("eth_getBlockTransactionCountByNumber", [hex(b)]) for b in blocks],
+                                max_workers=RECEIPTS_MAX_WORKERS)
+    use_block, per_tx = {}, []
+    for b, n in zip(blocks, counts):
+        sel = by_block[b]
+        if n is not None and len(sel) >= BLOCK_MIN_FRACTION * _int(n):
+            use_block[b] = sel
+        else:
+            per_tx += sel
+    return use_block, per_tx
+
+def _fetch_blocks(by_block):
+    """블록 모드: 블록당 eth_getBlockReceipts 1회, 선택된 tx 만 남김. 실패 블록의 tx 는 따로 돌려줌."""
+    blocks = sorted(by_block)
+    res = jsonrpc.batch_call([("eth_getBlockReceipts", [hex(b)]) for b in blocks],
+                             batch_size=BLOCK_BATCH_SIZE, max_workers=RECEIPTS_MAX_WORKERS)
+    got, left = {}, []
+    for b, rs in zip(blocks, res):
+        sel = {h.lower() for h in by_block[b]}
+        if not isinstance(rs, list):
+            left += by_block[b]
+            continue
+        for r in rs:
+            h = (r.get("transactionHash") or "").lower()
+            if h in sel:
+                got[h] = r
+        left += [h for h in by_block[b] if h.lower() not in got]
+    return got, left
+
+def _fetch_txs(hashes, batch_size=None, max_workers=None):
+    """tx 단위: eth_getTransactionReceipt 배치, 빠진 항목은 1건씩 한 번 더."""
+    res = jsonrpc.batch_call([("eth_getTransactionReceipt", [h]) for h in hashes],
+                             batch_size=batch_size or RECEIPTS_BATCH_SIZE,
+                             max_workers=max_workers or RECEIPTS_MAX_WORKERS)
+    miss = [i for i, r in enumerate(res) if r is None]
+    if miss:
+        again = jsonrpc.batch_call([("eth_getTransactionReceipt", [hashes[i]]) for i in miss],
+                                   batch_size=1, max_workers=1)
+        for i, r in zip(miss, again):
+            res[i] = r
+    return {h.lower(): r for h, r in zip(hashes, res) if r is not None}
+
+def fetch(tx_hashes, tx_blocks=None, batch_size=None, max_workers=None, mode=None):
+    """
+    tx 해시 목록 → (receipts 행, logs 행, 실패 해시). 행 순서는 입력 해시 순서.
+    tx_blocks({tx: block_number})가 있으면 블록 모드 후보를 고르고, 나머지/폴백은 tx 단위로 받는다.
+    """
+    hashes = list(dict.fromkeys(tx_hashes))
+    by_block, per_tx = {}, hashes
+    if tx_blocks:
+        known = {h: tx_blocks[h] for h in hashes if h in tx_blocks}
+        by_block, per_tx = plan_blocks(known, mode)
+        per_tx += [h for h in hashes if h not in known]
+    got, left = _fetch_blocks(by_block) if by_block else ({}, [])
+    got.update(_fetch_txs(per_tx + left, batch_size, max_workers))
+    if by_block:
+        n_sel = sum(len(v) for v in by_block.values())
+        print(f"[receipts] block mode: blocks={len(by_block)} txs={n_sel} fallback={len(left)} | tx mode: {len(per_tx)}")
+
+    rcpts, logs, failed = [], [], []
+    for h in hashes:
+        r = got.get(h.lower())
+        if r is None:
+            failed.append(h)
+            continue
+        rcpts.append(receipt_row(r))
+        logs += log_rows(r)
+    return rcpts, logs, failed
+
+def write_csv(path, cols, rows):
+    """ethereumetl 과 같은 방식: 정수는 그대로, None 은 빈 칸."""
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=cols)
+        w.writeheader()
+        w.writerows(rows)
@@ -0,0 +1,227 @@
+# helpers/rpccache.py
+# - 확정(finalized) 블록 RPC 응답의 디스크 캐시(SQLite, WAL 모드 → 여러 스크립트/프로세스 공용)
+# - 키: sha256(method + params) — params 문자열은 소문자로 정규화(주소 체크섬/소문자 차이 무시)
+# - jsonrpc 가 요청 전에 조회(get_many), 응답 후 저장(put_many) → 01~10 모두 투명하게 사용
+# - 저장 조건(safe = head - SAFE_LAG 이하 블록의 응답만)
+#   · 블록 번호 지정: eth_getLogs(fromBlock/toBlock), eth_getBlockReceipts, eth_getBlock*ByNumber 등
+#   · tx 해시 지정: eth_getTransactionReceipt 등 → 결과의 blockNumber 가 safe 이하일 때
+#   · 상태 조회: eth_getCode/eth_call — 블록 번호 태그가 safe 이하일 때.
+#     "latest" 는 바뀔 수 없는 답만: 비어 있지 않은 eth_getCode(배포된 코드) — 빈 코드("0x")는 나중에 배포될 수 있어 저장 안 함
+#     RPC_CACHE_LATEST(기본 비어 있음)에 적은 메서드는 "latest" 답도 불변 취급(명시적으로 켤 때만)
+#   · null 결과와 error 는 저장하지 않음
+# - 용량 상한 RPC_CACHE_MAX_MB 초과 시 마지막 사용 시각(atime) 오래된 순으로 삭제(LRU)
+# - 적중률: stats(), 프로세스 종료 시 한 줄 요약
+import os, json, time, zlib, hashlib, sqlite3, threading, atexit
+from dotenv import load_dotenv
+
+load_dotenv()   # 아래 설정을 import 시점에 읽으므로 .env 를 먼저(import 하는 쪽의 load_dotenv 보다 앞설 수 있음)
+
+RPC_CACHE        = os.getenv("RPC_CACHE", "1") == "1"
+RPC_CACHE_PATH   = os.getenv("RPC_CACHE_PATH", "out/rpc_cache.sqlite")
+RPC_CACHE_MAX_MB = float(os.getenv("RPC_CACHE_MAX_MB", "2048"))
+RPC_CACHE_LATEST = set(filter(None, os.getenv("RPC_CACHE_LATEST", "").split(",")))
+
+MISS = object()
+
+# 블록 번호가 params[0] 인 메서드 / tx 해시로 조회하고 결과에 blockNumber 가 있는 메서드 / 마지막 인자가 블록 태그인 상태 조회
+BLOCK_METHODS = {"eth_getBlockReceipts", "eth_getBlockByNumber", "eth_getBlockTransactionCountByNumber",
+                 "eth_getUncleCountByBlockNumber"}
+TX_METHODS    = {"eth_getTransactionReceipt", "eth_getTransactionByHash"}
+STATE_METHODS = {"eth_getCode", "eth_call", "eth_getBalance", "eth_getStorageAt"}
+CACHEABLE     = BLOCK_METHODS | TX_METHODS | STATE_METHODS | {"eth_getLogs"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key    BLOB PRIMARY KEY,      -- sha256(method, params)
+    method TEXT NOT NULL,
+    size   INTEGER NOT NULL,      -- 압축 후 바이트
+    atime  REAL NOT NULL,         -- 마지막 사용(LRU)
+    value  BLOB NOT NULL          -- zlib(JSON result)
+);
+CREATE INDEX IF NOT EXISTS responses_atime ON responses(atime);
+"""
+
+_conn = None
+_lock = threading.Lock()
+_total = 0                      # 이 프로세스가 아는 총 크기(바이트, 축출 판단용 근사치)
+_stats = {}                     # method -> [hits, misses, stored]
+
+def open_cache(path=None):
+    """캐시 DB 열기(없으면 생성). RPC_CACHE=0 이면 None."""
+    global _conn, _total
+    if not RPC_CACHE:
+        return None
+    if _conn is None:
+        with _lock:
+            if _conn is None:
+                path = path or RPC_CACHE_PATH
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA busy_timeout=60000")
+                conn.executescript(SCHEMA)
+                _total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                _conn = conn
+    return _conn
+
+def _norm(x):
+    if isinstance(x, str):
+        return x.lower()
+    if isinstance(x, list):
+        return [_norm(v) for v in x]
+    if isinstance(x, dict):
+        return {k: _norm(v) for k, v in x.items()}
+    return x
+
+def key_of(method, params):
+    body = json.dumps([method, _norm(params or [])], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).digest()
+
+def _num(tag):
+    """블록 태그 → int(숫자 태그만), 그 외(latest/pending/해시 등) None."""
+    if isinstance(tag, int):
+        return tag
+    if isinstance(tag, str) and tag.startswith("0x") and len(tag) <= 18:
+        try:
+            return int(tag, 16)
+        except ValueError:
+            return None
+    return None
+
+def is_final(method, params, result, safe):
+    """이 응답을 영구 저장해도 되는지(safe: 확정 블록 상한)."""
+    if result is None or safe is None:
+        return False
+    params = params or []
+    if method == "eth_getLogs":
+        f = params[0] if params and isinstance(params[0], dict) else {}
+        lo, hi = _num(f.get("fromBlock")), _num(f.get("toBlock"))
+        return lo is not None and hi is not None and hi <= safe
+    if method in BLOCK_METHODS:
+        b = _num(params[0]) if params else None
+        return b is not None and b <= safe
+    if method in TX_METHODS:
+        b = _num(result.get("blockNumber")) if isinstance(result, dict) else None
+        return b is not None and b <= safe
+    if method in STATE_METHODS:
+        tag = params[-1] if params else None
+        if tag == "latest":
+            return method in RPC_CACHE_LATEST or (method == "eth_getCode" and result not in ("", "0x"))
+        b = _num(tag)
+        return b is not None and b <= safe
+    return False
+
+def _count(method, i):
+    s = _stats.setdefault(method, [0, 0, 0])
+    s[i] += 1
+
+def get_many(calls):
+    """[(method, params), ...] → 결과 목록(캐시에 없거나 대상이 아니면 MISS)."""
+    out = [MISS] * len(calls)
+    conn = open_cache()
+    if conn is None:
+        return out
+    keys = {}
+    for i, (m, p) in enumerate(calls):
+        if m in CACHEABLE:
+            keys.setdefault(key_of(m, p), []).append(i)
+    if not keys:
+        return out
+    with _lock:
+        ks = list(keys)
+        rows = []
+        for j in range(0, len(ks), 500):
+            part = ks[j:j+500]
+            rows += conn.execute(f"SELECT key, value FROM responses WHERE key IN ({','.join('?' * len(part))})",
+                                 part).fetchall()
+        if rows:
+            now = time.time()
+            with conn:
+                conn.executemany("UPDATE responses SET atime=? WHERE key=?", [(now, k) for k, _ in rows])
+        for k, v in rows:
+            res = json.loads(zlib.decompress(v))
+            for i in keys[k]:
+                out[i] = res
+        for i, (m, _) in enumerate(calls):
+            if m in CACHEABLE:
+                _count(m, 0 if out[i] is not MISS else 1)
+    return out
+
+def put_many(calls, results, safe):
+    """확정 블록 응답만 저장 → 저장 건수. 용량 상한을 넘으면 LRU 축출."""
+    global _total
+    conn = open_cache()
+    if conn is None:
+        return 0
+    now = time.time()
+    rows = []
+    for (m, p), r in zip(calls, results):
+        if m in CACHEABLE and is_final(m, p, r, safe):
+            v = zlib.compress(json.dumps(r, separators=(",", ":")).encode(), 1)
+            rows.append((key_of(m, p), m, len(v), now, v))
+    if not rows:
+        return 0
+    with _lock:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO responses(key, method, size, atime, value) "
+                             "VALUES (?,?,?,?,?)", rows)
+        for r in rows:
+            _count(r[1], 2)
+        _total += sum(r[2] for r in rows)
+        if _total > RPC_CACHE_MAX_MB * 1e6:
+            _evict(conn)
+    return len(rows)
+
+def _evict(conn):
+    """총 크기가 상한의 90% 아래로 내려갈 때까지 오래 안 쓴 응답부터 삭제."""
+    global _total
+    _total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    target = RPC_CACHE_MAX_MB * 1e6 * 0.9
+    while _total > target:
+        old = conn.execute("SELECT key, size FROM responses ORDER BY atime LIMIT 1000").fetchall()
+        if not old:
+            break
+        drop, freed = [], 0
+        for k, s in old:
+            drop.append((k,))
+            freed += s
+            if _total - freed <= target:
+                break
+        with conn:
+            conn.executemany("DELETE FROM responses WHERE key=?", drop)
+        _total -= freed
+
+def stats():
+    """{method: {"hits", "misses", "stored", "hit_rate"}} + 합계("all")."""
+    with _lock:
+        out = {m: {"hits": h, "misses": mi, "stored": st, "hit_rate": round(h / (h + mi), 4) if h + mi else 0.0}
+               for m, (h, mi, st) in _stats.items()}
+    tot = [sum(v[k] for v in out.values()) for k in ("hits", "misses", "stored")]
+    out["all"] = {"hits": tot[0], "misses": tot[1], "stored": tot[2],
+                  "hit_rate": round(tot[0] / (tot[0] + tot[1]), 4) if tot[0] + tot[1] else 0.0}
+    return out
+
+@atexit.register
+def _report():
+    s = stats()
+    a = s.pop("all")
+    if a["hits"] + a["misses"] == 0:
+        return
+    per = ", ".join(f"{m} {v['hit_rate']:.0%}" for m, v in sorted(s.items()))
+    print(f"[rpc-cache] hits={a['hits']} misses={a['misses']} stored={a['stored']} "
+          f"hit_rate={a['hit_rate']:.1%} ({per})")
+
+if __name__ == "__main__":
+    # 사용: python helpers/rpccache.py [--clear]
+    import sys
+    conn = open_cache()
+    if conn is None:
+        raise SystemExit("RPC_CACHE=0")
+    if "--clear" in sys.argv:
+        with conn:
+            conn.execute("DELETE FROM responses")
+        conn.execute("VACUUM")
+    for m, n, sz in conn.execute("SELECT method, COUNT(*), SUM(size) FROM responses GROUP BY method ORDER BY method"):
+        print(f"{m:40s} {n:>9d} {sz / 1e6:>9.1f} MB")
+    print(f"{RPC_CACHE_PATH}: limit {RPC_CACHE_MAX_MB:.0f} MB")
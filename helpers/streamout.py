@@ -0,0 +1,68 @@
+# helpers/streamout.py
+# - 디코딩 결과 스트리밍 CSV 출력(07/08/10): 전체 결과를 메모리에 모았다가 정렬·저장하던 것 대체
+#   · append: 청크 결과를 버퍼에 두었다가 STREAM_RUN_ROWS 행이 차면 (tx_hash, log_index) 정렬 run 파일로 내보냄
+#   · close: run 들을 k-way 병합(heapq.merge, CSV 레코드 단위 — 따옴표 안 줄바꿈이 있는 심볼도 안전) → 임시 파일 → os.replace
+#   메모리 상한 ≈ run 1개(STREAM_RUN_ROWS 행) + run 개수만큼의 줄 버퍼, 범위 크기와 무관
+# - 결과 = 전부 모아 concat_sorted 후 to_csv 한 것과 같은 행/순서(키가 유일하므로 정렬이 결정적)
+# - 첫 두 열이 tx_hash, log_index 여야 함(병합 키)
+import os, csv, heapq, shutil, tempfile
+import pandas as pd
+
+STREAM_RUN_ROWS = int(os.getenv("STREAM_RUN_ROWS", "500000"))
+KEYS = ["tx_hash", "log_index"]
+
+def open_writer(path, cols):
+    """path 에 쓸 스트리밍 writer(dict). cols: 출력 열 순서."""
+    assert list(cols[:2]) == KEYS, f"첫 두 열은 {KEYS} 이어야 함: {cols}"
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    return {"path": path, "cols": list(cols), "buf": [], "buf_rows": 0, "rows": 0, "runs": [],
+            "tmp": tempfile.mkdtemp(prefix=f".{os.path.basename(path)}-", dir=d)}
+
+def append(w, df):
+    """청크 결과 추가(빈 프레임은 무시). 버퍼가 STREAM_RUN_ROWS 를 넘으면 run 으로 내보냄."""
+    if df is None or df.empty:
+        return
+    w["buf"].append(df)
+    w["buf_rows"] += len(df)
+    if w["buf_rows"] >= STREAM_RUN_ROWS:
+        _spill(w)
+
+def _spill(w):
+    if not w["buf"]:
+        return
+    df = pd.concat(w["buf"], ignore_index=True).sort_values(KEYS)
+    run = os.path.join(w["tmp"], f"run-{len(w['runs']):05d}.csv")
+    df[w["cols"]].to_csv(run, index=False, header=False)
+    w["runs"].append(run)
+    w["rows"] += len(df)
+    w["buf"], w["buf_rows"] = [], 0
+
+def _key(row):
+    return row[0], int(row[1])
+
+def close(w):
+    """남은 버퍼 내보내고 run 병합 → 최종 파일(빈 결과도 헤더). 반환: 행 수."""
+    _spill(w)
+    out_tmp = os.path.join(w["tmp"], "merged.csv")
+    header = pd.DataFrame(columns=w["cols"]).to_csv(index=False)
+    files = [open(r, newline="") for r in w["runs"]]
+    try:
+        with open(out_tmp, "w", newline="") as out:
+            out.write(header)
+            if len(files) == 1:
+                shutil.copyfileobj(files[0], out, 1 << 20)
+            else:
+                # pandas to_csv 와 같은 방언(QUOTE_MINIMAL, os.linesep) → 레코드 그대로 다시 씀
+                csv.writer(out, lineterminator=os.linesep).writerows(
+                    heapq.merge(*(csv.reader(f) for f in files), key=_key))
+    finally:
+        for f in files:
+            f.close()
+    os.replace(out_tmp, w["path"])
+    shutil.rmtree(w["tmp"], ignore_errors=True)
+    return w["rows"]
+
+def abort(w):
+    """실패 시 임시 run 정리(최종 파일은 건드리지 않음)."""
+    shutil.rmtree(w["tmp"], ignore_errors=True)
@@ -0,0 +1,179 @@
+# helpers/tokenmeta.py
+# - 07/08/10 공용 토큰 메타(symbol/decimals)·풀 토큰(token0/token1) 캐시
+# - 영구 캐시는 metastore(SQLite), 프로세스 안에서는 dict 로 한 번 더 캐시
+# - prefetch: 디코딩 전에 모은 주소들을 저장소에서 일괄 조회, 없으면 JSON-RPC 배치 eth_call로 해결 후 일괄 upsert
+# - 폴백은 기존과 동일: symbol 실패 → "UNK"(bytes32 심볼은 문자열로 변환), decimals 실패 → 18,
+#   token0/token1 중 하나라도 실패 → 둘 다 0x0
+#   저장은 노드가 답한 항목만(결과 또는 실제 revert). 전송 실패로 포기한 항목의 폴백은 이번 실행 메모리에만
+# - eth_call 은 확정 블록(jsonrpc.safe_block, 숫자 태그)에 고정 → rpccache 가 확정 응답으로 저장.
+#   거기서 답이 없으면(확정 블록 이후 배포된 컨트랙트 등) 그 항목만 "latest" 로 다시 물음(캐시 안 함)
+from web3 import Web3
+from eth_abi import decode as abi_decode
+import jsonrpc
+import metastore
+
+ZERO_ADDR = "0x0000000000000000000000000000000000000000"
+
+# 4byte 셀렉터
+SEL_SYMBOL   = "0x95d89b41"
+SEL_DECIMALS = "0x313ce567"
+SEL_TOKEN0   = "0x0dfe1681"
+SEL_TOKEN1   = "0xd21220a7"
+
+store = None
+meta = {}   # lower(addr) -> (symbol, decimals)
+pool = {}   # lower(pool) -> (token0_cs, token1_cs)
+frozen = False   # 병렬 디코딩 워커: 부모가 미리 채운 dict 만 읽음(저장소/RPC 접근 없음)
+
+def connect():
+    """RPC 연결 확인(jsonrpc 공용 클라이언트) + 메타 저장소 열기. 스크립트 시작 시 한 번 호출."""
+    assert jsonrpc.is_connected(), "RPC 연결 실패"
+    return open_store()
+
+def open_store(path=None):
+    global store
+    if store is None:
+        store = metastore.open_store(path)
+    return store
+
+# ── eth_call 결과 디코딩 ─────────────────────────────────────────
+def _raw(res):
+    if not isinstance(res, str) or not res.startswith("0x") or len(res) <= 2:
+        return None
+    try:
+        return bytes.fromhex(res[2:])
+    except ValueError:
+        return None
+
+def decode_symbol(res):
+    b = _raw(res)
+    if b is None:
+        return "UNK"
+    try:
+        return abi_decode(["string"], b)[0]
+    except Exception:
+        pass
+    if len(b) == 32:  # bytes32 심볼(MKR 등)
+        try:
+            return b.rstrip(b"\x00").decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+    return "UNK"
+
+def decode_decimals(res):
+    b = _raw(res)
+    try:
+        return int(abi_decode(["uint8"], b)[0]) if b is not None else 18
+    except Exception:
+        return 18
+
+def decode_address(res):
+    b = _raw(res)
+    try:
+        return Web3.to_checksum_address(abi_decode(["address"], b)[0]) if b is not None else None
+    except Exception:
+        return None
+
+def _eth_call(addr, sel, tag="latest"):
+    return ("eth_call", [{"to": addr, "data": sel}, tag])
+
+def _meta_tag():
+    b = jsonrpc.safe_block()
+    return hex(b) if b is not None and b >= 0 else "latest"
+
+def _reverted(err):
+    """노드가 실행해 보고 거절한 경우(함수 없음/revert) — 다시 물어도 같은 답."""
+    return isinstance(err, dict) and (err.get("code") == 3 or "revert" in str(err.get("message", "")).lower())
+
+def _call_all(addrs, sels):
+    """
+    addrs × sels 의 eth_call → (응답 목록(주소마다 sels 순서), 노드가 답했는지 목록).
+    답함 = 결과를 받았거나 실제 revert. 전송 실패/재시도 초과로 포기한 항목은 False(저장하지 않음).
+    """
+    pairs = [(a, s) for a in addrs for s in sels]
+    tag = _meta_tag()
+    errs = {}
+    res = jsonrpc.batch_call([_eth_call(a, s, tag) for a, s in pairs], errors=errs)
+    redo = [i for i, r in enumerate(res) if _raw(r) is None] if tag != "latest" else []
+    if redo:
+        errs2 = {}
+        for j, (i, r) in enumerate(zip(redo, jsonrpc.batch_call([_eth_call(*pairs[i]) for i in redo], errors=errs2))):
+            if r is not None:
+                res[i] = r
+                errs.pop(i, None)
+            elif j in errs2:
+                res[i], errs[i] = None, errs2[j]
+            else:                       # "latest" 는 모름 → 확정 블록 답("0x" 등)도 믿지 않음
+                res[i] = None
+                errs.pop(i, None)
+    return res, [r is not None or _reverted(errs.get(i)) for i, r in enumerate(res)]
+
+# ── 일괄 해결 ────────────────────────────────────────────────────
+def prefetch(tokens=(), pools=()):
+    """
+    캐시에 없는 풀(token0/token1)과 토큰(symbol/decimals)을 저장소 → 배치 RPC 순으로 해결.
+    풀에서 나온 token0/token1 도 같은 호출에서 토큰 메타까지 채운다.
+    노드가 답하지 않은 항목은 폴백 값을 이번 실행 메모리에만 두고 저장하지 않음(다음 실행에서 다시 조회).
+    """
+    open_store()
+    miss_p = [p for p in dict.fromkeys(pools) if p.lower() not in pool]
+    if miss_p:
+        pool.update(metastore.get_pools(store, miss_p))
+        tokens = list(tokens) + [t for p in miss_p if p.lower() in pool for t in pool[p.lower()]]
+        miss_p = [p for p in miss_p if p.lower() not in pool]
+    if miss_p:
+        res, answered = _call_all(miss_p, (SEL_TOKEN0, SEL_TOKEN1))
+        rows = []
+        for i, p in enumerate(miss_p):
+            t0, t1 = decode_address(res[2*i]), decode_address(res[2*i+1])
+            if t0 is None or t1 is None:
+                t0 = t1 = Web3.to_checksum_address(ZERO_ADDR)
+            pool[p.lower()] = (t0, t1)
+            if answered[2*i] and answered[2*i+1]:
+                rows.append((p, t0, t1))
+        metastore.upsert_pools(store, rows)
+        print(f"[meta] pools resolved: {len(rows)}"
+              + (f" (no answer, not saved: {len(miss_p) - len(rows)})" if len(rows) < len(miss_p) else ""))
+        tokens = list(tokens) + [t for p in miss_p for t in pool[p.lower()]]
+
+    miss_t = [t for t in dict.fromkeys(tokens) if t.lower() not in meta]
+    if miss_t:
+        meta.update(metastore.get_tokens(store, miss_t))
+        miss_t = [t for t in miss_t if t.lower() not in meta]
+    if miss_t:
+        res, answered = _call_all(miss_t, (SEL_SYMBOL, SEL_DECIMALS))
+        rows = []
+        for i, t in enumerate(miss_t):
+            sym, dec = decode_symbol(res[2*i]), decode_decimals(res[2*i+1])
+            meta[t.lower()] = (sym, dec)
+            if answered[2*i] and answered[2*i+1]:
+                rows.append((t, sym, dec))
+        metastore.upsert_tokens(store, rows)
+        print(f"[meta] tokens resolved: {len(rows)}"
+              + (f" (no answer, not saved: {len(miss_t) - len(rows)})" if len(rows) < len(miss_t) else ""))
+
+def freeze():
+    """
+    fork 된 워커에서 호출: 이후 조회는 메모리 스냅샷만 사용.
+    부모에서 열린 SQLite 연결/HTTP 세션을 자식이 건드리지 않도록 하고, 미스는 오류로 드러냄(결과가 달라지지 않게).
+    """
+    global store, frozen
+    store, frozen = None, True
+
+def _miss(kind, addr):
+    raise KeyError(f"{kind} {addr}: 메타 스냅샷에 없음(병렬 디코딩 전 prefetch 누락)")
+
+# ── 디코더용 조회(미스 시 단건 배치로 해결) ─────────────────────
+def token_meta(addr_cs):
+    a = addr_cs.lower()
+    if a not in meta:
+        if frozen: _miss("token", addr_cs)
+        prefetch(tokens=[addr_cs])
+    return meta[a]
+
+def tokens_of_pool(addr_cs):
+    a = addr_cs.lower()
+    if a not in pool:
+        if frozen: _miss("pool", addr_cs)
+        prefetch(pools=[addr_cs])
+    return pool[a]
@@ -0,0 +1,10 @@
+# tests/conftest.py
+# - helpers/ 모듈을 스크립트와 같은 방식(평면 import)으로 불러오도록 경로 추가
+# - 모듈이 import 시점에 읽는 환경 변수: 캐시/지표 파일을 만들지 않고, 재시도 간격은 0
+import os, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "helpers"))
+os.environ.setdefault("RPC_CACHE", "0")
+os.environ.setdefault("METRICS", "0")
+os.environ.setdefault("SLEEP_MS", "0")
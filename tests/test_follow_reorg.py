@@ -0,0 +1,128 @@
+# tests/test_follow_reorg.py
+# - 09 --follow 재편성 처리: bench/mock_node.py 로 REORG_WINDOW 안에서 체인을 갈라
+#   rollback 이 네 표(normalized + EVENT_TABLES)에서 갈라진 블록 행을 지우고 커서를 되돌리는지 확인
+# - 노드 오류(mock_fail)가 나도 데몬이 멈추지 않고 다시 시도해 따라잡는지 확인
+import os, sys, json, time, shutil, socket, subprocess, importlib.util
+import pandas as pd
+import pytest
+import requests
+import jsonrpc
+import normstore
+import metrics
+
+from conftest import ROOT
+
+START = 20500000
+BLOCKS = 12
+HEAD = START + BLOCKS - 1
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def rpc(url, method, params=None):
+    r = requests.post(url, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []}, timeout=10)
+    return r.json()["result"]
+
+@pytest.fixture(scope="module")
+def world(tmp_path_factory):
+    out = tmp_path_factory.mktemp("world")
+    subprocess.run([sys.executable, os.path.join(ROOT, "bench", "gen_synth.py"), "--out", str(out),
+                    "--start-block", str(START), "--blocks", str(BLOCKS), "--txs-per-block", "6",
+                    "--plain-per-block", "2", "--tokens", "30", "--pools", "10"],
+                   check=True, capture_output=True)
+    return out
+
+@pytest.fixture
+def node(world):
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    p = subprocess.Popen([sys.executable, os.path.join(ROOT, "bench", "mock_node.py"), "--world", str(world),
+                          "--port", str(port), "--head", str(HEAD)],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            rpc(url, "eth_chainId")
+            break
+        except requests.RequestException:
+            time.sleep(0.05)
+    yield url
+    p.kill()
+    p.wait()
+
+@pytest.fixture
+def follow09(node, world, tmp_path, monkeypatch):
+    """09 모듈(작업 디렉터리·OUT_DIR 은 tmp_path, ethereumetl 은 bench 대역)."""
+    os.makedirs(tmp_path / "config")
+    shutil.copy(os.path.join(ROOT, "config", "topics.json"), tmp_path / "config" / "topics.json")
+    shutil.copy(world / "config" / "addresses.json", tmp_path / "config" / "addresses.json")
+    monkeypatch.chdir(tmp_path)
+    for k, v in {"RPC_URL": node, "OUT_DIR": str(tmp_path / "out"), "OUTPUT_FORMAT": "csv", "SAFE_LAG": "0",
+                 "FOLLOW_BATCH": "4", "FOLLOW_POLL_S": "0", "REORG_WINDOW": "64", "BENCH_WORLD": str(world),
+                 "ETL_BIN": f"{sys.executable} {os.path.join(ROOT, 'bench', 'bin', 'ethereumetl')}"}.items():
+        monkeypatch.setenv(k, v)
+    monkeypatch.setattr(jsonrpc, "RPC_URL", node)
+    spec = importlib.util.spec_from_file_location(
+        "decode_events_bridges", os.path.join(ROOT, "helpers", "09_decode_events_bridges.py"))
+    m = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(m)
+    return m
+
+def _tables(m):
+    return {name: normstore.read(t) for name, t in m.open_follow_tables().items()}
+
+def _blocks(df):
+    return pd.to_numeric(df[normstore.KEY])
+
+def test_rollback_removes_orphaned_rows_and_rewinds_cursor(follow09, node):
+    m = follow09
+    m.follow(START, once=True)
+    st = m.load_state()
+    assert st["cursor"] == HEAD
+    before = _tables(m)
+    assert set(before) == {"normalized", *m.EVENT_TABLES}
+
+    rpc(node, "mock_reorg", [{"depth": 3, "drop": True}])
+    fork = m.find_fork(st)
+    assert fork == HEAD - 2
+    assert (_blocks(before["normalized"]) >= fork).any() and (_blocks(before["transfers"]) >= fork).any()
+
+    m.rollback(st, m.open_follow_tables(), fork)
+    after = _tables(m)
+    for name, df in after.items():
+        assert not (_blocks(df) >= fork).any(), name
+        kept = before[name][(_blocks(before[name]) < fork).to_numpy()]
+        assert len(df) == len(kept), name
+    saved = json.load(open(m.FOLLOW_STATE))
+    assert saved["cursor"] == fork - 1
+    assert all(int(n) < fork for n in saved["hashes"])
+
+    # 새 체인으로 다시 따라감: 빠진 tx 는 돌아오지 않음
+    m.follow(once=True)
+    assert m.load_state()["cursor"] == HEAD
+    for name, df in _tables(m).items():
+        assert not (_blocks(df) >= fork).any(), name
+
+def test_hash_only_reorg_reprocesses_with_new_hashes(follow09, node):
+    m = follow09
+    m.follow(START, once=True)
+    rpc(node, "mock_reorg", [{"depth": 2}])
+    m.follow(once=True)
+    st = m.load_state()
+    assert st["cursor"] == HEAD
+    new = {n: rpc(node, "eth_getBlockByNumber", [hex(n), False])["hash"] for n in (HEAD - 1, HEAD)}
+    assert all(st["hashes"][n] == h for n, h in new.items())
+    norm = _tables(m)["normalized"]
+    tail = norm[(_blocks(norm) >= HEAD - 1).to_numpy()]
+    assert len(tail) and all(h == new[int(b)] for b, h in zip(tail["block_number"], tail["block_hash"]))
+
+def test_follow_survives_node_errors(follow09, node):
+    m = follow09
+    rpc(node, "mock_fail", [{"method": "eth_blockNumber", "count": 2}])
+    rpc(node, "mock_fail", [{"method": "eth_getBlockByNumber", "count": 1}])
+    errors = metrics.snapshot().get("follow_errors", 0)
+    m.follow(START, once=True)
+    assert m.load_state()["cursor"] == HEAD
+    assert metrics.snapshot()["follow_errors"] - errors == 3
+    assert len(_tables(m)["normalized"])
@@ -0,0 +1,89 @@
+# tests/test_jsonrpc_batch.py
+# - jsonrpc.post_batch/batch_call 을 스크립트대로 답하는 로컬 JSON-RPC 서버에 대고 확인
+#   · HTTP 429 + Retry-After → 같은 배치를 다시 보냄
+#   · 항목별 rate-limit error → 그 항목만 다시 보내고 이미 받은 결과는 유지(응답 순서와 무관하게 id 로 맞춤)
+#   · 그 밖의 항목 error → None(재전송 없음)
+import json, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+import jsonrpc
+
+class Script:
+    """요청마다 replies 에서 하나씩 꺼내 답함: (HTTP 코드, 헤더, body) 또는 payload → 응답 함수."""
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.seen = []
+
+def _server(script):
+    class H(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def log_message(self, *a): pass
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            script.seen.append(req)
+            reply = script.replies.pop(0)
+            code, headers, body = reply(req) if callable(reply) else reply
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), H)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}"
+
+@pytest.fixture
+def serve():
+    servers = []
+    def start(replies):
+        script = Script(replies)
+        srv, url = _server(script)
+        servers.append(srv)
+        return script, url
+    yield start
+    for s in servers:
+        s.shutdown()
+
+def ok(req):
+    # 요청 역순으로 답함(클라이언트가 id 로 맞추는지)
+    return 200, {}, [{"jsonrpc": "2.0", "id": r["id"], "result": f"r{r['params'][0]}"} for r in reversed(req)]
+
+CALLS = [("eth_test", [i]) for i in range(4)]
+
+def test_post_batch_retries_http_429_then_resends_only_limited_items(serve):
+    def partial(req):
+        out = []
+        for r in req:
+            if r["id"] in (1, 3):
+                out.append({"jsonrpc": "2.0", "id": r["id"], "error": {"code": -32005, "message": "rate limit exceeded"}})
+            else:
+                out.append({"jsonrpc": "2.0", "id": r["id"], "result": f"r{r['params'][0]}"})
+        return 200, {"Retry-After": "0"}, out
+    script, url = serve([(429, {"Retry-After": "0"}, {"error": "Too Many Requests"}), partial, ok])
+    throttled = jsonrpc.stats()["throttled"]
+    assert jsonrpc.post_batch(CALLS, url=url) == ["r0", "r1", "r2", "r3"]
+    assert [sorted(r["id"] for r in req) for req in script.seen] == [[0, 1, 2, 3], [0, 1, 2, 3], [1, 3]]
+    assert jsonrpc.stats()["throttled"] == throttled + 2
+
+def test_post_batch_item_error_is_none_without_resend(serve):
+    def bad_one(req):
+        code, h, out = ok(req)
+        for d in out:
+            if d["id"] == 2:
+                d.pop("result")
+                d["error"] = {"code": -32000, "message": "execution reverted"}
+        return code, h, out
+    script, url = serve([bad_one])
+    errors = {}
+    assert jsonrpc.post_batch(CALLS, url=url, errors=errors) == ["r0", "r1", None, "r3"]
+    assert len(script.seen) == 1
+    assert errors == {2: {"code": -32000, "message": "execution reverted"}}
+
+def test_batch_call_splits_into_batches_and_keeps_order(serve):
+    script, url = serve([ok] * 3)
+    calls = [("eth_test", [i]) for i in range(5)]
+    assert jsonrpc.batch_call(calls, url=url, batch_size=2, max_workers=1) == [f"r{i}" for i in range(5)]
+    assert sorted(len(req) for req in script.seen) == [1, 2, 2]
@@ -0,0 +1,19 @@
+# tests/test_metrics_status.py
+# - 단계 종료 상태 기록: 정상 → ok, 잡히지 않은 예외 / metrics.fail → failed (종료 코드도 0 이 아님)
+import os, sys, json, subprocess
+import pytest
+
+from conftest import ROOT
+
+@pytest.mark.parametrize("body, status, rc", [
+    ("pass", "ok", 0),
+    ("raise RuntimeError('boom')", "failed", 1),
+    ("metrics.fail('no input')", "failed", 1),
+])
+def test_stage_status_on_exit(tmp_path, body, status, rc):
+    path = tmp_path / "metrics.json"
+    env = dict(os.environ, METRICS="1", METRICS_PATH=str(path), PYTHONPATH=os.path.join(ROOT, "helpers"))
+    code = f"import metrics\nmetrics.start('t')\n{body}\n"
+    p = subprocess.run([sys.executable, "-c", code], env=env, cwd=tmp_path, capture_output=True, text=True)
+    assert p.returncode == rc, p.stderr
+    assert json.load(open(path))["stages"]["t"]["status"] == status
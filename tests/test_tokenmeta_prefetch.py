@@ -0,0 +1,110 @@
+# tests/test_tokenmeta_prefetch.py
+# - tokenmeta.prefetch 를 로컬 mock JSON-RPC 서버에 대고 확인: 폴백(UNK / 18 / 0x0 풀), bytes32 심볼,
+#   metastore 저장 — 노드가 답하지 않은(전송 실패) 항목은 폴백을 메모리에만 두고 저장하지 않음
+import json, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from eth_abi import encode
+from web3 import Web3
+import jsonrpc
+import metastore
+import tokenmeta
+
+def cs(n):
+    return Web3.to_checksum_address("0x" + f"{n:040x}")
+
+TOK_A, TOK_B, TOK_MKR, TOK_DOWN = cs(0xA1), cs(0xB2), cs(0xC3), cs(0xD4)
+POOL_OK, POOL_BAD = cs(0x1001), cs(0x1002)
+
+def word(types, vals):
+    return "0x" + encode(types, vals).hex()
+
+# (주소, 셀렉터) → 결과 hex, 없으면 execution reverted
+ANSWERS = {
+    (TOK_A, tokenmeta.SEL_SYMBOL): word(["string"], ["AAA"]),
+    (TOK_A, tokenmeta.SEL_DECIMALS): word(["uint8"], [6]),
+    (TOK_MKR, tokenmeta.SEL_SYMBOL): "0x" + b"MKR".ljust(32, b"\0").hex(),
+    (TOK_MKR, tokenmeta.SEL_DECIMALS): word(["uint8"], [18]),
+    (POOL_OK, tokenmeta.SEL_TOKEN0): word(["address"], [TOK_A]),
+    (POOL_OK, tokenmeta.SEL_TOKEN1): word(["address"], [TOK_MKR]),
+    (POOL_BAD, tokenmeta.SEL_TOKEN1): word(["address"], [TOK_A]),
+}
+
+@pytest.fixture
+def node(monkeypatch):
+    state = {"down": {TOK_DOWN.lower()}}   # 이 주소가 든 요청은 HTTP 500(전송 실패)
+    class H(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def log_message(self, *a): pass
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            reqs = [req] if isinstance(req, dict) else req
+            if any(r["method"] == "eth_call" and r["params"][0]["to"].lower() in state["down"] for r in reqs):
+                code, body = 500, {"error": "upstream down"}
+            else:
+                code, out = 200, []
+                for r in reqs:
+                    if r["method"] == "eth_blockNumber":
+                        out.append({"jsonrpc": "2.0", "id": r["id"], "result": "0x100"})
+                        continue
+                    key = (Web3.to_checksum_address(r["params"][0]["to"]), r["params"][0]["data"])
+                    if key in ANSWERS:
+                        out.append({"jsonrpc": "2.0", "id": r["id"], "result": ANSWERS[key]})
+                    else:
+                        out.append({"jsonrpc": "2.0", "id": r["id"],
+                                    "error": {"code": -32000, "message": "execution reverted"}})
+                body = out[0] if isinstance(req, dict) else out
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), H)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    monkeypatch.setattr(jsonrpc, "RPC_URL", f"http://127.0.0.1:{srv.server_address[1]}")
+    yield state
+    srv.shutdown()
+
+@pytest.fixture
+def fresh(tmp_path, monkeypatch):
+    """빈 메타 저장소 + 빈 프로세스 캐시(작업 디렉터리도 tmp — 레거시 out/*.csv 가져오기 방지)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tokenmeta, "store", None)
+    monkeypatch.setattr(tokenmeta, "meta", {})
+    monkeypatch.setattr(tokenmeta, "pool", {})
+    path = str(tmp_path / "meta.sqlite")
+    tokenmeta.open_store(path)
+    return path
+
+def test_prefetch_fallbacks_and_bytes32_symbol_are_saved(node, fresh):
+    tokenmeta.prefetch(tokens=[TOK_B], pools=[POOL_OK, POOL_BAD])
+    zero = Web3.to_checksum_address(tokenmeta.ZERO_ADDR)
+    assert tokenmeta.token_meta(TOK_A) == ("AAA", 6)
+    assert tokenmeta.token_meta(TOK_B) == ("UNK", 18)          # symbol/decimals 모두 revert
+    assert tokenmeta.token_meta(TOK_MKR) == ("MKR", 18)        # bytes32 심볼
+    assert tokenmeta.tokens_of_pool(POOL_OK) == (TOK_A, TOK_MKR)
+    assert tokenmeta.tokens_of_pool(POOL_BAD) == (zero, zero)  # token0 revert → 둘 다 0x0
+
+    conn = metastore.open_store(fresh)
+    assert metastore.get_tokens(conn, [TOK_A, TOK_B, TOK_MKR]) == {
+        TOK_A.lower(): ("AAA", 6), TOK_B.lower(): ("UNK", 18), TOK_MKR.lower(): ("MKR", 18)}
+    pools = metastore.get_pools(conn, [POOL_OK, POOL_BAD])
+    assert {p: tuple(t.lower() for t in ts) for p, ts in pools.items()} == {
+        POOL_OK.lower(): (TOK_A.lower(), TOK_MKR.lower()), POOL_BAD.lower(): (zero.lower(), zero.lower())}
+
+def test_prefetch_does_not_save_fallback_when_node_did_not_answer(node, fresh, monkeypatch):
+    tokenmeta.prefetch(tokens=[TOK_DOWN])
+    assert tokenmeta.token_meta(TOK_DOWN) == ("UNK", 18)        # 이번 실행은 폴백으로 진행
+    assert metastore.get_tokens(metastore.open_store(fresh), [TOK_DOWN]) == {}
+
+    # 다음 실행(빈 프로세스 캐시): 노드가 살아나면 다시 조회해 실제 값 저장
+    node["down"].clear()
+    ANSWERS[(TOK_DOWN, tokenmeta.SEL_SYMBOL)] = word(["string"], ["DWN"])
+    ANSWERS[(TOK_DOWN, tokenmeta.SEL_DECIMALS)] = word(["uint8"], [8])
+    try:
+        monkeypatch.setattr(tokenmeta, "meta", {})
+        tokenmeta.prefetch(tokens=[TOK_DOWN])
+        assert metastore.get_tokens(metastore.open_store(fresh), [TOK_DOWN]) == {TOK_DOWN.lower(): ("DWN", 8)}
+    finally:
+        del ANSWERS[(TOK_DOWN, tokenmeta.SEL_SYMBOL)], ANSWERS[(TOK_DOWN, tokenmeta.SEL_DECIMALS)]